@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+BuscaJob - Agendador de trabalhos
+Substitui o `schedule` com thread de polling criada na importação: o
+agendador só roda depois de `iniciar()`, despacha cada execução para um
+`GerenciadorTarefas` (pool limitado, progresso e cancelamento) e nunca
+sobrepõe duas execuções do mesmo trabalho.
+
+Cada execução é sorteada com um atraso aleatório de até `jitter` segundos
+(evita que todas as buscas batam nos sites no mesmo instante), e o próximo
+horário de cada trabalho fica persistido em JSON: execuções perdidas
+enquanto o servidor estava parado são recuperadas uma vez na inicialização.
+Antes de `iniciar()` os trabalhos ficam só em memória: registrar trabalhos
+(ex.: na importação do api_server) não lê nem grava o arquivo de estado, e
+depois dele o arquivo só é regravado quando algum horário muda.
+
+Um horário que não pôde ser despachado (execução anterior ainda rodando ou
+fila cheia) não é perdido: é tentado de novo após `RETENTATIVA_PULADA` segundos
+(ou o intervalo do trabalho, se menor), com jitter, até ser despachado; só então
+o trabalho volta à agenda normal. `execucoes_puladas` conta os horários adiados.
+"""
+
+import json
+import logging
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Sequence
+
+from tarefas import FilaCheia, GerenciadorTarefas, Tarefa
+
+logger = logging.getLogger(__name__)
+
+# Espera, em segundos, até nova tentativa de um horário que não pôde ser despachado
+RETENTATIVA_PULADA = 300.0
+
+
+@dataclass
+class Trabalho:
+    """Um trabalho recorrente: diário em `horarios` ('HH:MM', hora local) ou a cada `intervalo` segundos"""
+    nome: str
+    funcao: Callable[[Tarefa], Optional[Dict]]
+    horarios: Sequence[str] = ()
+    intervalo: Optional[float] = None
+    jitter: float = 0
+    recuperar: bool = True
+    proxima: float = 0
+    tarefa: Optional[Tarefa] = field(default=None, repr=False)
+    ultima_execucao: Optional[str] = None
+    execucoes_puladas: int = 0
+    # Horário atual já adiado por sobreposição/fila cheia (tentado de novo em `calcular_retentativa`)
+    adiado: bool = False
+
+    def calcular_proxima(self, agora: float) -> float:
+        """Próximo horário depois de `agora`, já com o jitter sorteado"""
+        if self.intervalo is not None:
+            base = agora + self.intervalo
+        else:
+            momento = datetime.fromtimestamp(agora)
+            candidatos = []
+            for horario in self.horarios:
+                hora, minuto = (int(p) for p in horario.split(':'))
+                alvo = momento.replace(hour=hora, minute=minuto, second=0, microsecond=0)
+                if alvo.timestamp() <= agora:
+                    alvo += timedelta(days=1)
+                candidatos.append(alvo.timestamp())
+            base = min(candidatos)
+        return base + random.uniform(0, self.jitter)
+
+    def calcular_retentativa(self, agora: float) -> float:
+        """Nova tentativa de um horário adiado, com jitter limitado à própria espera"""
+        espera = min(RETENTATIVA_PULADA, self.intervalo) if self.intervalo is not None else RETENTATIVA_PULADA
+        return agora + espera + random.uniform(0, min(self.jitter, espera))
+
+    @property
+    def executando(self) -> bool:
+        return self.tarefa is not None and not self.tarefa.finalizada.is_set()
+
+    def para_dict(self) -> Dict:
+        return {
+            'nome': self.nome,
+            'horarios': list(self.horarios),
+            'intervalo': self.intervalo,
+            'proxima': datetime.fromtimestamp(self.proxima).isoformat() if self.proxima else None,
+            'executando': self.executando,
+            'tarefa_id': self.tarefa.id if self.tarefa else None,
+            'ultima_execucao': self.ultima_execucao,
+            'execucoes_puladas': self.execucoes_puladas,
+            'adiado': self.adiado,
+        }
+
+
+class Agendador:
+    """Agenda trabalhos recorrentes e os entrega ao pool de tarefas na hora certa"""
+
+    def __init__(self, caminho_estado: str, max_trabalhadores: int = 2, nome: str = 'buscajob-agendador'):
+        self.caminho_estado = caminho_estado
+        self.nome = nome
+        self.tarefas = GerenciadorTarefas(max_trabalhadores=max_trabalhadores, max_pendentes=max_trabalhadores * 2,
+                                          nome=nome)
+        self._trabalhos: Dict[str, Trabalho] = {}
+        # Horários persistidos, lidos em `iniciar()`
+        self._estado: Optional[Dict[str, float]] = None
+        # Último estado gravado: `_salvar_estado` não regrava o arquivo se nada mudou
+        self._estado_salvo: Optional[Dict[str, float]] = None
+        self._lock_arquivo = threading.Lock()
+        self._condicao = threading.Condition()
+        self._parar = False
+        self._thread: Optional[threading.Thread] = None
+
+    def _carregar_estado(self) -> Dict[str, float]:
+        try:
+            with open(self.caminho_estado, 'r', encoding='utf-8') as f:
+                return {nome: float(valor) for nome, valor in json.load(f).items()}
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Estado do agendador ilegível, horários recalculados: {e}")
+            return {}
+
+    def _salvar_estado(self):
+        """
+        Grava o próximo horário de cada trabalho, se mudou desde a última gravação
+        (arquivo temporário com fsync + os.replace: sobrevive a queda de energia)
+        """
+        with self._lock_arquivo:
+            with self._condicao:
+                estado = {nome: t.proxima for nome, t in self._trabalhos.items()}
+            if estado == self._estado_salvo:
+                return
+            temporario = self.caminho_estado + '.tmp'
+            try:
+                with open(temporario, 'w', encoding='utf-8') as f:
+                    json.dump(estado, f)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(temporario, self.caminho_estado)
+                self._estado_salvo = estado
+            except OSError as e:
+                logger.error(f"Falha ao salvar estado do agendador: {e}")
+
+    def adicionar(self, nome: str, funcao: Callable[[Tarefa], Optional[Dict]], horarios: Sequence[str] = (),
+                  intervalo: Optional[float] = None, jitter: float = 0, recuperar: bool = True) -> Trabalho:
+        """
+        Registra (ou substitui) um trabalho. O próximo horário é calculado no
+        início do agendador (ou já, se ele estiver rodando): se o horário
+        persistido já passou, a execução perdida é antecipada para logo após o
+        início (com `recuperar`)
+        """
+        if not horarios and intervalo is None:
+            raise ValueError('Informe horarios ou intervalo')
+        trabalho = Trabalho(nome=nome, funcao=funcao, horarios=tuple(horarios), intervalo=intervalo,
+                            jitter=jitter, recuperar=recuperar)
+        with self._condicao:
+            if self._estado is not None:
+                self._agendar(trabalho)
+            self._trabalhos[nome] = trabalho
+            self._condicao.notify()
+        if self._estado is not None:
+            self._salvar_estado()
+        return trabalho
+
+    def _agendar(self, trabalho: Trabalho):
+        """Primeiro horário do trabalho, a partir do estado persistido"""
+        agora = time.time()
+        persistida = self._estado.get(trabalho.nome)
+        if persistida and persistida > agora:
+            trabalho.proxima = persistida
+        elif persistida and trabalho.recuperar:
+            logger.info(f"Agendador: execução perdida de {trabalho.nome} será recuperada")
+            trabalho.proxima = agora + random.uniform(0, min(trabalho.jitter, 60))
+        else:
+            trabalho.proxima = trabalho.calcular_proxima(agora)
+
+    def remover(self, nome: str) -> bool:
+        with self._condicao:
+            removido = self._trabalhos.pop(nome, None) is not None
+            self._condicao.notify()
+        if removido and self._estado is not None:
+            self._salvar_estado()
+        return removido
+
+    def listar(self) -> List[Dict]:
+        with self._condicao:
+            trabalhos = list(self._trabalhos.values())
+        return [t.para_dict() for t in sorted(trabalhos, key=lambda t: t.proxima)]
+
+    def executar_agora(self, nome: str) -> Optional[Tarefa]:
+        """
+        Dispara o trabalho fora do horário (sem alterar o próximo, a menos que ele
+        esteja adiado: a execução manual cobre o horário adiado); None se já estiver executando
+        """
+        with self._condicao:
+            trabalho = self._trabalhos.get(nome)
+            if trabalho is None:
+                raise KeyError(nome)
+            adiado = trabalho.adiado
+            tarefa = self._despachar(trabalho)
+            if tarefa is not None and adiado:
+                trabalho.proxima = trabalho.calcular_proxima(time.time())
+                self._condicao.notify()
+        if tarefa is not None and adiado and self._estado is not None:
+            self._salvar_estado()
+        return tarefa
+
+    def _despachar(self, trabalho: Trabalho) -> Optional[Tarefa]:
+        """
+        Entrega o trabalho ao pool (com a condição adquirida), salvo se a execução
+        anterior não terminou ou a fila está cheia (None; ver `_laco` para a nova tentativa)
+        """
+        motivo = None
+        if trabalho.executando:
+            motivo = 'ainda em execução'
+        else:
+            try:
+                trabalho.tarefa = self.tarefas.submeter(f'agendado:{trabalho.nome}', trabalho.funcao)
+            except FilaCheia as e:
+                motivo = f'não enfileirado ({e})'
+        if motivo is not None:
+            # Um horário adiado várias vezes conta uma vez só
+            if not trabalho.adiado:
+                trabalho.execucoes_puladas += 1
+            logger.warning(f"Agendador: {trabalho.nome} {motivo}; horário adiado")
+            return None
+        trabalho.adiado = False
+        trabalho.ultima_execucao = datetime.now().isoformat()
+        return trabalho.tarefa
+
+    def _laco(self):
+        while True:
+            with self._condicao:
+                if self._parar:
+                    return
+                agora = time.time()
+                vencidos = [t for t in self._trabalhos.values() if t.proxima <= agora]
+                for trabalho in vencidos:
+                    if self._despachar(trabalho) is None:
+                        trabalho.adiado = True
+                        trabalho.proxima = trabalho.calcular_retentativa(agora)
+                    else:
+                        trabalho.proxima = trabalho.calcular_proxima(agora)
+                if not vencidos:
+                    proxima = min((t.proxima for t in self._trabalhos.values()), default=agora + 3600)
+                    # Acorda no próximo horário, ou antes se um trabalho for adicionado/removido
+                    self._condicao.wait(timeout=min(max(0.0, proxima - agora), 3600))
+                    continue
+            self._salvar_estado()
+
+    def iniciar(self):
+        """Lê o estado persistido, agenda os trabalhos registrados e inicia a thread (idempotente)"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._condicao:
+            if self._estado is None:
+                self._estado = self._carregar_estado()
+                for trabalho in self._trabalhos.values():
+                    self._agendar(trabalho)
+        self._salvar_estado()
+        self._parar = False
+        self._thread = threading.Thread(target=self._laco, name=self.nome, daemon=True)
+        self._thread.start()
+        logger.info(f"Agendador iniciado com {len(self._trabalhos)} trabalho(s)")
+
+    def parar(self, timeout: Optional[float] = None):
+        with self._condicao:
+            self._parar = True
+            self._condicao.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self.tarefas.fechar()
@@ -5,69 +5,312 @@ BuscaJob API Server
 Servidor Flask para conectar frontend com backend de scraping
 """
 
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Response, g, request, jsonify, send_from_directory, stream_with_context
 from flask_cors import CORS
+import hashlib
 import json
 import os
 from datetime import datetime
 import logging
-from job_scraper import JobScraper
+from job_store import TIPOS_BUSCA, ArmazemVagas
+from vaga_batch import VagaBatch
+from result_cache import CacheTTL
+from arquivo_vagas import EXTENSAO_INDICE, EscritorVagas
+from retencao import GerenciadorRetencao, PoliticaRetencao, politicas_do_ambiente
+from registro_uso import RegistroUso
+from exportacao import FORMATOS, ExportacaoIndisponivel, exportar, nome_exportacao, normalizar_formato
+from agendador import Agendador
+from config_store import ArmazemConfiguracoes
+from historico_vagas import ALTERADA, NOVA, HistoricoVagas
+from caixa_saida import CaixaSaida
+from metricas import LIMITES_BYTES, METRICAS, MIMETYPE
+from tarefas import CANCELADA, CONCLUIDA, ERRO, FilaCheia, GerenciadorTarefas
 import threading
-import schedule
 import time
-import smtplib
-from email.message import EmailMessage
 
 # Diretório base do backend (para salvar/ler arquivos sempre dentro do pacote)
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
-# Utilitário: enviar e-mail com anexo
-def send_email_with_attachment(subject: str, body: str, file_path: str):
-    smtp_host = os.environ.get("SMTP_HOST")
-    smtp_port = int(os.environ.get("SMTP_PORT", "587"))
-    smtp_user = os.environ.get("SMTP_USER")
-    smtp_pass = os.environ.get("SMTP_PASS")
-    email_from = os.environ.get("EMAIL_FROM")
-    email_to = os.environ.get("EMAIL_TO")
-
-    if not all([smtp_host, smtp_user, smtp_pass, email_from, email_to]):
-        raise RuntimeError(
-            "Configuração de email incompleta (SMTP_HOST/SMTP_USER/SMTP_PASS/EMAIL_FROM/EMAIL_TO)"
-        )
+logger = logging.getLogger(__name__)
 
-    msg = EmailMessage()
-    msg["Subject"] = subject
-    msg["From"] = email_from
-    msg["To"] = email_to
-    msg.set_content(body)
+app = Flask(__name__)
+CORS(app)  # Permite requisições do frontend
 
-    with open(file_path, "rb") as f:
-        data = f.read()
-    msg.add_attachment(data, maintype="application", subtype="json", filename=os.path.basename(file_path))
+# Serviços criados no primeiro uso (obter_*), como o scraper: importar o módulo não abre
+# o SQLite, não lê nem cria arquivos e não cria threads. Os arquivos da versão anterior
+# são migrados por `iniciar_servicos()`. Testes e scripts podem atribuir o global antes do uso
+CAMINHO_BANCO = os.path.join(BASE_DIR, 'buscajob.sqlite3')
+armazem = None
+retencao = None
+tarefas_relatorio = None
+configuracoes = None
+historico = None
+caixa_saida = None
+registro_uso = None
+agendador = None
+# Scraper importado e criado na primeira busca: rotas que só leem o armazém, o test
+# client e os scripts que importam o módulo não pagam pelo job_scraper (asyncio,
+# motor HTTP, parsers, cache HTTP)
+scraper = None
+_lock_instancias = threading.RLock()
 
-    with smtplib.SMTP(smtp_host, smtp_port) as s:
-        s.starttls()
-        s.login(smtp_user, smtp_pass)
-        s.send_message(msg)
 
-# Configuração de logging
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
+def _instancia(nome, criar):
+    """Global `nome`, criado com `criar()` na primeira chamada (uma vez, entre threads)"""
+    instancia = globals()[nome]
+    if instancia is None:
+        with _lock_instancias:
+            instancia = globals()[nome]
+            if instancia is None:
+                instancia = globals()[nome] = criar()
+    return instancia
 
-app = Flask(__name__)
-CORS(app)  # Permite requisições do frontend
 
-# Instância global do scraper
-scraper = JobScraper()
+def obter_armazem():
+    """Histórico de resultados (SQLite), compartilhado com o scraper"""
+    return _instancia('armazem', lambda: ArmazemVagas(CAMINHO_BANCO))
+
+
+def obter_scraper():
+    def _criar():
+        from job_scraper import JobScraper
+        return JobScraper(armazem=obter_armazem(), retencao=obter_retencao())
+    return _instancia('scraper', _criar)
+
+
+# Retenção dos resultados e relatórios produzidos (thread própria, fora do caminho das requisições);
+# limites ajustáveis por RETENCAO_<TIPO>_MAX_HORAS / _MAX_QUANTIDADE / _MAX_MB
+POLITICAS_RETENCAO = {
+    'busca': PoliticaRetencao(max_idade_horas=7 * 24, max_quantidade=200, max_bytes=512 * 1024 * 1024),
+    'agendada': PoliticaRetencao(max_idade_horas=7 * 24, max_quantidade=60),
+    'scraper': PoliticaRetencao(max_idade_horas=7 * 24, max_quantidade=50),
+    'relatorio': PoliticaRetencao(max_idade_horas=72, max_quantidade=20),
+    # resultados_*.json: importados para o armazém antes da primeira varredura (ver sincronizar)
+    'legado': PoliticaRetencao(max_idade_horas=24),
+}
+
+
+def obter_retencao():
+    return _instancia('retencao', lambda: GerenciadorRetencao(
+        BASE_DIR, obter_armazem(), politicas_do_ambiente(POLITICAS_RETENCAO),
+        intervalo=float(os.environ.get('RETENCAO_INTERVALO_S', 900))))
+
+
+RELATORIO_MAX_CONCORRENCIA = 8
+
 
-# Armazenamento em memória (em produção, usar banco de dados)
-resultados_cache = {}
-configuracoes_salvas = {}
-estatisticas = {
-    'total_buscas': 0,
-    'total_vagas': 0,
-    'vagas_salvas': 0
+def obter_tarefas_relatorio():
+    """Relatórios em segundo plano: um por vez, com até 4 na fila"""
+    return _instancia('tarefas_relatorio', lambda: GerenciadorTarefas(
+        max_trabalhadores=1, max_pendentes=4, nome='buscajob-relatorio'))
+
+
+def obter_configuracoes():
+    """Configurações de busca salvas (SQLite, no mesmo arquivo do armazém de resultados)"""
+    return _instancia('configuracoes', lambda: ArmazemConfiguracoes(CAMINHO_BANCO))
+
+
+# Modo incremental: impressões digitais das vagas já vistas por busca salva (e pelo relatório fixo);
+# buscas agendadas e relatório gravam e enviam só as vagas novas ou alteradas
+MODO_INCREMENTAL = os.environ.get('MODO_INCREMENTAL', '1').lower() in ('1', 'true', 'yes')
+HISTORICO_MAX_DIAS = float(os.environ.get('HISTORICO_MAX_DIAS', 90))
+
+
+def obter_historico():
+    return _instancia('historico', lambda: HistoricoVagas(CAMINHO_BANCO))
+
+
+def obter_caixa_saida():
+    """
+    E-mails do relatório: enfileirados em SQLite e entregues pela thread da caixa de saída
+    (conexão SMTP reaproveitada, novas tentativas com espera exponencial, anexos compactados)
+    """
+    return _instancia('caixa_saida', lambda: CaixaSaida(
+        CAMINHO_BANCO, max_tentativas=int(os.environ.get('EMAIL_MAX_TENTATIVAS', 6))))
+
+
+def obter_registro_uso():
+    """Favoritos e estatísticas em memória, persistidos em log só de acréscimo (contadores gravados em lote)"""
+    return _instancia('registro_uso', lambda: RegistroUso(
+        os.path.join(BASE_DIR, 'registro_uso.log'),
+        padrao={'total_buscas': 0, 'total_vagas': 0, 'vagas_salvas': 0}))
+
+
+def migrar_legados():
+    """
+    Importa os arquivos da versão anterior (cada importação só age sobre um armazém
+    vazio; os resultados_*.json já importados, identificados pelo nome, são ignorados)
+    """
+    obter_armazem().importar_legados(BASE_DIR)
+    obter_configuracoes().importar_json(os.path.join(BASE_DIR, 'configuracoes.json'))
+    obter_registro_uso().importar_legados(os.path.join(BASE_DIR, 'vagas_salvas.json'),
+                                          os.path.join(BASE_DIR, 'estatisticas.json'))
+
+def contar_situacoes(registros):
+    novas = sum(1 for r in registros if r.get('situacao') == NOVA)
+    return {'novas': novas, 'alteradas': sum(1 for r in registros if r.get('situacao') == ALTERADA)}
+
+
+def vagas_para_dicts(vagas):
+    """Converte vagas (lista de Vaga) no formato de dicionário usado pela API/frontend (colunas de um VagaBatch)"""
+    return list(VagaBatch.de_vagas(vagas).registros())
+
+# Parâmetros de paginação/ordenação e filtros aceitos na query string
+PARAMETROS_PAGINA = ('page', 'page_size', 'cursor', 'sort')
+FILTROS_PAGINA = {
+    'site': 'site', 'modalidade': 'modalidade', 'tipo': 'tipo', 'q': 'texto',
+    'salario_min': 'salario_min', 'salario_max': 'salario_max', 'desde': 'desde',
 }
+TAMANHO_PAGINA_PADRAO = 20
+TAMANHO_PAGINA_MAXIMO = 200
+
+def paginacao_solicitada(args):
+    """Indica se a requisição pediu uma janela (sem parâmetros, a lista completa é retornada)"""
+    return any(args.get(p) for p in PARAMETROS_PAGINA) or any(args.get(f) for f in FILTROS_PAGINA)
+
+def filtros_da_requisicao(args):
+    """Filtros de FILTROS_PAGINA presentes em `args`, no formato de `ArmazemVagas`"""
+    filtros = {}
+    for parametro, nome in FILTROS_PAGINA.items():
+        valor = str(args.get(parametro) or '').strip()
+        if not valor:
+            continue
+        if nome in ('site', 'modalidade', 'tipo'):
+            valor = [v.strip() for v in valor.split(',') if v.strip()]
+        elif nome in ('salario_min', 'salario_max'):
+            valor = float(valor)
+        filtros[nome] = valor
+    return filtros
+
+def resultado_solicitado(resultado_id=None):
+    """Metadados do resultado `resultado_id` ou, sem ele, do último resultado de busca"""
+    armazem = obter_armazem()
+    if resultado_id is not None:
+        return armazem.resultado(resultado_id)
+    # O manifesto da retenção guarda o último artefato de cada tipo (sem consultar o histórico)
+    artefato = obter_retencao().ultimo(TIPOS_BUSCA)
+    resultado = armazem.resultado(artefato.resultado_id) if artefato and artefato.resultado_id else None
+    if resultado is None:
+        resultado = armazem.ultimo()
+    return resultado
+
+def pagina_do_resultado(resultado, args):
+    """
+    Monta a resposta paginada de um resultado do armazém: só a janela pedida,
+    com o total filtrado e o cursor da próxima página (keyset)
+    """
+    try:
+        page = max(1, int(args.get('page') or 1))
+        page_size = min(TAMANHO_PAGINA_MAXIMO, max(1, int(args.get('page_size') or TAMANHO_PAGINA_PADRAO)))
+    except ValueError:
+        raise ValueError('page e page_size devem ser inteiros')
+    filtros = filtros_da_requisicao(args)
+    sort = args.get('sort') or 'relevancia'
+    armazem = obter_armazem()
+    janela = armazem.pagina(resultado['id'], ordem=sort, cursor=args.get('cursor') or None,
+                            limite=page_size, offset=(page - 1) * page_size, **filtros)
+    total = armazem.contar(resultado['id'], **filtros) if filtros else resultado['total']
+    return {
+        'success': True,
+        'vagas': janela['vagas'],
+        'total': total,
+        'total_resultado': resultado['total'],
+        'page': page,
+        'page_size': page_size,
+        'sort': sort,
+        'next_cursor': janela['proximo_cursor'],
+        'resultado_id': resultado['id'],
+        'arquivo': resultado['nome'],
+    }
+
+# Respostas já serializadas de /api/ultimo-resultado, por (resultado, criação, query string):
+# um resultado salvo não muda, então corpo e ETag valem enquanto ele existir
+respostas_resultado = CacheTTL(ttl=3600, max_peso=64 * 1024 * 1024)
+
+def resposta_cacheada(chave, construir, criado_em):
+    """
+    Serializa `construir()` uma vez e serve os bytes da memória com ETag forte
+    (hash do corpo) e Last-Modified; revalidações com If-None-Match (ou
+    If-Modified-Since) recebem 304 sem corpo
+    """
+    item = respostas_resultado.obter(chave)
+    if item is None:
+        corpo = json.dumps(construir(), ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        item = (corpo, hashlib.blake2b(corpo, digest_size=16).hexdigest())
+        respostas_resultado.guardar(chave, item, peso=len(corpo))
+    corpo, etag = item
+    modificado = datetime.fromisoformat(criado_em).replace(microsecond=0).astimezone()
+    if request.if_none_match:
+        nao_modificado = request.if_none_match.contains(etag)
+    else:
+        nao_modificado = request.if_modified_since is not None and request.if_modified_since >= modificado
+    resposta = Response(status=304) if nao_modificado else Response(corpo, mimetype='application/json')
+    resposta.set_etag(etag)
+    resposta.last_modified = modificado
+    # O "último" resultado muda a cada busca: o navegador guarda a resposta mas sempre revalida
+    resposta.cache_control.no_cache = True
+    return resposta
+
+# Formatos do modo em fluxo de /api/buscar-vagas
+TIPOS_FLUXO = {'ndjson': 'application/x-ndjson', 'sse': 'text/event-stream'}
+
+def formato_fluxo(req):
+    """Formato de fluxo pedido (`?stream=ndjson|sse` ou cabeçalho Accept), ou None"""
+    formato = (req.args.get('stream') or '').lower()
+    if formato in TIPOS_FLUXO:
+        return formato
+    aceita = req.headers.get('Accept', '')
+    for formato, mimetype in TIPOS_FLUXO.items():
+        if mimetype in aceita:
+            return formato
+    return None
+
+def quadro_fluxo(formato, tipo, dados):
+    """Serializa um quadro do fluxo: uma linha JSON (NDJSON) ou um evento SSE"""
+    corpo = json.dumps(dict(dados, tipo=tipo), ensure_ascii=False)
+    if formato == 'sse':
+        return f"event: {tipo}\ndata: {corpo}\n\n"
+    return corpo + '\n'
+
+def fluxo_busca(criterios, formato):
+    """
+    Quadros da busca em fluxo: um quadro 'vagas' por site (só vagas ainda não
+    enviadas) e um 'resumo' final com o total deduplicado e o `resultado_id`
+    """
+    inicio = time.perf_counter()
+    enviadas = 0
+    try:
+        for evento in obter_scraper().buscar_vagas_incremental(criterios):
+            if evento['evento'] == 'site':
+                vagas_site = vagas_para_dicts(evento['vagas'])
+                enviadas += len(vagas_site)
+                yield quadro_fluxo(formato, 'vagas', {
+                    'site': evento['site'],
+                    'vagas': vagas_site,
+                    'encontradas': evento['encontradas'],
+                    'duracao_ms': round(evento['duracao'] * 1000),
+                })
+                continue
+
+            vagas_dict = vagas_para_dicts(evento['vagas'])
+            obter_registro_uso().incrementar(total_buscas=1, total_vagas=len(vagas_dict))
+            timestamp = datetime.now().isoformat()
+            resultado_id = salvar_resultados_arquivo(vagas_dict, criterios)
+            logger.info(f"Busca em fluxo concluída: {len(vagas_dict)} vagas encontradas")
+            # `total` é o resultado salvo (deduplicação completa); pode ser menor que `enviadas`
+            yield quadro_fluxo(formato, 'resumo', {
+                'success': True,
+                'total': len(vagas_dict),
+                'enviadas': enviadas,
+                'duplicatas': evento['duplicatas'],
+                'sites': evento['sites'],
+                'resultado_id': resultado_id,
+                'timestamp': timestamp,
+                'duracao_ms': round((time.perf_counter() - inicio) * 1000),
+            })
+    except Exception as e:
+        logger.error(f"Erro na busca em fluxo: {e}")
+        yield quadro_fluxo(formato, 'erro', {'error': f'Erro interno: {str(e)}'})
 
 # Removido: rotas de frontend que serviam arquivos estáticos
 # @app.route('/')
@@ -92,52 +335,46 @@ def root():
             '/api/ultimo-resultado',
             '/api/buscar-vagas',
             '/api/sites',
+            '/api/cache/invalidar',
             '/api/health'
         ]
     })
 @app.route('/api/ultimo-resultado', methods=['GET'])
 def ultimo_resultado():
-    """Retorna o último arquivo de resultados salvo"""
+    """
+    Retorna o último resultado de busca salvo no armazém (ou o de `resultado_id`).
+    Com page/page_size/cursor/sort ou filtros (site, modalidade, tipo, q,
+    salario_min, salario_max, desde), retorna só a janela pedida e os totais.
+    """
     try:
-        base_dir = BASE_DIR
-        files = [f for f in os.listdir(base_dir) if f.startswith('resultados_') and f.endswith('.json')]
-        if not files:
-            return jsonify({'success': False, 'error': 'Nenhum arquivo de resultados encontrado'}), 404
-        latest_file = max(files, key=lambda f: os.path.getmtime(os.path.join(base_dir, f)))
-        with open(os.path.join(base_dir, latest_file), 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        vagas = data.get('vagas', [])
-        normalized = []
-        for idx, v in enumerate(vagas):
-            normalized.append({
-                'id': v.get('id') or f"vaga_{idx}_{int(time.time())}",
-                'titulo': v.get('titulo', ''),
-                'empresa': v.get('empresa', ''),
-                'localizacao': v.get('localizacao', ''),
-                'salario': v.get('salario', ''),
-                'descricao': v.get('descricao', ''),
-                'dataPublicacao': v.get('dataPublicacao', ''),
-                'site': v.get('site') or v.get('site_origem', ''),
-                'url': v.get('url', ''),
-                'tipo': v.get('tipo') or v.get('tipo_contrato', ''),
-                'nivel': v.get('nivel') or v.get('nivel_experiencia', ''),
-                'modalidade': v.get('modalidade', ''),
-            })
-        return jsonify({'success': True, 'vagas': normalized, 'total': len(normalized), 'arquivo': latest_file})
+        resultado = resultado_solicitado(request.args.get('resultado_id', type=int))
+        if resultado is None:
+            return jsonify({'success': False, 'error': 'Nenhum resultado encontrado'}), 404
+
+        def construir():
+            if paginacao_solicitada(request.args):
+                return pagina_do_resultado(resultado, request.args)
+            vagas = obter_armazem().vagas(resultado['id'])
+            return {'success': True, 'vagas': vagas, 'total': len(vagas), 'resultado_id': resultado['id'],
+                    'arquivo': resultado['nome']}
+
+        chave = (resultado['id'], resultado['criado_em'], tuple(sorted(request.args.items(multi=True))))
+        return resposta_cacheada(chave, construir, resultado['criado_em'])
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
         logger.exception(f'Erro ao carregar último resultado: {e}')
-        return jsonify({'success': False, 'error': 'Erro ao carregar arquivo'}), 500
+        return jsonify({'success': False, 'error': 'Erro ao carregar resultado'}), 500
 
 @app.route('/api/buscar-vagas', methods=['POST'])
 def buscar_vagas():
-    """Endpoint para buscar vagas"""
+    """
+    Endpoint para buscar vagas. Aceita na query string os mesmos parâmetros de
+    paginação de /api/ultimo-resultado; as páginas seguintes são obtidas lá,
+    com o `resultado_id` retornado. Com `?stream=ndjson|sse` (ou Accept
+    correspondente), envia as vagas de cada site assim que ele termina.
+    """
     try:
-        # Remove arquivos de resultados antigos antes de iniciar uma nova busca
-        try:
-            cleanup_old_result_files()
-        except Exception as _cleanup_err:
-            logger.warning(f"Falha ao limpar arquivos antigos antes da busca: {_cleanup_err}")
-
         criterios = request.get_json()
         
         if not criterios:
@@ -149,47 +386,43 @@ def buscar_vagas():
         if not criterios.get('cargo'):
             return jsonify({'error': 'Campo cargo é obrigatório'}), 400
         
+        # Modo em fluxo: as vagas de cada site são enviadas assim que ele termina
+        formato = formato_fluxo(request)
+        if formato:
+            return Response(
+                stream_with_context(fluxo_busca(criterios, formato)),
+                mimetype=TIPOS_FLUXO[formato],
+                headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+            )
+        
         # Executa busca
-        vagas = scraper.buscar_vagas(criterios)
+        vagas = obter_scraper().buscar_vagas(criterios)
         
         # Converte vagas para dicionário
-        vagas_dict = []
-        for vaga in vagas:
-            vaga_dict = {
-                'id': f"vaga_{hash(vaga.titulo + vaga.empresa)}",
-                'titulo': vaga.titulo,
-                'empresa': vaga.empresa,
-                'localizacao': vaga.localizacao,
-                'salario': vaga.salario,
-                'descricao': vaga.descricao,
-                'dataPublicacao': vaga.data_publicacao,
-                'site': vaga.site_origem,
-                'url': vaga.url,
-                'tipo': getattr(vaga, 'tipo_contrato', ''),
-                'nivel': getattr(vaga, 'nivel_experiencia', ''),
-                'modalidade': getattr(vaga, 'modalidade', '')
-            }
-            vagas_dict.append(vaga_dict)
+        vagas_dict = vagas_para_dicts(vagas)
         
         # Atualiza estatísticas
-        estatisticas['total_buscas'] += 1
-        estatisticas['total_vagas'] += len(vagas_dict)
+        obter_registro_uso().incrementar(total_buscas=1, total_vagas=len(vagas_dict))
         
-        # Cache dos resultados
         timestamp = datetime.now().isoformat()
-        resultados_cache[timestamp] = {
-            'criterios': criterios,
-            'vagas': vagas_dict,
-            'timestamp': timestamp
-        }
         
-        # Salva resultados em arquivo
-        salvar_resultados_arquivo(vagas_dict, criterios)
+        # Salva resultados no armazém
+        resultado_id = salvar_resultados_arquivo(vagas_dict, criterios)
+        
+        if resultado_id is not None and paginacao_solicitada(request.args):
+            try:
+                response = pagina_do_resultado(obter_armazem().resultado(resultado_id), request.args)
+            except ValueError as e:
+                return jsonify({'error': str(e), 'resultado_id': resultado_id}), 400
+            response['timestamp'] = timestamp
+            logger.info(f"Busca concluída: {len(vagas_dict)} vagas encontradas")
+            return jsonify(response)
         
         response = {
             'success': True,
             'vagas': vagas_dict,
             'total': len(vagas_dict),
+            'resultado_id': resultado_id,
             'timestamp': timestamp
         }
         
@@ -204,23 +437,16 @@ def buscar_vagas():
 def salvar_configuracao():
     """Salva configuração de busca"""
     try:
-        config = request.get_json()
+        config = request.get_json(silent=True)
         
         if not config:
             return jsonify({'error': 'Configuração não fornecida'}), 400
+        if not isinstance(config, dict):
+            return jsonify({'error': 'Configuração deve ser um objeto JSON'}), 400
         
-        # Gera ID único para a configuração
-        config_id = f"config_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-        
-        configuracoes_salvas[config_id] = {
-            'id': config_id,
-            'config': config,
-            'timestamp': datetime.now().isoformat()
-        }
-        
-        # Salva em arquivo
-        with open(os.path.join(BASE_DIR, 'configuracoes.json'), 'w', encoding='utf-8') as f:
-            json.dump(configuracoes_salvas, f, ensure_ascii=False, indent=2)
+        # Dono opcional (cabeçalho X-Usuario ou campo `dono`); o id é gerado pelo armazém
+        dono = request.headers.get('X-Usuario') or str(config.pop('dono', '') or '')
+        config_id = obter_configuracoes().salvar(config, dono=dono)['id']
         
         logger.info(f"Configuração salva: {config_id}")
         
@@ -236,14 +462,16 @@ def salvar_configuracao():
 
 @app.route('/api/configuracoes', methods=['GET'])
 def listar_configuracoes():
-    """Lista configurações salvas"""
+    """Lista configurações salvas (mais recentes primeiro); filtros dono, cargo, ativa, limit e offset"""
     try:
-        # Carrega configurações do arquivo se existir
-        if os.path.exists(os.path.join(BASE_DIR, 'configuracoes.json')):
-            with open(os.path.join(BASE_DIR, 'configuracoes.json'), 'r', encoding='utf-8') as f:
-                configuracoes_salvas.update(json.load(f))
-        
-        configs = list(configuracoes_salvas.values())
+        ativa = request.args.get('ativa')
+        configs = obter_configuracoes().listar(
+            dono=request.args.get('dono'),
+            cargo=request.args.get('cargo'),
+            ativa=None if ativa in (None, '') else ativa.lower() in ('1', 'true', 'sim'),
+            limite=request.args.get('limit', type=int),
+            offset=request.args.get('offset', 0, type=int),
+        )
         
         return jsonify({
             'success': True,
@@ -256,16 +484,11 @@ def listar_configuracoes():
 
 @app.route('/api/estatisticas', methods=['GET'])
 def obter_estatisticas():
-    """Retorna estatísticas de uso"""
+    """Retorna estatísticas de uso (da memória)"""
     try:
-        # Carrega estatísticas do arquivo se existir
-        if os.path.exists(os.path.join(BASE_DIR, 'estatisticas.json')):
-            with open(os.path.join(BASE_DIR, 'estatisticas.json'), 'r', encoding='utf-8') as f:
-                estatisticas.update(json.load(f))
-        
         return jsonify({
             'success': True,
-            'estatisticas': estatisticas
+            'estatisticas': obter_registro_uso().contadores()
         })
         
     except Exception as e:
@@ -282,23 +505,10 @@ def salvar_vaga():
         if not vaga_id:
             return jsonify({'error': 'ID da vaga não fornecido'}), 400
         
-        # Carrega vagas salvas
-        vagas_salvas = []
-        if os.path.exists(os.path.join(BASE_DIR, 'vagas_salvas.json')):
-            with open(os.path.join(BASE_DIR, 'vagas_salvas.json'), 'r', encoding='utf-8') as f:
-                vagas_salvas = json.load(f)
-        
-        # Verifica se já foi salva
-        if vaga_id not in vagas_salvas:
-            vagas_salvas.append(vaga_id)
-            estatisticas['vagas_salvas'] += 1
-            
-            # Salva arquivo
-            with open(os.path.join(BASE_DIR, 'vagas_salvas.json'), 'w', encoding='utf-8') as f:
-                json.dump(vagas_salvas, f, ensure_ascii=False, indent=2)
-            
-            # Atualiza estatísticas
-            salvar_estatisticas()
+        # Favorito novo: uma linha anexada ao log; repetidos são ignorados
+        registro_uso = obter_registro_uso()
+        if registro_uso.favoritar(str(vaga_id)):
+            registro_uso.incrementar(vagas_salvas=1)
         
         return jsonify({
             'success': True,
@@ -309,215 +519,252 @@ def salvar_vaga():
         logger.error(f"Erro ao salvar vaga: {e}")
         return jsonify({'error': f'Erro interno: {str(e)}'}), 500
 
-@app.route('/api/exportar-vagas', methods=['POST'])
+@app.route('/api/exportar-vagas', methods=['GET', 'POST'])
 def exportar_vagas():
-    """Exporta vagas para Excel"""
+    """
+    Exporta um resultado do armazém (o último ou `resultado_id`) como arquivo
+    baixado em fluxo. Parâmetros (query string ou corpo JSON): `formato` (csv,
+    xlsx/excel, parquet, ndjson/json) e os filtros de /api/ultimo-resultado.
+    Parquet requer o pacote opcional `pyarrow`; sem ele a resposta é 400.
+    """
     try:
-        data = request.get_json()
-        formato = data.get('formato', 'json')
-        
-        if not resultados_cache:
-            return jsonify({'error': 'Nenhum resultado para exportar'}), 400
-        
-        # Pega o resultado mais recente
-        ultimo_resultado = list(resultados_cache.values())[-1]
-        vagas = ultimo_resultado['vagas']
+        parametros = dict(request.args.items())
+        if request.method == 'POST':
+            corpo = request.get_json(silent=True)
+            if corpo is not None and not isinstance(corpo, dict):
+                return jsonify({'error': 'Parâmetros devem ser um objeto JSON'}), 400
+            parametros.update(corpo or {})
+        formato = normalizar_formato(parametros.get('formato') or 'csv')
+        resultado_id = parametros.get('resultado_id')
+        resultado = resultado_solicitado(int(resultado_id) if resultado_id not in (None, '') else None)
+        if resultado is None:
+            return jsonify({'error': 'Nenhum resultado para exportar'}), 404
         
-        if formato == 'excel':
-            import pandas as pd
-            
-            # Converte para DataFrame
-            df = pd.DataFrame(vagas)
-            
-            # Nome do arquivo
-            filename = f"vagas_buscajob_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-            fullpath = os.path.join(BASE_DIR, filename)
-            
-            # Salva Excel
-            df.to_excel(fullpath, index=False, engine='openpyxl')
-            
-            return jsonify({
-                'success': True,
-                'filename': filename,
-                'message': f'Arquivo {filename} criado com sucesso'
-            })
-        
-        else:  # JSON
-            filename = f"vagas_buscajob_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-            fullpath = os.path.join(BASE_DIR, filename)
-            
-            with open(fullpath, 'w', encoding='utf-8') as f:
-                json.dump(ultimo_resultado, f, ensure_ascii=False, indent=2)
-            
-            return jsonify({
-                'success': True,
-                'filename': filename,
-                'message': f'Arquivo {filename} criado com sucesso'
-            })
+        blocos = exportar(formato, obter_armazem().iterar(resultado['id'], **filtros_da_requisicao(parametros)))
+        filename = nome_exportacao(formato, resultado['nome'])
+        return Response(
+            stream_with_context(blocos),
+            mimetype=FORMATOS[formato][0],
+            headers={'Content-Disposition': f'attachment; filename="{filename}"'},
+        )
         
+    except ExportacaoIndisponivel as e:
+        return jsonify({'error': str(e)}), 400
+    except ValueError as e:
+        return jsonify({'error': f'Parâmetro inválido: {e}'}), 400
     except Exception as e:
         logger.error(f"Erro ao exportar vagas: {e}")
         return jsonify({'error': f'Erro interno: {str(e)}'}), 500
 
-# Limpeza de arquivos antigos (Dia-1 e anteriores)
-
-def cleanup_old_result_files():
-    base_dir = BASE_DIR
-    today_str = datetime.now().strftime('%Y%m%d')
-    patterns = ('resultados_', 'relatorio_fixo_')
-    removed = []
-    for name in os.listdir(base_dir):
-        if any(name.startswith(p) and name.endswith('.json') for p in patterns):
-            full_path = os.path.join(base_dir, name)
-            # Tenta extrair YYYYMMDD do nome (resultados_YYYYMMDD_HHMMSS.json)
-            try:
-                parts = name.split('_')
-                if len(parts) >= 2 and parts[1][:8].isdigit():
-                    file_date = parts[1][:8]
-                    if file_date != today_str:
-                        os.remove(full_path)
-                        removed.append(name)
-                        continue
-            except Exception:
-                pass
-            # Fallback por mtime: remove >24h
-            try:
-                mtime = os.path.getmtime(full_path)
-                if time.time() - mtime > 24 * 3600:
-                    os.remove(full_path)
-                    removed.append(name)
-            except Exception:
-                pass
-    if removed:
-        logger.info(f"Arquivos antigos removidos: {removed}")
-
-@app.route('/api/relatorio-fixo', methods=['GET'])
-def relatorio_fixo():
+def gerar_relatorio_fixo(tarefa, completo=False):
+    """
+    Executa o relatório fixo (cargo × cidade) dentro de uma tarefa em segundo
+    plano. No modo incremental, arquivo, armazém e e-mail recebem só as vagas
+    novas ou alteradas desde o relatório anterior; `completo` inclui todas
+    """
+    cargos = [
+        'Analista de Sistemas',
+        'Analista de Negocios',
+        'Analista de Requisitos',
+        'Desenvolvedor',
+        'Gerente de TI',
+        'Coordenador de TI',
+    ]
+    cidades = [
+        'Joinville',
+        'São Paulo',
+        'Curitiba',
+        'Porto Alegre',
+        'Belo Horizonte',
+        'Florianópolis',
+        'Santa Catarina',
+    ]
+    # Obtém lista de sites do scraper, com fallback
     try:
-        cleanup_old_result_files()
-        cargos = [
-            'Analista de Sistemas',
-            'Analista de Negocios',
-            'Analista de Requisitos',
-            'Desenvolvedor',
-            'Gerente de TI',
-            'Coordenador de TI',
-        ]
-        cidades = [
-            'Joinville',
-            'São Paulo',
-            'Curitiba',
-            'Porto Alegre',
-            'Belo Horizonte',
-            'Florianópolis',
-            'Santa Catarina',
-        ]
-        # Obtém lista de sites do scraper, com fallback
-        try:
-            sites = list(getattr(scraper, 'scrapers', {}).keys())
-            if not sites:
-                sites = [
-                    'linkedin','indeed','catho','infojobs','trampos','gupy','kenoby','empregos','glassdoor','stackoverflow','vagas'
-                ]
-        except Exception:
+        sites = list(getattr(obter_scraper(), 'scrapers', {}).keys())
+        if not sites:
             sites = [
                 'linkedin','indeed','catho','infojobs','trampos','gupy','kenoby','empregos','glassdoor','stackoverflow','vagas'
             ]
+    except Exception:
+        sites = [
+            'linkedin','indeed','catho','infojobs','trampos','gupy','kenoby','empregos','glassdoor','stackoverflow','vagas'
+        ]
 
-        all_vagas = []
-        total_consultas = 0
-
-        for cargo in cargos:
-            for cidade in cidades:
-                criterios = {
-                    'cargo': cargo,
-                    'localizacao': cidade,
-                    'sites': sites,
-                    'tipos_contratacao': ['CLT', 'PJ']
-                }
-                resultados = scraper.buscar_vagas(criterios)
-                total_consultas += 1
-        for v in resultados:
-            vaga_dict = {
-                'id': f"vaga_{hash(getattr(v, 'titulo', '') + getattr(v, 'empresa', ''))}",
-                'titulo': getattr(v, 'titulo', ''),
-                'empresa': getattr(v, 'empresa', ''),
-                'localizacao': getattr(v, 'localizacao', cidade),
-                'salario': getattr(v, 'salario', ''),
-                'descricao': getattr(v, 'descricao', ''),
-                'dataPublicacao': getattr(v, 'data_publicacao', ''),
-                'site': getattr(v, 'site_origem', ''),
-                'url': getattr(v, 'url', ''),
-                'tipo': getattr(v, 'tipo_contrato', ''),
-                'nivel': getattr(v, 'nivel_experiencia', ''),
-                'modalidade': getattr(v, 'modalidade', '')
-            }
-            all_vagas.append(vaga_dict)
-
-        # Deduplicação básica por (titulo, empresa, site, url)
-        seen = set()
-        dedup = []
-        for v in all_vagas:
-            key = (v.get('titulo'), v.get('empresa'), v.get('site'), v.get('url'))
-            if key in seen:
-                continue
-            seen.add(key)
-            dedup.append(v)
-
-        # Salvar arquivo JSON
-        filename = f"relatorio_fixo_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-        fullpath = os.path.join(BASE_DIR, filename)
-        payload = {
-            'timestamp': datetime.now().isoformat(),
-            'cargos': cargos,
-            'cidades': cidades,
+    lista_criterios = [
+        {
+            'cargo': cargo,
+            'localizacao': cidade,
             'sites': sites,
-            'total_consultas': total_consultas,
-            'total_vagas': len(dedup),
-            'vagas': dedup,
+            'tipos_contratacao': ['CLT', 'PJ']
         }
-        with open(fullpath, 'w', encoding='utf-8') as f:
-            json.dump(payload, f, ensure_ascii=False, indent=2)
+        for cargo in cargos
+        for cidade in cidades
+    ]
+    total_consultas = len(lista_criterios)
+    tarefa.atualizar(etapa='buscando', consultas_concluidas=0, consultas_total=total_consultas, sites={})
 
-        # Enviar e-mail opcionalmente
-        email_sent = False
-        email_error = None
-        if os.environ.get('EMAIL_ENABLED', '').lower() in ('1', 'true', 'yes'):
-            try:
-                send_email_with_attachment(
-                    subject=f"BuscaJob Relatório Fixo - {datetime.now().strftime('%Y-%m-%d')}",
-                    body=(
-                        f"Relatório gerado em {payload['timestamp']}\n"
-                        f"Cargos: {', '.join(cargos)}\n"
-                        f"Cidades: {', '.join(cidades)}\n"
-                        f"Total de vagas: {len(dedup)}\n"
-                    ),
-                    file_path=fullpath,
-                )
-                email_sent = True
-            except Exception as e:
-                email_error = str(e)
-                logger.error(f"Falha ao enviar e-mail: {email_error}")
-
-        resp = {
-            'success': True,
-            'arquivo': filename,
-            'total': len(dedup),
-            'email_enviado': email_sent,
-            'email_erro': email_error,
-            'vagas': dedup,
-        }
-        return jsonify(resp)
+    # Todas as consultas em um único lote (executor compartilhado, buscas agrupadas por site);
+    # concorrência menor que a padrão para não disputar o motor com as buscas interativas
+    resultado = obter_scraper().buscar_vagas_lote(
+        lista_criterios,
+        max_concorrencia=RELATORIO_MAX_CONCORRENCIA,
+        progresso=lambda estado: tarefa.atualizar(**estado),
+        cancelamento=tarefa.cancelamento,
+    )
+    tarefa.verificar_cancelamento()
+    vagas = resultado.vagas
+    completo = completo or not MODO_INCREMENTAL
+    # Só o delta desde a última execução (novas e alteradas); `completo` mantém todas, anotadas
+    # O histórico só é gravado depois que arquivo e e-mail saírem: uma falha no meio não perde o delta
+    registros, vistas = obter_historico().comparar('relatorio_fixo', vagas_para_dicts(vagas),
+                                           apenas_delta=not completo)
 
-    except Exception as e:
-        logger.exception("Erro ao gerar relatório fixo")
-        return jsonify({'error': f'Erro interno: {str(e)}'}), 500
+    # Salvar arquivo NDJSON (cabeçalho na primeira linha, uma vaga por linha, gravado em fluxo)
+    tarefa.atualizar(etapa='salvando')
+    compressao = os.environ.get('RELATORIO_COMPRESSAO', 'gzip').lower()
+    extensao = {'gzip': '.ndjson.gz', 'zstd': '.ndjson.zst'}.get(compressao, '.ndjson')
+    nome = f"relatorio_fixo_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    filename = nome + extensao
+    fullpath = os.path.join(BASE_DIR, filename)
+    situacoes = contar_situacoes(registros)
+    cabecalho = {
+        'timestamp': datetime.now().isoformat(),
+        'cargos': cargos,
+        'cidades': cidades,
+        'sites': sites,
+        'total_consultas': total_consultas,
+        'total_vagas': len(registros),
+        'total_encontradas': len(vagas),
+        'incremental': not completo,
+        **situacoes,
+    }
+    with EscritorVagas(fullpath, cabecalho, compressao=compressao if extensao != '.ndjson' else None) as escritor:
+        escritor.escrever_todos(registros)
+    resultado_id = obter_armazem().salvar(registros, {'cargos': cargos, 'cidades': cidades, 'sites': sites,
+                                                      'incremental': not completo, 'total_encontradas': len(vagas)},
+                                          tipo='relatorio', nome=nome)
+    obter_retencao().registrar(nome, 'relatorio', arquivos=[filename, filename + EXTENSAO_INDICE],
+                               resultado_id=resultado_id)
+
+    # Enfileirar e-mail opcionalmente (a entrega fica com a caixa de saída; o relatório não espera)
+    email_id = None
+    email_error = None
+    # No modo incremental, sem vagas novas ou alteradas não há o que enviar
+    if os.environ.get('EMAIL_ENABLED', '').lower() in ('1', 'true', 'yes') and (registros or completo):
+        tarefa.verificar_cancelamento()
+        if completo:
+            resumo = f"Total de vagas: {len(registros)}\n"
+        else:
+            resumo = (f"Vagas novas: {situacoes['novas']}\n"
+                      f"Vagas alteradas: {situacoes['alteradas']}\n"
+                      f"Total encontrado nesta execução: {len(vagas)}\n")
+        try:
+            email_id = obter_caixa_saida().enfileirar(
+                assunto=f"BuscaJob Relatório Fixo - {datetime.now().strftime('%Y-%m-%d')}",
+                corpo=(
+                    f"Relatório gerado em {cabecalho['timestamp']}\n"
+                    f"Cargos: {', '.join(cargos)}\n"
+                    f"Cidades: {', '.join(cidades)}\n"
+                    + resumo
+                ),
+                anexos=[fullpath],
+            )
+        except Exception as e:
+            email_error = str(e)
+            logger.error(f"Falha ao enfileirar e-mail: {email_error}")
+
+    # Sem o e-mail na fila, as vagas voltam no delta da próxima execução
+    if email_error is None:
+        obter_historico().confirmar(vistas)
+    tarefa.atualizar(etapa='concluido')
+    return {
+        'arquivo': filename,
+        'total': len(registros),
+        'total_encontradas': len(vagas),
+        'incremental': not completo,
+        **situacoes,
+        'resultado_id': resultado_id,
+        'email_id': email_id,
+        'email_erro': email_error,
+    }
+
+def resposta_tarefa(tarefa, codigo=200):
+    dados = tarefa.para_dict()
+    dados['success'] = tarefa.status not in (ERRO, CANCELADA)
+    dados['links'] = {
+        'status': f'/api/relatorio-fixo/{tarefa.id}',
+        'cancelar': f'/api/relatorio-fixo/{tarefa.id}/cancelar',
+        'artefato': f'/api/relatorio-fixo/{tarefa.id}/artefato',
+    }
+    return jsonify(dados), codigo
+
+@app.route('/api/relatorio-fixo', methods=['GET', 'POST'])
+def relatorio_fixo():
+    """
+    Enfileira o relatório fixo (POST) e retorna a tarefa (202) imediatamente; o
+    progresso fica em /api/relatorio-fixo/<id>. Com `?aguardar=1`, espera o
+    fim da tarefa e responde como antes (arquivo, total, e-mail). GET só é
+    aceito com `?aguardar=1`, por compatibilidade com o run_relatorio.ps1 antigo;
+    sem ele, um GET (que pode vir de prefetch ou crawler) não enfileira nada: 405
+    """
+    aguardar = request.args.get('aguardar', '').lower() in ('1', 'true', 'sim')
+    if request.method == 'GET' and not aguardar:
+        resposta = jsonify({'success': False,
+                            'error': 'Use POST para gerar o relatório (GET só com ?aguardar=1)'})
+        resposta.headers['Allow'] = 'POST'
+        return resposta, 405
+    try:
+        completo = request.args.get('completo', '').lower() in ('1', 'true', 'sim')
+        tarefa = obter_tarefas_relatorio().submeter('relatorio_fixo',
+                                                    lambda t: gerar_relatorio_fixo(t, completo=completo))
+    except FilaCheia as e:
+        return jsonify({'success': False, 'error': f'Fila de relatórios cheia: {e}'}), 429
+
+    if not aguardar:
+        return resposta_tarefa(tarefa, 202)
+
+    tarefa.aguardar()
+    if tarefa.status != CONCLUIDA:
+        return jsonify({'success': False, 'tarefa_id': tarefa.id, 'status': tarefa.status,
+                        'error': tarefa.erro or f'Relatório {tarefa.status}'}), 500
+    return jsonify(dict(tarefa.resultado, success=True, tarefa_id=tarefa.id))
+
+@app.route('/api/relatorio-fixo/<tarefa_id>', methods=['GET'])
+def status_relatorio_fixo(tarefa_id):
+    """Progresso da tarefa: consultas concluídas/total, estado por site e resultado"""
+    tarefa = obter_tarefas_relatorio().obter(tarefa_id)
+    if tarefa is None:
+        return jsonify({'success': False, 'error': 'Tarefa não encontrada'}), 404
+    return resposta_tarefa(tarefa)
+
+@app.route('/api/relatorio-fixo/<tarefa_id>/cancelar', methods=['POST'])
+def cancelar_relatorio_fixo(tarefa_id):
+    tarefa = obter_tarefas_relatorio().obter(tarefa_id)
+    if tarefa is None:
+        return jsonify({'success': False, 'error': 'Tarefa não encontrada'}), 404
+    if not obter_tarefas_relatorio().cancelar(tarefa_id):
+        return jsonify({'success': False, 'error': f'Tarefa já finalizada ({tarefa.status})'}), 409
+    return resposta_tarefa(tarefa, 202)
+
+@app.route('/api/relatorio-fixo/<tarefa_id>/artefato', methods=['GET'])
+def artefato_relatorio_fixo(tarefa_id):
+    """Baixa o arquivo do relatório concluído"""
+    tarefa = obter_tarefas_relatorio().obter(tarefa_id)
+    if tarefa is None:
+        return jsonify({'success': False, 'error': 'Tarefa não encontrada'}), 404
+    if tarefa.status != CONCLUIDA:
+        return jsonify({'success': False, 'error': f'Relatório ainda não concluído ({tarefa.status})'}), 409
+    arquivo = tarefa.resultado['arquivo']
+    if not os.path.exists(os.path.join(BASE_DIR, arquivo)):
+        return jsonify({'success': False, 'error': 'Arquivo do relatório não existe mais'}), 410
+    return send_from_directory(BASE_DIR, arquivo, as_attachment=True)
 
 @app.route('/api/sites', methods=['GET'])
 def listar_sites():
     """Lista os sites suportados pelo scraper."""
     try:
-        sites = list(getattr(scraper, 'scrapers', {}).keys())
+        sites = list(getattr(obter_scraper(), 'scrapers', {}).keys())
         if not sites:
             sites = [
                 'linkedin','indeed','catho','infojobs','trampos','gupy','kenoby','empregos','glassdoor','stackoverflow','vagas'
@@ -527,77 +774,235 @@ def listar_sites():
         logger.exception("Erro ao listar sites")
         return jsonify({'error': 'Falha ao listar sites'}), 500
 
-def salvar_resultados_arquivo(vagas, criterios):
-    """Salva resultados em arquivo JSON"""
+@app.route('/api/cache/invalidar', methods=['POST'])
+def invalidar_cache():
+    """Invalida o cache de buscas (de um site específico ou completo)"""
     try:
-        dados = {
-            'timestamp': datetime.now().isoformat(),
-            'criterios': criterios,
-            'total_vagas': len(vagas),
-            'vagas': vagas
-        }
-        
-        filename = f"resultados_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-        fullpath = os.path.join(BASE_DIR, filename)
-        
-        with open(fullpath, 'w', encoding='utf-8') as f:
-            json.dump(dados, f, ensure_ascii=False, indent=2)
-        
-        logger.info(f"Resultados salvos em {filename}")
-        
+        data = request.get_json(silent=True) or {}
+        site = data.get('site')
+        removidas = obter_scraper().invalidar_cache(site)
+        logger.info(f"Cache de buscas invalidado (site={site or 'todos'}): {removidas} entradas")
+        return jsonify({'success': True, 'removidas': removidas})
     except Exception as e:
-        logger.error(f"Erro ao salvar resultados: {e}")
+        logger.error(f"Erro ao invalidar cache: {e}")
+        return jsonify({'error': f'Erro interno: {str(e)}'}), 500
 
-def salvar_estatisticas():
-    """Salva estatísticas em arquivo"""
+def salvar_resultados_arquivo(vagas, criterios, tipo='busca'):
+    """Salva resultados no armazém (SQLite) e retorna o id do resultado"""
     try:
-        with open(os.path.join(BASE_DIR, 'estatisticas.json'), 'w', encoding='utf-8') as f:
-            json.dump(estatisticas, f, ensure_ascii=False, indent=2)
+        armazem = obter_armazem()
+        resultado_id = armazem.salvar(vagas, criterios, tipo=tipo)
+        obter_retencao().registrar(armazem.resultado(resultado_id)['nome'], tipo, resultado_id=resultado_id)
+        logger.info(f"Resultados salvos no armazém (id {resultado_id}, {len(vagas)} vagas)")
+        return resultado_id
+        
     except Exception as e:
-        logger.error(f"Erro ao salvar estatísticas: {e}")
+        logger.error(f"Erro ao salvar resultados: {e}")
+        return None
+
+AGENDADA_LOTE = 50
 
-def busca_agendada():
-    """Executa busca agendada"""
+def busca_agendada(tarefa=None):
+    """
+    Executa a busca de todas as configurações ativas, em lotes de `AGENDADA_LOTE`
+    consultas. No modo incremental (padrão; `"incremental": false` na configuração
+    desliga), cada configuração grava só as vagas novas ou alteradas desde a
+    execução anterior, com primeira e última vez vistas
+    """
     logger.info("Executando busca agendada...")
+    executadas = [0]
+    totais = {'vagas': 0, 'novas': 0, 'alteradas': 0}
     
-    # Carrega última configuração salva
-    if configuracoes_salvas:
-        ultima_config = list(configuracoes_salvas.values())[-1]['config']
-        
+    def _executar(lote):
+        if tarefa is not None:
+            tarefa.verificar_cancelamento()
         try:
-            vagas = scraper.buscar_vagas(ultima_config)
-            logger.info(f"Busca agendada concluída: {len(vagas)} vagas encontradas")
-            
-            # Salva resultados
-            vagas_dict = []
-            for vaga in vagas:
-                vaga_dict = {
-                    'titulo': vaga.titulo,
-                    'empresa': vaga.empresa,
-                    'localizacao': vaga.localizacao,
-                    'salario': vaga.salario,
-                    'site': vaga.site_origem
-                }
-                vagas_dict.append(vaga_dict)
-            
-            salvar_resultados_arquivo(vagas_dict, ultima_config)
-            
+            resultado = obter_scraper().buscar_vagas_lote([item['config'] for item in lote],
+                                                  max_concorrencia=RELATORIO_MAX_CONCORRENCIA)
         except Exception as e:
             logger.error(f"Erro na busca agendada: {e}")
+            return
+        # Um resultado por configuração (registro completo: as mesmas colunas da busca manual)
+        for item, vagas in zip(lote, resultado.por_consulta):
+            vagas_dict = vagas_para_dicts(vagas)
+            criterios = dict(item['config'], config_id=item['id'])
+            vistas = None
+            if item['config'].get('incremental', MODO_INCREMENTAL):
+                delta, vistas = obter_historico().comparar(item['id'], vagas_dict)
+                situacoes = contar_situacoes(delta)
+                criterios.update(incremental=True, total_encontradas=len(vagas_dict), **situacoes)
+                for chave, valor in situacoes.items():
+                    totais[chave] += valor
+                vagas_dict = delta
+            totais['vagas'] += len(vagas_dict)
+            resultado_id = salvar_resultados_arquivo(vagas_dict, criterios, tipo='agendada')
+            # Histórico gravado só com o resultado salvo (se falhar, o delta volta na próxima execução)
+            if resultado_id is not None and vistas is not None:
+                obter_historico().confirmar(vistas)
+        executadas[0] += len(lote)
+        if tarefa is not None:
+            tarefa.atualizar(configuracoes_concluidas=executadas[0])
+        logger.info(f"Busca agendada: {len(lote)} configurações, {len(resultado.vagas)} vagas únicas")
+    
+    lote = []
+    for item in obter_configuracoes().iterar_ativas():
+        lote.append(item)
+        if len(lote) >= AGENDADA_LOTE:
+            _executar(lote)
+            lote = []
+    if lote:
+        _executar(lote)
+    obter_historico().esquecer(HISTORICO_MAX_DIAS)
+    return {'configuracoes': executadas[0], **totais}
 
-def executar_agendador():
-    """Executa o agendador em thread separada"""
-    while True:
-        schedule.run_pending()
-        time.sleep(60)  # Verifica a cada minuto
+def obter_agendador():
+    """
+    Agendamentos: a busca de todas as configurações ativas duas vezes ao dia, com até
+    AGENDADOR_JITTER_S segundos de atraso aleatório; horários perdidos são recuperados.
+    Registrado só em memória: agendador.json é lido e gravado quando os serviços iniciam
+    """
+    def _criar():
+        agendador = Agendador(os.path.join(BASE_DIR, 'agendador.json'), max_trabalhadores=2)
+        agendador.adicionar('busca_agendada', busca_agendada,
+                            horarios=[h.strip() for h in os.environ.get('AGENDADOR_HORARIOS', '09:00,18:00').split(',')
+                                      if h.strip()],
+                            jitter=float(os.environ.get('AGENDADOR_JITTER_S', 300)))
+        return agendador
+    return _instancia('agendador', _criar)
 
-# Configura agendamentos
-schedule.every().day.at("09:00").do(busca_agendada)
-schedule.every().day.at("18:00").do(busca_agendada)
+_servicos_iniciados = False
+_lock_servicos = threading.Lock()
 
-# Inicia thread do agendador
-agendador_thread = threading.Thread(target=executar_agendador, daemon=True)
-agendador_thread.start()
+def iniciar_servicos():
+    """
+    Migra os arquivos da versão anterior e inicia os serviços em segundo plano
+    (agendador, retenção e e-mail), uma vez por processo; retorna False se já
+    estavam iniciados. Chamado pelos pontos de entrada (`criar_app` e
+    `__main__`); quem só importa o módulo (test client, scripts) não os inicia.
+    """
+    global _servicos_iniciados
+    with _lock_servicos:
+        if _servicos_iniciados:
+            return False
+        migrar_legados()
+        obter_agendador().iniciar()
+        obter_retencao().iniciar()
+        obter_caixa_saida().iniciar()
+        _servicos_iniciados = True
+    return True
+
+def criar_app():
+    """
+    Ponto de entrada para servidores WSGI: configura o logging, inicia os
+    serviços e retorna o app. Ex.: `gunicorn -w 1 --threads 8 'api_server:criar_app()'`
+    ou `waitress-serve --call api_server:criar_app`. Cada processo inicia seus
+    próprios serviços: use um único worker (com threads) para não executar as
+    buscas agendadas em duplicidade.
+    """
+    from job_scraper import configurar_logging
+
+    configurar_logging()
+    iniciar_servicos()
+    return app
+
+@app.route('/api/agendamentos', methods=['GET'])
+def listar_agendamentos():
+    """Trabalhos agendados, próximo horário e execução atual"""
+    return jsonify({'success': True, 'agendamentos': obter_agendador().listar()})
+
+@app.route('/api/emails', methods=['GET'])
+def listar_emails():
+    """Caixa de saída: mensagens recentes (filtro `status`) e contagem por status"""
+    status = request.args.get('status') or None
+    caixa = obter_caixa_saida()
+    return jsonify({'success': True, 'contagem': caixa.contar(),
+                    'emails': caixa.listar(status=status, limite=request.args.get('limit', 50, type=int))})
+
+# Métricas (/api/metrics, formato de texto do Prometheus): latência, contagem e bytes por rota;
+# filas e caches são lidos só na coleta. A rota é o padrão do Flask (ex.: /api/relatorio-fixo/<tarefa_id>),
+# para que ids nas URLs não criem uma série por requisição
+LATENCIA_ROTA = METRICAS.histograma(
+    'buscajob_http_latencia_segundos', 'Latência das requisições por rota e método', ('rota', 'metodo'))
+REQUISICOES_ROTA = METRICAS.contador(
+    'buscajob_http_requisicoes_total', 'Requisições por rota, método e status', ('rota', 'metodo', 'status'))
+BYTES_ROTA = METRICAS.histograma(
+    'buscajob_http_bytes', 'Tamanho dos corpos de requisição e resposta (respostas em fluxo ficam de fora)',
+    ('rota', 'direcao'), limites=LIMITES_BYTES)
+
+@app.before_request
+def iniciar_cronometro():
+    g.inicio_requisicao = time.perf_counter()
+
+@app.after_request
+def registrar_metricas(resposta):
+    # Respostas em fluxo: conta até o início do envio, não até o fim do corpo
+    # (o objeto da requisição é lido uma vez: cada acesso ao proxy do Flask custa microssegundos)
+    fim = time.perf_counter()
+    req = request._get_current_object()
+    inicio = g.pop('inicio_requisicao', None)
+    rota = req.url_rule.rule if req.url_rule is not None else 'nao_encontrada'
+    if inicio is not None:
+        LATENCIA_ROTA.observar(fim - inicio, rota, req.method)
+    REQUISICOES_ROTA.inc(rota, req.method, str(resposta.status_code))
+    if req.content_length:
+        BYTES_ROTA.observar(req.content_length, rota, 'requisicao')
+    if not resposta.is_streamed:
+        tamanho = resposta.content_length
+        if tamanho is not None:
+            BYTES_ROTA.observar(tamanho, rota, 'resposta')
+    return resposta
+
+def caches_em_uso():
+    """Caches com estatísticas de acerto; os do scraper só depois que ele foi criado"""
+    caches = {'respostas_resultado': respostas_resultado}
+    if scraper is not None:
+        # Só os caches que o scraper já criou: a coleta não cria o cache_http/
+        for nome in ('brutos', 'resultados', 'filtros', 'http'):
+            if scraper.instanciado(f'cache_{nome}'):
+                caches[nome] = getattr(scraper, f'cache_{nome}')
+    return {nome: cache.estatisticas() for nome, cache in caches.items()}
+
+def consultas_cache():
+    valores = {}
+    for nome, stats in caches_em_uso().items():
+        for resultado in ('hits', 'misses', 'revalidacoes'):
+            if resultado in stats:
+                valores[(nome, resultado)] = stats[resultado]
+    return valores
+
+def taxa_acerto_cache():
+    taxas = {}
+    for nome, stats in caches_em_uso().items():
+        acertos = stats['hits'] + stats.get('revalidacoes', 0)
+        consultas = acertos + stats['misses']
+        taxas[(nome,)] = acertos / consultas if consultas else 0.0
+    return taxas
+
+def profundidade_filas():
+    valores = {}
+    # Serviços ainda não criados não têm fila: não são criados só para a coleta
+    for fila, gerenciador in (('relatorio', tarefas_relatorio), ('agendador', agendador and agendador.tarefas)):
+        if gerenciador is not None:
+            for status, quantidade in gerenciador.profundidade().items():
+                valores[(fila, status)] = quantidade
+    if caixa_saida is not None:
+        valores[('emails', 'pendente')] = caixa_saida.contar().get('pendente', 0)
+    if scraper is not None and scraper.instanciado('motor'):
+        for status, quantidade in scraper.motor.profundidade().items():
+            valores[('motor_http', status)] = quantidade
+    return valores
+
+METRICAS.medidor('buscajob_cache_consultas_total', 'Consultas aos caches por resultado',
+                 consultas_cache, ('cache', 'resultado'), tipo='counter')
+METRICAS.medidor('buscajob_cache_taxa_acerto', 'Fração das consultas atendidas pelo cache',
+                 taxa_acerto_cache, ('cache',))
+METRICAS.medidor('buscajob_fila_profundidade', 'Itens aguardando ou em execução por fila',
+                 profundidade_filas, ('fila', 'status'))
+
+@app.route('/api/metrics', methods=['GET'])
+def exportar_metricas():
+    """Métricas no formato de texto do Prometheus"""
+    return Response(METRICAS.exportar(), content_type=MIMETYPE)
 
 # Nova rota de saúde para monitoramento simples
 @app.route('/api/health', methods=['GET'])
@@ -605,17 +1010,17 @@ def health():
     return jsonify({'status': 'ok', 'time': datetime.now().isoformat()})
 
 if __name__ == '__main__':
+    from job_scraper import configurar_logging
+
+    configurar_logging()
     print("🚀 Iniciando BuscaJob API Server...")
     print("📱 Interface disponível em: http://localhost:5000")
     print("🔍 API endpoints disponíveis em: http://localhost:5000/api/")
     
-    # Carrega dados existentes
-    if os.path.exists(os.path.join(BASE_DIR, 'estatisticas.json')):
-        try:
-            with open(os.path.join(BASE_DIR, 'estatisticas.json'), 'r', encoding='utf-8') as f:
-                estatisticas.update(json.load(f))
-        except:
-            pass
-    
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    # FLASK_DEBUG=0 desliga o modo debug e o reloader. Com o reloader, este bloco roda em dois
+    # processos: o pai só vigia os arquivos e não inicia os serviços; o filho, que serve, inicia
+    debug = os.environ.get('FLASK_DEBUG', '1').lower() in ('1', 'true', 'yes')
+    if not debug or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        iniciar_servicos()
+    app.run(debug=debug, host='0.0.0.0', port=5000)
 
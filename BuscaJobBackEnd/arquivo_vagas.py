@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+BuscaJob - Arquivos de vagas em NDJSON compactado
+Escrita em fluxo (uma vaga por linha, sem montar o payload inteiro em
+memória) com gzip ou zstd opcionais e um registro de cabeçalho na primeira
+linha, e leitura preguiçosa que itera ou salta direto para a n-ésima vaga.
+
+As vagas são gravadas em blocos de `tamanho_bloco`; em arquivos compactados
+cada bloco é um membro gzip (ou quadro zstd) independente, e o índice com o
+deslocamento de cada bloco fica em `<arquivo>.idx`. Sem o índice, o arquivo
+continua legível do início ao fim por qualquer leitor de gzip/NDJSON.
+"""
+
+import gzip
+import io
+import json
+import os
+from datetime import datetime
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional
+
+FORMATO = 'buscajob-vagas'
+VERSAO = 1
+EXTENSAO_INDICE = '.idx'
+
+_MAGICO_GZIP = b'\x1f\x8b'
+_MAGICO_ZSTD = b'\x28\xb5\x2f\xfd'
+
+
+def compressao_do_caminho(caminho: str) -> Optional[str]:
+    """Compressão implícita na extensão: .gz -> 'gzip', .zst -> 'zstd', demais -> None"""
+    if caminho.endswith('.gz'):
+        return 'gzip'
+    if caminho.endswith('.zst'):
+        return 'zstd'
+    return None
+
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError as e:
+        raise RuntimeError("Compressão zstd requer o pacote 'zstandard' (pip install zstandard)") from e
+    return zstandard
+
+
+def _linha(registro: Dict) -> bytes:
+    return json.dumps(registro, ensure_ascii=False, separators=(',', ':')).encode('utf-8') + b'\n'
+
+
+class EscritorVagas:
+    """
+    Grava vagas (dicionários) em NDJSON, uma por linha, após a linha de cabeçalho.
+
+    O arquivo é escrito em `<caminho>.tmp` e só substitui `caminho` em `fechar`,
+    de modo que leitores nunca veem um arquivo pela metade.
+    """
+
+    def __init__(self, caminho: str, cabecalho: Optional[Dict] = None, compressao: Optional[str] = None,
+                 tamanho_bloco: int = 1000):
+        self.caminho = caminho
+        self.compressao = compressao if compressao is not None else compressao_do_caminho(caminho)
+        if self.compressao not in (None, 'gzip', 'zstd'):
+            raise ValueError(f"Compressão não suportada: {self.compressao}")
+        if self.compressao == 'zstd':
+            self._zstd = _zstandard().ZstdCompressor(level=3)
+        self.tamanho_bloco = tamanho_bloco
+        self.total = 0
+        self._blocos: List[int] = []
+        self._bruto = open(caminho + '.tmp', 'wb')
+        self._membro = None
+        dados = {'formato': FORMATO, 'versao': VERSAO, 'criado_em': datetime.now().isoformat()}
+        dados.update(cabecalho or {})
+        # O cabeçalho ocupa um membro próprio: o bloco 0 começa logo depois dele
+        self._abrir_membro()
+        self._membro.write(_linha(dados))
+        self._fechar_membro()
+
+    def _abrir_membro(self):
+        if self.compressao == 'gzip':
+            self._membro = gzip.GzipFile(fileobj=self._bruto, mode='wb', compresslevel=6, mtime=0)
+        elif self.compressao == 'zstd':
+            self._membro = self._zstd.stream_writer(self._bruto, closefd=False)
+        else:
+            self._membro = self._bruto
+
+    def _fechar_membro(self):
+        if self._membro is not None and self._membro is not self._bruto:
+            self._membro.close()
+        self._membro = None
+
+    def escrever(self, registro: Dict):
+        if self.total % self.tamanho_bloco == 0:
+            self._fechar_membro()
+            self._blocos.append(self._bruto.tell())
+            self._abrir_membro()
+        self._membro.write(_linha(registro))
+        self.total += 1
+
+    def escrever_todos(self, registros: Iterable[Dict]) -> int:
+        for registro in registros:
+            self.escrever(registro)
+        return self.total
+
+    def fechar(self) -> int:
+        """Finaliza o arquivo e o índice de blocos; retorna o total de vagas gravadas"""
+        if self._bruto.closed:
+            return self.total
+        self._fechar_membro()
+        self._bruto.close()
+        os.replace(self.caminho + '.tmp', self.caminho)
+        indice = {'total': self.total, 'tamanho_bloco': self.tamanho_bloco, 'blocos': self._blocos}
+        with open(self.caminho + EXTENSAO_INDICE, 'w', encoding='utf-8') as f:
+            json.dump(indice, f)
+        return self.total
+
+    def descartar(self):
+        """Abandona a escrita e remove o arquivo temporário"""
+        self._fechar_membro()
+        self._bruto.close()
+        try:
+            os.remove(self.caminho + '.tmp')
+        except OSError:
+            pass
+
+    def __enter__(self) -> 'EscritorVagas':
+        return self
+
+    def __exit__(self, tipo_erro, erro, rastro):
+        if tipo_erro is None:
+            self.fechar()
+        else:
+            self.descartar()
+
+
+def escrever_vagas(caminho: str, registros: Iterable[Dict], cabecalho: Optional[Dict] = None,
+                   compressao: Optional[str] = None) -> int:
+    """Grava `registros` em `caminho` e retorna a quantidade de vagas"""
+    with EscritorVagas(caminho, cabecalho, compressao) as escritor:
+        escritor.escrever_todos(registros)
+    return escritor.total
+
+
+class LeitorVagas:
+    """
+    Leitura preguiçosa de um arquivo de `EscritorVagas` (ou de qualquer NDJSON
+    com cabeçalho): nada é carregado além das linhas efetivamente lidas.
+    """
+
+    def __init__(self, caminho: str):
+        self.caminho = caminho
+        with open(caminho, 'rb') as f:
+            magico = f.read(4)
+        if magico.startswith(_MAGICO_GZIP):
+            self.compressao = 'gzip'
+        elif magico.startswith(_MAGICO_ZSTD):
+            self.compressao = 'zstd'
+        else:
+            self.compressao = None
+        self._cabecalho: Optional[Dict] = None
+        self._indice: Optional[Dict] = None
+        try:
+            with open(caminho + EXTENSAO_INDICE, 'r', encoding='utf-8') as f:
+                self._indice = json.load(f)
+        except (OSError, ValueError):
+            self._indice = None
+
+    def _linhas(self, deslocamento: int = 0) -> Iterator[bytes]:
+        """Linhas (bytes) a partir de um deslocamento no arquivo bruto (início de um membro)"""
+        with open(self.caminho, 'rb') as bruto:
+            bruto.seek(deslocamento)
+            if self.compressao == 'gzip':
+                fluxo = gzip.GzipFile(fileobj=bruto, mode='rb')
+            elif self.compressao == 'zstd':
+                leitor = _zstandard().ZstdDecompressor().stream_reader(bruto, read_across_frames=True)
+                fluxo = io.BufferedReader(leitor)
+            else:
+                fluxo = bruto
+            for linha in fluxo:
+                if linha.strip():
+                    yield linha
+
+    @property
+    def cabecalho(self) -> Dict:
+        if self._cabecalho is None:
+            primeira = next(self._linhas(), b'{}')
+            self._cabecalho = json.loads(primeira)
+        return self._cabecalho
+
+    def __iter__(self) -> Iterator[Dict]:
+        linhas = self._linhas()
+        next(linhas, None)
+        for linha in linhas:
+            yield json.loads(linha)
+
+    def __len__(self) -> int:
+        if self._indice is not None:
+            return self._indice['total']
+        return sum(1 for _ in islice(self._linhas(), 1, None))
+
+    def ler(self, inicio: int = 0, quantidade: Optional[int] = None) -> List[Dict]:
+        """Vagas [inicio, inicio + quantidade); com o índice, descompacta só a partir do bloco de `inicio`"""
+        if inicio < 0:
+            raise ValueError('inicio deve ser >= 0')
+        if self._indice is not None:
+            bloco = inicio // self._indice['tamanho_bloco']
+            if bloco >= len(self._indice['blocos']):
+                return []
+            linhas = self._linhas(self._indice['blocos'][bloco])
+            pular = inicio - bloco * self._indice['tamanho_bloco']
+        else:
+            linhas = self._linhas()
+            pular = inicio + 1
+        fim = None if quantidade is None else pular + quantidade
+        return [json.loads(linha) for linha in islice(linhas, pular, fim)]
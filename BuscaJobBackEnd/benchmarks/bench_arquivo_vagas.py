@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark dos arquivos de relatório
+Compara o `relatorio_fixo_*.json` antigo (payload inteiro montado e gravado com
+json.dump indent=2) com o NDJSON em fluxo de `arquivo_vagas.py`, sem e com
+gzip: tempo de escrita, tamanho, pico de memória (tracemalloc) e o tempo para
+ler uma fatia do fim do arquivo.
+
+Uso: python benchmarks/bench_arquivo_vagas.py [quantidade_de_vagas]
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from arquivo_vagas import LeitorVagas, escrever_vagas  # noqa: E402
+from bench_filtros import gerar_vagas  # noqa: E402
+from job_store import registro_de_vaga  # noqa: E402
+
+
+def gravar_json(caminho, vagas):
+    """Caminho antigo: lista de dicionários + json.dump indentado"""
+    payload = {'timestamp': 'bench', 'total_vagas': len(vagas), 'vagas': [registro_de_vaga(v) for v in vagas]}
+    with open(caminho, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, ensure_ascii=False, indent=2)
+
+
+def gravar_ndjson(caminho, vagas):
+    escrever_vagas(caminho, (registro_de_vaga(v) for v in vagas), {'timestamp': 'bench', 'total_vagas': len(vagas)})
+
+
+def ler_json(caminho, inicio, quantidade):
+    with open(caminho, 'r', encoding='utf-8') as f:
+        return json.load(f)['vagas'][inicio:inicio + quantidade]
+
+
+def ler_ndjson(caminho, inicio, quantidade):
+    return LeitorVagas(caminho).ler(inicio, quantidade)
+
+
+def medir(gravar, caminho, vagas):
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    gravar(caminho, vagas)
+    duracao = (time.perf_counter() - inicio) * 1000
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return duracao, pico
+
+
+def main():
+    quantidade = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    vagas = gerar_vagas(quantidade)
+    inicio_fatia = quantidade - 50
+    casos = [
+        ('json indent=2', 'relatorio.json', gravar_json, ler_json),
+        ('ndjson', 'relatorio.ndjson', gravar_ndjson, ler_ndjson),
+        ('ndjson.gz', 'relatorio.ndjson.gz', gravar_ndjson, ler_ndjson),
+    ]
+    with tempfile.TemporaryDirectory() as diretorio:
+        print(f"{quantidade} vagas")
+        print(f"{'formato':>14} | {'escrita':>9} | {'tamanho':>10} | {'pico memória':>12} | {'últimas 50':>10}")
+        for nome, arquivo, gravar, ler in casos:
+            caminho = os.path.join(diretorio, arquivo)
+            duracao, pico = medir(gravar, caminho, vagas)
+            inicio = time.perf_counter()
+            fatia = ler(caminho, inicio_fatia, 50)
+            t_ler = (time.perf_counter() - inicio) * 1000
+            assert len(fatia) == 50
+            print(f"{nome:>14} | {duracao:6.0f} ms | {os.path.getsize(caminho) / 1024:7.0f} KB | "
+                  f"{pico / 1024 / 1024:9.1f} MB | {t_ler:7.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark da caixa de saída de e-mails
+Sobe um servidor SMTP substituto local (sem TLS, com latência simulada por
+resposta) e compara o envio antigo (uma conexão por mensagem, anexo NDJSON
+sem compactar, feito dentro da geração do relatório) com a `CaixaSaida`:
+tempo que o relatório espera para enfileirar, tempo de entrega com conexão
+reaproveitada, conexões abertas e bytes transferidos. Depois confere as
+novas tentativas (falhas 451 temporárias) e a recusa definitiva (550).
+
+Uso: python benchmarks/bench_caixa_saida.py [mensagens] [latencia_ms]
+"""
+
+import os
+import smtplib
+import socketserver
+import sys
+import tempfile
+import threading
+import time
+from email.message import EmailMessage
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from arquivo_vagas import escrever_vagas  # noqa: E402
+from bench_filtros import gerar_vagas  # noqa: E402
+from caixa_saida import ENVIADO, FALHOU, CaixaSaida, ConfigSMTP  # noqa: E402
+from job_store import registro_de_vaga  # noqa: E402
+
+
+class ServidorSMTP(socketserver.ThreadingTCPServer):
+    """SMTP substituto: aceita tudo, conta conexões/mensagens/bytes e pode recusar DATA"""
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, latencia: float = 0.0):
+        super().__init__(('127.0.0.1', 0), _Sessao)
+        self.latencia = latencia
+        self.conexoes = self.mensagens = self.bytes = 0
+        # Respostas forçadas para os próximos DATA (ex.: ['451 tente depois'])
+        self.recusas = []
+        self.lock = threading.Lock()
+
+    @property
+    def porta(self):
+        return self.server_address[1]
+
+    def zerar(self):
+        with self.lock:
+            self.conexoes = self.mensagens = self.bytes = 0
+
+
+class _Sessao(socketserver.StreamRequestHandler):
+    def responder(self, linha):
+        time.sleep(self.server.latencia)
+        self.wfile.write(linha.encode('ascii') + b'\r\n')
+
+    def handle(self):
+        servidor = self.server
+        with servidor.lock:
+            servidor.conexoes += 1
+        self.responder('220 substituto')
+        while True:
+            linha = self.rfile.readline()
+            if not linha:
+                return
+            comando = linha[:4].upper()
+            if comando == b'EHLO':
+                self.responder('250-substituto\r\n250 8BITMIME')
+            elif comando == b'DATA':
+                self.responder('354 fim com .')
+                tamanho = 0
+                while True:
+                    parte = self.rfile.readline()
+                    if parte in (b'.\r\n', b''):
+                        break
+                    tamanho += len(parte)
+                with servidor.lock:
+                    recusa = servidor.recusas.pop(0) if servidor.recusas else None
+                    if recusa is None:
+                        servidor.mensagens += 1
+                        servidor.bytes += tamanho
+                self.responder(recusa or '250 ok')
+            elif comando == b'QUIT':
+                self.responder('221 tchau')
+                return
+            else:
+                # HELO, MAIL, RCPT, RSET, NOOP
+                self.responder('250 ok')
+
+
+def envio_antigo(config, assunto, caminho):
+    """Caminho anterior: conexão nova por mensagem e o arquivo anexado como está"""
+    msg = EmailMessage()
+    msg['Subject'] = assunto
+    msg['From'] = config.remetente
+    msg['To'] = ', '.join(config.destinatarios)
+    msg.set_content('relatório')
+    with open(caminho, 'rb') as f:
+        msg.add_attachment(f.read(), maintype='application', subtype='x-ndjson', filename=os.path.basename(caminho))
+    with smtplib.SMTP(config.host, config.porta) as s:
+        s.send_message(msg)
+
+
+def main():
+    quantidade = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    latencia = (float(sys.argv[2]) if len(sys.argv) > 2 else 20) / 1000
+    servidor = ServidorSMTP(latencia)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    config = ConfigSMTP(host='127.0.0.1', porta=servidor.porta, remetente='buscajob@exemplo.com',
+                        destinatarios=('equipe@exemplo.com',), starttls=False)
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        anexo = os.path.join(diretorio, 'relatorio_fixo.ndjson')
+        escrever_vagas(anexo, (registro_de_vaga(v) for v in gerar_vagas(2000)), {'timestamp': 'bench'})
+        print(f"{quantidade} mensagens, anexo NDJSON de {os.path.getsize(anexo) / 1024:.0f} KB, "
+              f"latência SMTP simulada de {latencia * 1000:.0f} ms por resposta")
+        print(f"{'modo':>22} | {'relatório espera':>16} | {'entrega total':>13} | {'conexões':>8} | {'enviado':>9}")
+
+        inicio = time.perf_counter()
+        for i in range(quantidade):
+            envio_antigo(config, f'antigo {i}', anexo)
+        duracao = time.perf_counter() - inicio
+        print(f"{'síncrono (antigo)':>22} | {duracao * 1000 / quantidade:10.1f} ms/msg | {duracao * 1000:10.0f} ms | "
+              f"{servidor.conexoes:8d} | {servidor.bytes / 1024:6.0f} KB")
+
+        servidor.zerar()
+        caixa = CaixaSaida(os.path.join(diretorio, 'caixa.sqlite3'), config=config)
+        inicio = time.perf_counter()
+        for i in range(quantidade):
+            caixa.enfileirar(f'caixa {i}', 'relatório', [anexo])
+        enfileirar = time.perf_counter() - inicio
+        resumo = caixa.enviar_pendentes()
+        duracao = time.perf_counter() - inicio
+        assert resumo['enviados'] == quantidade, resumo
+        print(f"{'caixa de saída':>22} | {enfileirar * 1000 / quantidade:10.1f} ms/msg | {duracao * 1000:10.0f} ms | "
+              f"{servidor.conexoes:8d} | {servidor.bytes / 1024:6.0f} KB")
+        caixa.fechar()
+
+        # Novas tentativas: duas falhas temporárias e depois entrega; 550 marca falha sem repetir
+        servidor.latencia = 0
+        caixa = CaixaSaida(os.path.join(diretorio, 'tentativas.sqlite3'), config=config, espera_base=0.05)
+        caixa.iniciar()
+        servidor.recusas = ['451 ocupado', '451 ocupado']
+        temporaria = caixa.enfileirar('temporária', 'x')
+        prazo = time.time() + 10
+        while caixa.obter(temporaria)['status'] != ENVIADO and time.time() < prazo:
+            time.sleep(0.05)
+        servidor.recusas = ['550 recusada']
+        definitiva = caixa.enfileirar('definitiva', 'x')
+        while caixa.obter(definitiva)['status'] != FALHOU and time.time() < prazo:
+            time.sleep(0.05)
+        t, d = caixa.obter(temporaria), caixa.obter(definitiva)
+        caixa.fechar()
+        print(f"451 x2: {t['status']} após {t['tentativas']} tentativas | 550: {d['status']} após "
+              f"{d['tentativas']} tentativa ({d['erro']})")
+        assert t['status'] == ENVIADO and t['tentativas'] == 3 and d['status'] == FALHOU, (t, d)
+    servidor.shutdown()
+
+
+if __name__ == '__main__':
+    main()
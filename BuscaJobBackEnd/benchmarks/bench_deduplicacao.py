@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark da deduplicação de vagas
+Gera vagas sintéticas em que parte delas reaparece em outros sites com
+pequenas variações (acentos, abreviações, sufixo da empresa, pontuação) e
+mede, para tamanhos crescentes, o tempo do `DeduplicadorVagas` e quantas
+duplicatas ele encontra em relação à chave exata antiga (título + empresa).
+Antes, confere que empresas de nomes quase iguais ("Empresa 1" x "Empresa 2")
+não são mescladas e que as variações de grafia de uma mesma empresa são.
+
+Uso: python benchmarks/bench_deduplicacao.py [maior_quantidade]
+"""
+
+import os
+import random
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from deduplicacao import DeduplicadorVagas  # noqa: E402
+from job_scraper import Vaga  # noqa: E402
+
+CARGOS = ['Desenvolvedor', 'Analista', 'Engenheiro', 'Cientista', 'Arquiteto', 'Especialista', 'Consultor']
+AREAS = ['Python', 'Java', 'Dados', 'Frontend', 'Backend', 'DevOps', 'Mobile', 'Segurança', 'QA', 'Cloud',
+         'Machine Learning', 'SAP', '.NET', 'Go', 'Infraestrutura', 'BI']
+NIVEIS = ['Júnior', 'Pleno', 'Sênior', '']
+CIDADES = ['São Paulo, SP', 'Rio de Janeiro, RJ', 'Belo Horizonte, MG', 'Curitiba, PR', 'Remoto', 'Recife, PE']
+SITES = ['indeed', 'catho', 'linkedin', 'vagas', 'infojobs']
+
+SILABAS = ['ba', 'co', 'da', 'fi', 'gu', 'la', 'mo', 'nu', 'pe', 'ra', 'si', 'te', 'vo', 'xa', 'zu', 'tri', 'bra',
+           'ker', 'len', 'mar', 'dor', 'qui', 'sol', 'tec', 'vin', 'ju', 'ho', 'wi', 'lu', 'no']
+SUFIXOS = ['', ' Tech', ' Digital', ' Sistemas', ' Consultoria', ' Software', ' Labs', ' Group']
+
+VARIACOES = [
+    lambda t, e: (t.replace('Sênior', 'Sr.').replace('Júnior', 'Jr.'), e),
+    lambda t, e: (t.replace('ê', 'e').replace('ú', 'u'), f'{e} Ltda'),
+    lambda t, e: (t.replace('Desenvolvedor', 'Desenvolvedor(a)'), e.upper()),
+    lambda t, e: (f'{t} - Remoto', f'{e} S.A.'),
+    lambda t, e: (f'Vaga: {t}', e.replace(' ', '')),
+]
+
+
+def gerar_vagas(quantidade, taxa_repeticao=0.3, semente=7):
+    """
+    Vagas sintéticas e o "gabarito": para cada URL, o id da vaga original.
+    Cada empresa publica várias vagas; ~30% das vagas reaparecem em outro site com variações.
+    """
+    rnd = random.Random(semente)
+    empresas = [''.join(rnd.choice(SILABAS) for _ in range(rnd.randint(2, 4))).capitalize() + rnd.choice(SUFIXOS)
+                for _ in range(max(1, quantidade // 5))]
+    vagas, gabarito = [], {}
+    while len(vagas) < quantidade:
+        original = len(gabarito)
+        titulo = ' '.join(p for p in (rnd.choice(CARGOS), rnd.choice(AREAS), rnd.choice(NIVEIS)) if p)
+        empresa = rnd.choice(empresas)
+        local = rnd.choice(CIDADES)
+        url = f'https://indeed/{len(vagas)}'
+        vagas.append(Vaga(titulo, empresa, local, '', '', '', 'indeed', url))
+        gabarito[url] = original
+        if rnd.random() < taxa_repeticao:
+            t, e = rnd.choice(VARIACOES)(titulo, empresa)
+            site = rnd.choice(SITES[1:])
+            url = f'https://{site}/{len(vagas)}'
+            vagas.append(Vaga(t, e, local, '', '', '', site, url))
+            gabarito[url] = original
+    rnd.shuffle(vagas)
+    return vagas[:quantidade], gabarito
+
+
+def avaliar(unicas, gabarito):
+    """(duplicatas reais não mescladas, vagas mescladas por engano)"""
+    representante_por_original = {}
+    perdidas = erradas = 0
+    for vaga in unicas:
+        ids = [gabarito[u] for u in (vaga.urls_fontes or (vaga.url,))]
+        # Mesmo título e empresa na mesma cidade é a mesma vaga também pelo critério antigo
+        erradas += len(ids) - max(ids.count(i) for i in set(ids))
+        for i in set(ids):
+            if i in representante_por_original:
+                perdidas += 1
+            representante_por_original[i] = vaga
+    return perdidas, erradas
+
+
+def verificar_empresas_parecidas(deduplicador):
+    """Regressão: mesma vaga em empresas que diferem por um número ou termo curto continua separada"""
+    titulo, local = 'Desenvolvedor Python Pleno', 'São Paulo, SP'
+    distintas = ([f'Empresa {i}' for i in range(1, 10)] + [f'LinkedIn Company {i}' for i in range(1, 10)]
+                 + ['Vagas Tech', 'Vagas Tech BR', 'Acme', 'Acme X'])
+    vagas = [Vaga(titulo, e, local, '', '', '', 'linkedin', f'https://linkedin/{i}') for i, e in enumerate(distintas)]
+    unicas = deduplicador.deduplicar(vagas)
+    assert len(unicas) == len(distintas), f"empresas distintas mescladas: {len(distintas)} -> {len(unicas)}"
+
+    grafias = ['Vinxa Tech', 'VinxaTech', 'VINXA TECH LTDA', 'Vinxa Tech S.A.']
+    vagas = [Vaga(titulo, e, local, '', '', '', 'indeed', f'https://indeed/{i}') for i, e in enumerate(grafias)]
+    assert len(deduplicador.deduplicar(vagas)) == 1, "grafias da mesma empresa não foram mescladas"
+    print(f"empresas parecidas: {len(distintas)} mantidas separadas, {len(grafias)} grafias mescladas em 1")
+
+
+def main():
+    maior = int(sys.argv[1]) if len(sys.argv) > 1 else 40_000
+    deduplicador = DeduplicadorVagas()
+    verificar_empresas_parecidas(deduplicador)
+    tamanho = max(1000, maior // 8)
+    while tamanho <= maior:
+        vagas, gabarito = gerar_vagas(tamanho)
+        reais = len(set(gabarito[v.url] for v in vagas))
+        exatas = len({f"{v.titulo.lower()}_{v.empresa.lower()}" for v in vagas})
+        inicio = time.perf_counter()
+        unicas = deduplicador.deduplicar(vagas)
+        duracao = time.perf_counter() - inicio
+        perdidas, erradas = avaliar(unicas, gabarito)
+        print(f"{tamanho:7d} vagas: {duracao * 1000:8.1f} ms ({duracao / tamanho * 1e6:5.1f} µs/vaga) | "
+              f"únicas: {len(unicas)} (reais: {reais}, chave exata antiga: {exatas}) | "
+              f"não mescladas: {perdidas} | mescladas por engano: {erradas}")
+        tamanho *= 2
+
+
+if __name__ == '__main__':
+    main()
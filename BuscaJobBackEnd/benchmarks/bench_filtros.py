@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark dos filtros de critérios
+Compara o laço antigo de `_aplicar_filtros` (critérios reinterpretados a cada
+vaga) com a cadeia compilada de `filtros.py`, em vagas sintéticas, e confere o classificador de tipo de contrato em casos conhecidos.
+
+Uso: python benchmarks/bench_filtros.py [quantidade_de_vagas]
+"""
+
+import os
+import random
+import re
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from classificador import aceita_tipo, classificar, modalidade_canonica, normalizar_modalidade, normalizar_tipo  # noqa: E402
+from filtros import compilar_filtros  # noqa: E402
+from job_scraper import Vaga  # noqa: E402
+
+TITULOS = ['Desenvolvedor Python', 'Analista de Dados', 'Engenheiro de Software Java',
+           'Desenvolvedor Frontend React', 'Analista de Suporte', 'Cientista de Dados Sênior',
+           'Estágio em Desenvolvimento', 'Tech Lead Node.js']
+LOCAIS = ['São Paulo, SP', 'Rio de Janeiro, RJ', 'Remoto', 'Belo Horizonte, MG', 'Curitiba, PR',
+          'Florianópolis, SC', 'Porto Alegre, RS']
+SALARIOS = ['R$ 3.500', 'R$ 5.000,00', 'R$ 8.000 - R$ 12.000', 'A combinar', '', 'R$ 15.000']
+TIPOS = ['CLT', 'PJ', 'Estágio', '']
+DESCRICOES = ['Atuação em projetos de backend com APIs REST e bancos relacionais.',
+              'Vaga para time de dados, com SQL, Python e pipelines em nuvem.',
+              'Contrato PJ para squad de produto digital, trabalho híbrido.',
+              'Oportunidade home office em empresa de tecnologia, regime CLT.']
+
+CRITERIOS = {
+    'palavras_chave': 'python dados',
+    'localizacao': 'São Paulo, Remoto',
+    'salario_minimo': 4000,
+    'tipos_contratacao': ['CLT', 'PJ'],
+    'modalidades': ['Home office', 'Híbrido'],
+}
+
+
+def gerar_vagas(quantidade, semente=42):
+    rnd = random.Random(semente)
+    return [
+        Vaga(
+            titulo=rnd.choice(TITULOS), empresa=f'Empresa {i % 500}', localizacao=rnd.choice(LOCAIS),
+            salario=rnd.choice(SALARIOS), descricao=rnd.choice(DESCRICOES), url=f'https://exemplo.com/vaga/{i}',
+            data_publicacao='2024-01-01', site_origem='bench', tipo_contrato=rnd.choice(TIPOS),
+        )
+        for i in range(quantidade)
+    ]
+
+
+def _salario_legado(salario_str):
+    if not salario_str or salario_str.lower() in ['a combinar', 'não informado']:
+        return 0.0
+    numeros = re.findall(r'[\d.,]+', salario_str)
+    if numeros:
+        try:
+            return float(numeros[0].replace('.', '').replace(',', '.'))
+        except ValueError:
+            return 0.0
+    return 0.0
+
+
+def filtrar_legado(vagas, criterios):
+    """Laço anterior: cada critério é reinterpretado para cada vaga"""
+    vagas_filtradas = []
+    for vaga in vagas:
+        if criterios.get('palavras_chave'):
+            palavras = criterios['palavras_chave'].lower().split()
+            texto_vaga = f"{vaga.titulo} {vaga.descricao}".lower()
+            if not any(palavra in texto_vaga for palavra in palavras):
+                continue
+        if criterios.get('localizacao'):
+            loc = criterios['localizacao'].strip().lower()
+            texto_loc_vaga = (vaga.localizacao or '').lower()
+            if loc == 'remoto':
+                if 'remoto' not in texto_loc_vaga:
+                    continue
+            else:
+                tokens = [t.strip() for t in re.split(r'[;,/\\|]', loc) if t.strip()]
+                if not any(token in texto_loc_vaga for token in tokens):
+                    continue
+        if criterios.get('salario_minimo') or criterios.get('salario_maximo'):
+            salario_vaga = _salario_legado(vaga.salario)
+            if salario_vaga:
+                if criterios.get('salario_minimo') and salario_vaga < criterios['salario_minimo']:
+                    continue
+                if criterios.get('salario_maximo') and salario_vaga > criterios['salario_maximo']:
+                    continue
+        if criterios.get('tipos_contratacao'):
+            tipos_aceitos = {normalizar_tipo(t) for t in criterios['tipos_contratacao']}
+            if not aceita_tipo(vaga.tags, tipos_aceitos):
+                continue
+        if criterios.get('modalidades'):
+            mods_aceitas = {normalizar_modalidade(m) for m in criterios['modalidades']}
+            mod_vaga = modalidade_canonica(vaga.tags)
+            if mod_vaga and mod_vaga not in mods_aceitas:
+                continue
+        vagas_filtradas.append(vaga)
+    return vagas_filtradas
+
+
+def verificar_classificador():
+    """Regressão: prefixos de tipo de contrato não casam palavras comuns ("temp" em "tempo integral")"""
+    casos = [
+        ('Desenvolvedor Python - tempo integral', set()),
+        ('Analista de Dados (temporário)', {'tipo:TEMPORARIO'}),
+        ('Vaga temporária de fim de ano', {'tipo:TEMPORARIO'}),
+        ('Temp Data Analyst', {'tipo:TEMPORARIO'}),
+        ('Desenvolvedor Freelancer', {'tipo:FREELANCER'}),
+    ]
+    for titulo, esperado in casos:
+        tipos = {t for t in classificar(titulo, '') if t.startswith('tipo:')}
+        assert tipos == esperado, f"{titulo!r}: {sorted(tipos)} (esperado {sorted(esperado)})"
+    print(f"classificador: {len(casos)} casos conferidos")
+
+
+def medir(funcao, *args):
+    inicio = time.perf_counter()
+    resultado = funcao(*args)
+    return resultado, time.perf_counter() - inicio
+
+
+def main():
+    quantidade = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    verificar_classificador()
+    vagas = gerar_vagas(quantidade)
+
+    legado, t_legado = medir(filtrar_legado, vagas, CRITERIOS)
+    filtro, t_compilar = medir(compilar_filtros, CRITERIOS)
+    novo, t_novo = medir(filtro.aplicar, vagas)
+    # Os dois caminhos devem selecionar exatamente as mesmas vagas, na mesma ordem
+    assert [id(v) for v in legado] == [id(v) for v in novo], (len(legado), len(novo))
+
+    print(f"Vagas: {quantidade} | selecionadas: {len(novo)}")
+    print(f"Ordem dos predicados: {', '.join(p.nome for p in filtro.predicados)}")
+    print(f"Laço legado         : {t_legado * 1000:8.1f} ms")
+    print(f"Filtro compilado    : {t_novo * 1000:8.1f} ms ({t_legado / t_novo:.1f}x, compilação {t_compilar * 1000:.2f} ms)")
+
+
+if __name__ == '__main__':
+    main()
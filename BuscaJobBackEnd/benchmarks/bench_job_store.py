@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark do armazém de resultados
+Grava um histórico crescente de buscas e mede, a cada etapa, o custo de
+carregar o último resultado e de consultas filtradas/textuais no armazém
+SQLite, comparado à leitura do `resultados_*.json` mais recente (listdir +
+getmtime + json.load), como fazia o /api/ultimo-resultado.
+
+Uso: python benchmarks/bench_job_store.py [buscas_no_historico] [vagas_por_busca]
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from bench_filtros import gerar_vagas  # noqa: E402
+from job_store import ArmazemVagas, registro_de_vaga  # noqa: E402
+
+
+def ultimo_arquivo(diretorio):
+    """Caminho antigo: arquivo mais recente por mtime, carregado inteiro"""
+    arquivos = [f for f in os.listdir(diretorio) if f.startswith('resultados_') and f.endswith('.json')]
+    mais_recente = max(arquivos, key=lambda f: os.path.getmtime(os.path.join(diretorio, f)))
+    with open(os.path.join(diretorio, mais_recente), 'r', encoding='utf-8') as f:
+        return json.load(f)['vagas']
+
+
+def medir_ms(funcao, repeticoes=5):
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        resultado = funcao()
+    return resultado, (time.perf_counter() - inicio) * 1000 / repeticoes
+
+
+def main():
+    buscas = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    por_busca = int(sys.argv[2]) if len(sys.argv) > 2 else 250
+    registros = [registro_de_vaga(v) for v in gerar_vagas(por_busca)]
+    etapas = sorted({max(1, buscas // 100), max(1, buscas // 10), buscas})
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        armazem = ArmazemVagas(os.path.join(diretorio, 'bench.sqlite3'))
+        gravadas = 0
+        print(f"{'histórico':>18} | {'último (json)':>13} | {'último (sql)':>12} | {'filtro':>7} | {'FTS (último)':>12}")
+        for etapa in etapas:
+            inicio = time.perf_counter()
+            while gravadas < etapa:
+                armazem.salvar(registros, {'cargo': 'bench'})
+                nome = os.path.join(diretorio, f'resultados_{gravadas:08d}.json')
+                with open(nome, 'w', encoding='utf-8') as f:
+                    json.dump({'vagas': registros}, f, ensure_ascii=False)
+                gravadas += 1
+            t_gravar = (time.perf_counter() - inicio) * 1000
+
+            legado, t_json = medir_ms(lambda: ultimo_arquivo(diretorio))
+            ultimo = armazem.ultimo()
+            novo, t_sql = medir_ms(lambda: armazem.vagas(ultimo['id']))
+            assert len(novo) == len(legado) == por_busca
+            _, t_filtro = medir_ms(lambda: armazem.vagas(site='bench', salario_min=5000, limite=50))
+            _, t_fts = medir_ms(lambda: armazem.vagas(ultimo['id'], texto='python pipelines'))
+            print(f"{gravadas * por_busca:>11} vagas | {t_json:10.1f} ms | {t_sql:9.1f} ms | {t_filtro:4.1f} ms | {t_fts:9.1f} ms"
+                  f"  (gravação da etapa: {t_gravar:.0f} ms)")
+        armazem.fechar()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark de memória das representações de vagas
+Mede (tracemalloc) a memória retida por 10 mil vagas em cada formato:
+dataclass anterior (com __dict__, sem internar), lista de dicionários,
+`Vaga` compacta (__slots__ + strings internadas) e `VagaBatch` colunar.
+
+As strings de cada vaga são criadas novas, como acontece ao extrair do HTML.
+
+Uso: python benchmarks/bench_memoria_vagas.py [quantidade_de_vagas]
+"""
+
+import gc
+import os
+import sys
+import tracemalloc
+from dataclasses import asdict, dataclass, field
+from typing import FrozenSet, List
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from bench_filtros import gerar_vagas  # noqa: E402
+from classificador import classificar  # noqa: E402
+from job_scraper import Vaga  # noqa: E402
+from vaga_batch import VagaBatch  # noqa: E402
+
+
+@dataclass
+class VagaLegado:
+    """Formato anterior: dataclass comum e lista mutável de palavras-chave"""
+    titulo: str
+    empresa: str
+    localizacao: str
+    salario: str
+    descricao: str
+    data_publicacao: str
+    site_origem: str
+    url: str
+    tipo_contrato: str = ""
+    nivel_experiencia: str = ""
+    palavras_chave: List[str] = None
+    modalidade: str = ""
+    tags: FrozenSet[str] = field(default=frozenset(), compare=False, repr=False)
+
+    def __post_init__(self):
+        if self.palavras_chave is None:
+            self.palavras_chave = []
+        self.tags = classificar(self.titulo, self.descricao, self.localizacao, self.tipo_contrato,
+                                self.modalidade, self.nivel_experiencia)
+
+
+def _nova(texto):
+    """Cópia da string em um objeto novo (como o parser devolve)"""
+    return ''.join(list(texto))
+
+
+def linhas_brutas(modelo):
+    campos = ('titulo', 'empresa', 'localizacao', 'salario', 'descricao', 'data_publicacao',
+              'site_origem', 'url', 'tipo_contrato', 'modalidade')
+    for vaga in modelo:
+        yield {c: _nova(getattr(vaga, c)) for c in campos}
+
+
+def medir(construir, modelo):
+    gc.collect()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    objeto = construir(linhas_brutas(modelo))
+    gc.collect()
+    usado = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    del objeto
+    return usado
+
+
+def main():
+    quantidade = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    modelo = gerar_vagas(quantidade)
+
+    formatos = [
+        ('dataclass anterior', lambda linhas: [VagaLegado(**l) for l in linhas]),
+        ('lista de dicts (asdict)', lambda linhas: [asdict(VagaLegado(**l)) for l in linhas]),
+        ('Vaga (__slots__ + intern)', lambda linhas: [Vaga(**l) for l in linhas]),
+        ('VagaBatch (colunar)', lambda linhas: VagaBatch.de_vagas(Vaga(**l) for l in linhas)),
+    ]
+
+    print(f"Memória retida por {quantidade} vagas:")
+    referencia = None
+    for nome, construir in formatos:
+        usado = medir(construir, modelo)
+        referencia = referencia or usado
+        print(f"  {nome:27s}: {usado / 1024 / 1024:7.2f} MiB ({usado / quantidade:6.0f} B/vaga, {usado / referencia:4.0%})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark do custo das métricas
+Mede o custo de uma observação de histograma e de um incremento de contador
+(com e sem disputa entre threads), o custo dos ganchos before/after_request
+do api_server por requisição e o tempo de uma coleta completa de /api/metrics.
+
+Uso: python benchmarks/bench_metricas.py [requisicoes]
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+import timeit
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from metricas import RegistroMetricas  # noqa: E402
+
+
+def por_operacao(funcao, vezes: int = 200000) -> float:
+    """Microssegundos por chamada"""
+    return timeit.timeit(funcao, number=vezes) / vezes * 1e6
+
+
+def com_disputa(funcao, threads: int = 4, vezes: int = 50000) -> float:
+    """Microssegundos por chamada com `threads` threads chamando ao mesmo tempo"""
+    def _trabalho():
+        for _ in range(vezes):
+            funcao()
+    grupo = [threading.Thread(target=_trabalho) for _ in range(threads)]
+    inicio = time.perf_counter()
+    for t in grupo:
+        t.start()
+    for t in grupo:
+        t.join()
+    return (time.perf_counter() - inicio) / (threads * vezes) * 1e6
+
+
+def main():
+    requisicoes = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+    registro = RegistroMetricas()
+    histograma = registro.histograma('bench_segundos', 'bench', ('site',))
+    contador = registro.contador('bench_total', 'bench', ('site', 'status'))
+    print(f"histograma.observar: {por_operacao(lambda: histograma.observar(0.3, 'indeed')):.2f} µs | "
+          f"4 threads: {com_disputa(lambda: histograma.observar(0.3, 'indeed')):.2f} µs")
+    print(f"contador.inc:        {por_operacao(lambda: contador.inc('indeed', '200')):.2f} µs | "
+          f"4 threads: {com_disputa(lambda: contador.inc('indeed', '200')):.2f} µs")
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        import api_server
+        from caixa_saida import CaixaSaida
+        from flask import Response
+
+        api_server.caixa_saida = CaixaSaida(os.path.join(diretorio, 'bench.sqlite3'))
+        app = api_server.app
+        with app.test_request_context('/api/relatorio-fixo/abc', method='GET'):
+            resposta = Response(b'{"success": true}', mimetype='application/json')
+
+            def _ganchos():
+                api_server.iniciar_cronometro()
+                api_server.registrar_metricas(resposta)
+            print(f"ganchos por requisição: {por_operacao(_ganchos, 20000):.1f} µs")
+
+        # Requisição completa pelo test client, alternando com e sem os ganchos
+        cliente = app.test_client()
+        ganchos = (app.before_request_funcs[None], api_server.iniciar_cronometro,
+                   app.after_request_funcs[None], api_server.registrar_metricas)
+
+        def _medir():
+            for _ in range(200):
+                cliente.get('/api/health')
+            inicio = time.perf_counter()
+            for _ in range(requisicoes):
+                cliente.get('/api/health')
+            return (time.perf_counter() - inicio) / requisicoes * 1e6
+
+        sem, com = [], []
+        for _ in range(3):
+            ganchos[0].remove(ganchos[1])
+            ganchos[2].remove(ganchos[3])
+            sem.append(_medir())
+            ganchos[0].append(ganchos[1])
+            ganchos[2].append(ganchos[3])
+            com.append(_medir())
+        print(f"GET /api/health (test client): {min(sem):.0f} µs sem métricas, {min(com):.0f} µs com métricas")
+
+        print(f"coleta completa ({len(api_server.METRICAS.exportar().splitlines())} linhas): "
+              f"{por_operacao(api_server.METRICAS.exportar, 200) / 1000:.2f} ms")
+        api_server.caixa_saida.fechar()
+
+
+if __name__ == '__main__':
+    main()
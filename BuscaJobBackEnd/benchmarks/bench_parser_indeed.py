@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark do parser de listagem do Indeed
+Compara cards/segundo do caminho antigo (BeautifulSoup na árvore inteira +
+`card.find` por campo) com o parser de `parsers.py`, usando a página salva em
+fixtures/indeed_listagem.html.
+
+Uso: python benchmarks/bench_parser_indeed.py [repeticoes]
+"""
+
+import os
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from bs4 import BeautifulSoup  # noqa: E402
+from parsers import PARSERS  # noqa: E402
+
+
+def extrair_legado(html):
+    """Caminho anterior: árvore completa do BeautifulSoup e buscas alternativas por campo"""
+    soup = BeautifulSoup(html, 'lxml')
+    vagas = []
+    for card in soup.find_all('div', class_='job_seen_beacon'):
+        titulo_elem = card.find('h2', class_='jobTitle') or card.find('a', {'data-jk': True})
+        empresa_elem = card.find('span', class_='companyName') or card.find('a', class_='turnstileLink')
+        loc_elem = card.find('div', class_='companyLocation')
+        salary_elem = card.find('span', class_='salary-snippet') or card.find('div', class_='salary-snippet-container')
+        desc_elem = card.find('div', class_='job-snippet') or card.find('ul')
+        link_elem = card.find('a', {'data-jk': True}) or titulo_elem
+        vagas.append({
+            'titulo': titulo_elem.get_text(strip=True) if titulo_elem else None,
+            'empresa': empresa_elem.get_text(strip=True) if empresa_elem else None,
+            'localizacao': loc_elem.get_text(strip=True) if loc_elem else None,
+            'salario': salary_elem.get_text(strip=True) if salary_elem else None,
+            'descricao': desc_elem.get_text(strip=True) if desc_elem else None,
+            'link_href': link_elem.get('href') if link_elem else None,
+        })
+    return vagas
+
+
+def extrair_novo(html):
+    return PARSERS['indeed'].extrair(html)
+
+
+def medir(funcao, html, repeticoes):
+    cards = 0
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        cards += len(funcao(html))
+    return cards / (time.perf_counter() - inicio)
+
+
+def main():
+    repeticoes = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    with open(os.path.join(BENCH_DIR, 'fixtures', 'indeed_listagem.html'), 'rb') as f:
+        html = f.read()
+
+    # Os dois caminhos devem extrair os mesmos campos
+    legado, novo = extrair_legado(html), extrair_novo(html)
+    assert len(legado) == len(novo), (len(legado), len(novo))
+    for antigo, atual in zip(legado, novo):
+        for campo, valor in antigo.items():
+            assert atual.get(campo) == valor, (campo, valor, atual.get(campo))
+
+    taxa_legado = medir(extrair_legado, html, repeticoes)
+    taxa_novo = medir(extrair_novo, html, repeticoes)
+    print(f"Cards por página: {len(novo)} | repetições: {repeticoes}")
+    print(f"BeautifulSoup + card.find : {taxa_legado:10.0f} cards/s")
+    print(f"parsers.PARSERS['indeed'] : {taxa_novo:10.0f} cards/s ({taxa_novo / taxa_legado:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+BuscaJob - Caixa de saída de e-mails
+Mensagens enfileiradas em SQLite (mesmo arquivo do armazém de resultados) e
+entregues por uma thread própria: quem gera o relatório só enfileira e nunca
+espera pelo servidor SMTP.
+
+- a conexão SMTP (com STARTTLS e login) é reaproveitada entre mensagens e
+  fechada depois de `ocioso` segundos sem envio
+- falhas temporárias são repetidas com espera exponencial (com jitter) até
+  `max_tentativas`; recusas definitivas (5xx de remetente, destinatário ou
+  dados) marcam a mensagem como falha na hora
+- anexos ainda não compactados são enviados com gzip
+- mensagens pendentes sobrevivem a reinícios e são enviadas quando a thread
+  volta a rodar (ou por `enviar_pendentes()`, em scripts de execução única)
+"""
+
+import gzip
+import logging
+import os
+import random
+import smtplib
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from email.message import EmailMessage
+from email.utils import formatdate, make_msgid
+from typing import Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Estados de uma mensagem
+PENDENTE = 'pendente'
+ENVIADO = 'enviado'
+FALHOU = 'falhou'
+
+_ESQUEMA = (
+    'CREATE TABLE IF NOT EXISTS emails ('
+    ' id INTEGER PRIMARY KEY, assunto TEXT NOT NULL, remetente TEXT NOT NULL, destinatarios TEXT NOT NULL,'
+    ' mensagem BLOB NOT NULL, status TEXT NOT NULL, tentativas INTEGER NOT NULL DEFAULT 0,'
+    ' proxima_tentativa REAL NOT NULL, criado_em TEXT NOT NULL, enviado_em TEXT, erro TEXT)',
+    'CREATE INDEX IF NOT EXISTS idx_emails_pendentes ON emails (proxima_tentativa) WHERE status = \'pendente\'',
+)
+
+_COLUNAS = 'id, assunto, destinatarios, status, tentativas, proxima_tentativa, criado_em, enviado_em, erro'
+
+# Extensão -> subtipo MIME dos anexos já compactados (enviados como estão)
+_SUBTIPOS_COMPACTADOS = {'.gz': 'gzip', '.zst': 'zstd'}
+
+
+@dataclass
+class ConfigSMTP:
+    host: str
+    porta: int = 587
+    usuario: str = ''
+    senha: str = ''
+    remetente: str = ''
+    destinatarios: Tuple[str, ...] = ()
+    starttls: bool = True
+    timeout: float = 30
+
+    @classmethod
+    def do_ambiente(cls) -> 'ConfigSMTP':
+        """
+        SMTP_HOST/SMTP_PORT/SMTP_USER/SMTP_PASS/EMAIL_FROM/EMAIL_TO (vários
+        destinatários separados por vírgula) e SMTP_STARTTLS (padrão 1).
+        Usuário e senha são opcionais (relay local sem autenticação)
+        """
+        config = cls(
+            host=os.environ.get('SMTP_HOST', ''),
+            porta=int(os.environ.get('SMTP_PORT', '587')),
+            usuario=os.environ.get('SMTP_USER', ''),
+            senha=os.environ.get('SMTP_PASS', ''),
+            remetente=os.environ.get('EMAIL_FROM', ''),
+            destinatarios=tuple(e.strip() for e in os.environ.get('EMAIL_TO', '').split(',') if e.strip()),
+            starttls=os.environ.get('SMTP_STARTTLS', '1').lower() in ('1', 'true', 'yes'),
+        )
+        if not (config.host and config.remetente and config.destinatarios):
+            raise RuntimeError("Configuração de email incompleta (SMTP_HOST/EMAIL_FROM/EMAIL_TO)")
+        return config
+
+
+def anexo_compactado(caminho: str) -> Tuple[bytes, str, str]:
+    """(dados, subtipo MIME, nome do anexo); arquivos ainda não compactados seguem em gzip"""
+    with open(caminho, 'rb') as f:
+        dados = f.read()
+    nome = os.path.basename(caminho)
+    subtipo = _SUBTIPOS_COMPACTADOS.get(os.path.splitext(nome)[1])
+    if subtipo:
+        return dados, subtipo, nome
+    return gzip.compress(dados, compresslevel=6), 'gzip', nome + '.gz'
+
+
+def _permanente(erro: Exception) -> bool:
+    """Recusa que não muda ao tentar de novo (5xx de remetente, destinatários ou dados)"""
+    if isinstance(erro, smtplib.SMTPRecipientsRefused):
+        return True
+    return (isinstance(erro, (smtplib.SMTPSenderRefused, smtplib.SMTPDataError))
+            and 500 <= erro.smtp_code < 600)
+
+
+class CaixaSaida:
+    """Fila persistente de e-mails com entrega em segundo plano"""
+
+    def __init__(self, caminho: str, config: Optional[ConfigSMTP] = None, max_tentativas: int = 6,
+                 espera_base: float = 30, espera_maxima: float = 3600, ocioso: float = 60,
+                 nome: str = 'buscajob-email'):
+        self.caminho = caminho
+        # None: configuração lida do ambiente a cada uso (ConfigSMTP.do_ambiente)
+        self.config = config
+        self.max_tentativas = max_tentativas
+        self.espera_base = espera_base
+        self.espera_maxima = espera_maxima
+        self.ocioso = ocioso
+        self.nome = nome
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(caminho, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        for comando in _ESQUEMA:
+            self._conn.execute(comando)
+        # Um envio por vez (thread ou enviar_pendentes), sobre a mesma conexão SMTP
+        self._lock_envio = threading.Lock()
+        self._smtp: Optional[smtplib.SMTP] = None
+        self._ultimo_uso = 0.0
+        self._condicao = threading.Condition()
+        self._novas = False
+        self._parar = False
+        self._thread: Optional[threading.Thread] = None
+
+    def _config(self) -> ConfigSMTP:
+        return self.config or ConfigSMTP.do_ambiente()
+
+    def enfileirar(self, assunto: str, corpo: str, anexos: Sequence[str] = ()) -> int:
+        """
+        Monta a mensagem (anexos compactados) e a grava como pendente; retorna o
+        id. Levanta RuntimeError se a configuração de e-mail estiver incompleta
+        """
+        config = self._config()
+        msg = EmailMessage()
+        msg['Subject'] = assunto
+        msg['From'] = config.remetente
+        msg['To'] = ', '.join(config.destinatarios)
+        msg['Date'] = formatdate(localtime=True)
+        # Message-ID fixo: uma repetição após falha parcial é reconhecida pelo destinatário
+        msg['Message-ID'] = make_msgid(domain=config.remetente.rpartition('@')[2] or None)
+        msg.set_content(corpo)
+        for caminho in anexos:
+            dados, subtipo, nome = anexo_compactado(caminho)
+            msg.add_attachment(dados, maintype='application', subtype=subtipo, filename=nome)
+        with self._lock:
+            email_id = self._conn.execute(
+                'INSERT INTO emails (assunto, remetente, destinatarios, mensagem, status, proxima_tentativa,'
+                ' criado_em) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (assunto, config.remetente, ','.join(config.destinatarios), msg.as_bytes(), PENDENTE,
+                 time.time(), datetime.now().isoformat()),
+            ).lastrowid
+        with self._condicao:
+            self._novas = True
+            self._condicao.notify()
+        return email_id
+
+    @staticmethod
+    def _de_linha(row) -> Optional[Dict]:
+        if row is None:
+            return None
+        return {'id': row[0], 'assunto': row[1], 'destinatarios': row[2].split(','), 'status': row[3],
+                'tentativas': row[4], 'proxima_tentativa': datetime.fromtimestamp(row[5]).isoformat(),
+                'criado_em': row[6], 'enviado_em': row[7], 'erro': row[8]}
+
+    def obter(self, email_id: int) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute(f'SELECT {_COLUNAS} FROM emails WHERE id = ?', (email_id,)).fetchone()
+        return self._de_linha(row)
+
+    def listar(self, status: Optional[str] = None, limite: int = 50) -> List[Dict]:
+        sql, parametros = f'SELECT {_COLUNAS} FROM emails', []
+        if status is not None:
+            sql += ' WHERE status = ?'
+            parametros.append(status)
+        sql += ' ORDER BY id DESC LIMIT ?'
+        parametros.append(limite)
+        with self._lock:
+            rows = self._conn.execute(sql, parametros).fetchall()
+        return [self._de_linha(row) for row in rows]
+
+    def contar(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._conn.execute('SELECT status, COUNT(*) FROM emails GROUP BY status').fetchall())
+
+    # ------------------------------------------------------------------
+    # Entrega
+    # ------------------------------------------------------------------
+
+    def _conectar(self, config: ConfigSMTP) -> smtplib.SMTP:
+        smtp = smtplib.SMTP(config.host, config.porta, timeout=config.timeout)
+        try:
+            if config.starttls:
+                smtp.starttls()
+            if config.usuario:
+                smtp.login(config.usuario, config.senha)
+        except Exception:
+            smtp.close()
+            raise
+        return smtp
+
+    def _fechar_smtp(self):
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except OSError:
+                # SMTPException é OSError: servidor que já caiu ou não responde ao QUIT
+                pass
+            finally:
+                self._smtp.close()
+                self._smtp = None
+
+    def _entregar(self, remetente: str, destinatarios: List[str], mensagem: bytes):
+        """Envia pela conexão aberta; se o servidor a derrubou enquanto ociosa, reconecta uma vez"""
+        config = self._config()
+        for tentativa in (1, 2):
+            if self._smtp is None:
+                self._smtp = self._conectar(config)
+            try:
+                self._smtp.sendmail(remetente, destinatarios, mensagem)
+                self._ultimo_uso = time.monotonic()
+                return
+            except smtplib.SMTPServerDisconnected:
+                self._smtp.close()
+                self._smtp = None
+                if tentativa == 2:
+                    raise
+
+    def _registrar_falha(self, email_id: int, tentativas: int, erro: Exception):
+        tentativas += 1
+        if _permanente(erro) or tentativas >= self.max_tentativas:
+            status, proxima = FALHOU, time.time()
+            logger.error(f"E-mail {email_id} não enviado após {tentativas} tentativa(s): {erro}")
+        else:
+            espera = min(self.espera_maxima, self.espera_base * 2 ** (tentativas - 1)) * random.uniform(0.8, 1.2)
+            status, proxima = PENDENTE, time.time() + espera
+            logger.warning(f"E-mail {email_id}: falha no envio ({erro}); nova tentativa em {espera:.0f}s")
+        with self._lock:
+            self._conn.execute(
+                'UPDATE emails SET status = ?, tentativas = ?, proxima_tentativa = ?, erro = ? WHERE id = ?',
+                (status, tentativas, proxima, str(erro), email_id),
+            )
+
+    def enviar_pendentes(self) -> Dict[str, int]:
+        """
+        Entrega todas as mensagens vencidas na thread atual, reaproveitando a
+        conexão; retorna {'enviados', 'falhas', 'proxima_em'} (segundos até a
+        próxima pendente, ou None)
+        """
+        enviados = falhas = 0
+        with self._lock_envio:
+            while True:
+                with self._lock:
+                    rows = self._conn.execute(
+                        'SELECT id, remetente, destinatarios, mensagem, tentativas FROM emails'
+                        ' WHERE status = ? AND proxima_tentativa <= ? ORDER BY proxima_tentativa LIMIT 20',
+                        (PENDENTE, time.time()),
+                    ).fetchall()
+                if not rows:
+                    break
+                for email_id, remetente, destinatarios, mensagem, tentativas in rows:
+                    try:
+                        self._entregar(remetente, destinatarios.split(','), mensagem)
+                    except Exception as e:
+                        # Conexão em estado incerto depois de um erro: a próxima mensagem abre outra
+                        self._fechar_smtp()
+                        self._registrar_falha(email_id, tentativas, e)
+                        falhas += 1
+                        continue
+                    with self._lock:
+                        self._conn.execute(
+                            'UPDATE emails SET status = ?, tentativas = ?, enviado_em = ?, erro = NULL WHERE id = ?',
+                            (ENVIADO, tentativas + 1, datetime.now().isoformat(), email_id),
+                        )
+                    enviados += 1
+            with self._lock:
+                proxima = self._conn.execute(
+                    'SELECT MIN(proxima_tentativa) FROM emails WHERE status = ?', (PENDENTE,)
+                ).fetchone()[0]
+        if enviados or falhas:
+            logger.info(f"Caixa de saída: {enviados} e-mail(s) enviados, {falhas} falha(s)")
+        return {'enviados': enviados, 'falhas': falhas,
+                'proxima_em': None if proxima is None else max(0.0, proxima - time.time())}
+
+    def _laco(self):
+        while True:
+            with self._condicao:
+                if self._parar:
+                    break
+                self._novas = False
+            try:
+                proxima_em = self.enviar_pendentes()['proxima_em']
+            except Exception:
+                logger.exception("Caixa de saída: erro inesperado no envio")
+                proxima_em = self.espera_base
+            with self._condicao:
+                if not self._novas and not self._parar:
+                    self._condicao.wait(timeout=min(self.ocioso, proxima_em if proxima_em is not None else self.ocioso))
+            if self._smtp is not None and time.monotonic() - self._ultimo_uso >= self.ocioso:
+                with self._lock_envio:
+                    self._fechar_smtp()
+        with self._lock_envio:
+            self._fechar_smtp()
+
+    def iniciar(self):
+        """Inicia a thread de envio (idempotente)"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._parar = False
+        self._thread = threading.Thread(target=self._laco, name=self.nome, daemon=True)
+        self._thread.start()
+
+    def parar(self, timeout: Optional[float] = None):
+        with self._condicao:
+            self._parar = True
+            self._condicao.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def fechar(self):
+        self.parar()
+        with self._lock_envio:
+            self._fechar_smtp()
+        with self._lock:
+            self._conn.close()
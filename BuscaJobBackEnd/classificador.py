@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+BuscaJob - Classificador de vagas por palavras-chave
+Todas as listas de palavras (tipo de contrato, modalidade e nível) são
+compiladas em uma única expressão regular; o texto da vaga é normalizado
+(minúsculas, sem acentos) e percorrido uma única vez.
+
+O resultado é um conjunto de tags:
+- 'tipo:<TIPO>'        indicação forte do tipo de contrato (ex.: 'tipo:CLT')
+- 'indicio:<TIPO>'     indicação fraca, usada só para filtrar (ex.: "contrato")
+- 'modalidade:<MOD>'   HOME OFFICE | HIBRIDO | PRESENCIAL
+- 'nivel:<NIVEL>'      ESTAGIO | TRAINEE | JUNIOR | PLENO | SENIOR | ...
+"""
+
+import re
+from typing import Dict, FrozenSet, Optional
+
+from result_cache import normalizar_texto
+
+# Tipos de contrato em ordem de prioridade: (rótulo exibido, palavras fortes, indícios)
+TIPOS_CONTRATO = {
+    'CLT': ('CLT', ('clt', 'carteira', 'efetivo'), ('contrato',)),
+    'PJ': ('PJ', ('pj', 'pessoa juridica', 'cnpj'), ('prestador',)),
+    'ESTAGIO': ('Estágio', ('estagio', 'estagiario', 'trainee'), ()),
+    'FREELANCER': ('Freelancer', ('freelancer', 'freela', 'autonomo'), ('projeto',)),
+    'TEMPORARIO': ('Temporário', ('temporari', 'temporary', 'temp'), ('sazonal',)),
+    'TERCEIRIZADO': ('Terceirizado', ('terceirizado', 'outsourcing'), ()),
+}
+
+# Palavras que, como prefixo, casariam palavras comuns ("temp" em "tempo integral")
+PALAVRAS_INTEIRAS = frozenset({'temp'})
+
+# Modalidades em ordem de prioridade: (rótulo exibido, rótulo normalizado legado, palavras)
+MODALIDADES = {
+    'HOME OFFICE': ('Home office', 'HOME OFFICE', ('home office', 'home-office', 'remoto', 'remota')),
+    'HIBRIDO': ('Híbrido', 'HÍBRIDO', ('hibrido', 'hibrida')),
+    'PRESENCIAL': ('Presencial', 'PRESENCIAL', ('presencial',)),
+}
+
+# Níveis: palavras inteiras (evita casar "sr" dentro de outras palavras)
+NIVEIS = {
+    'ESTAGIO': ('estagio', 'estagiario'),
+    'TRAINEE': ('trainee',),
+    'JUNIOR': ('junior', 'jr'),
+    'PLENO': ('pleno',),
+    'SENIOR': ('senior', 'sr'),
+    'ESPECIALISTA': ('especialista',),
+    'LIDERANCA': ('lead', 'lider', 'tech lead', 'founding'),
+    'GESTAO': ('coordenador', 'gerente', 'head'),
+}
+
+
+def _compilar():
+    """Monta a regex única; cada palavra vira um grupo nomeado mapeado para suas tags"""
+    palavras = {}
+
+    def _adicionar(palavra, padrao, tag):
+        # A mesma palavra pode indicar mais de uma tag (ex.: "trainee" é tipo e nível);
+        # prevalece o primeiro padrão registrado
+        palavras.setdefault(palavra, (padrao, []))[1].append(tag)
+
+    for tipo, (_, fortes, indicios) in TIPOS_CONTRATO.items():
+        # Prefixo de palavra ("temporari" casa "temporário" e "temporária", "freela" casa
+        # "freelancer"), salvo as de PALAVRAS_INTEIRAS
+        for prefixo, termos in (('tipo', fortes), ('indicio', indicios)):
+            for p in termos:
+                fim = r'\b' if p in PALAVRAS_INTEIRAS else ''
+                _adicionar(p, rf'\b{re.escape(p)}{fim}', f'{prefixo}:{tipo}')
+    for mod, (_, _, termos) in MODALIDADES.items():
+        for p in termos:
+            _adicionar(p, re.escape(p), f'modalidade:{mod}')
+    for nivel, termos in NIVEIS.items():
+        for p in termos:
+            _adicionar(p, rf'\b{re.escape(p)}\b', f'nivel:{nivel}')
+
+    # Palavras mais longas primeiro, para a alternância preferir o casamento mais específico
+    grupos = {}
+    partes = []
+    for i, palavra in enumerate(sorted(palavras, key=len, reverse=True)):
+        padrao, tags = palavras[palavra]
+        grupos[f'g{i}'] = tuple(tags)
+        partes.append(f'(?P<g{i}>{padrao})')
+    return re.compile('|'.join(partes)), grupos
+
+
+_REGEX, _TAGS_GRUPO = _compilar()
+_SEPARADOR = ' \x00 '
+
+
+def _varrer(texto: str) -> set:
+    tags = set()
+    for m in _REGEX.finditer(texto):
+        tags.update(_TAGS_GRUPO[m.lastgroup])
+    return tags
+
+
+def normalizar_tipo(valor: Optional[str]) -> str:
+    """'Estágio' -> 'ESTAGIO', 'pj' -> 'PJ' (valores desconhecidos só em maiúsculas sem acento)"""
+    return normalizar_texto(valor or '').upper()
+
+
+def normalizar_modalidade(valor: Optional[str]) -> str:
+    """Modalidade canônica (HOME OFFICE | HIBRIDO | PRESENCIAL) de um texto livre, ou ''"""
+    if not valor:
+        return ''
+    return modalidade_canonica(_varrer(normalizar_texto(valor)))
+
+
+def classificar(titulo: str, descricao: str, localizacao: str = '', tipo_contrato: str = '',
+                modalidade: str = '', nivel_experiencia: str = '') -> FrozenSet[str]:
+    """
+    Classifica uma vaga em uma única varredura do texto normalizado
+
+    Tipo e nível vêm de título/descrição/campos da vaga; a modalidade também
+    considera a localização, salvo quando informada explicitamente.
+    """
+    principal = normalizar_texto(f"{titulo} {descricao} {tipo_contrato} {nivel_experiencia}")
+    local = normalizar_texto(localizacao or '')
+    tags = _varrer(f"{principal}{_SEPARADOR}{local}") if local else _varrer(principal)
+
+    if tipo_contrato:
+        tags.add(f'tipo:{normalizar_tipo(tipo_contrato)}')
+
+    # Uma única modalidade por vaga, pela ordem de prioridade
+    encontradas = {t for t in tags if t.startswith('modalidade:')}
+    tags -= encontradas
+    if modalidade:
+        mod = normalizar_modalidade(modalidade)
+    else:
+        mod = modalidade_canonica(encontradas)
+        if not mod and local == 'remoto':
+            mod = 'HOME OFFICE'
+    if mod:
+        tags.add(f'modalidade:{mod}')
+
+    return frozenset(tags)
+
+
+# Poucas combinações de tags se repetem em milhares de vagas: uma instância por combinação
+_TAGS_INTERNADAS: Dict[FrozenSet[str], FrozenSet[str]] = {}
+
+
+def internar_tags(tags: FrozenSet[str]) -> FrozenSet[str]:
+    """Retorna a instância compartilhada do conjunto de tags"""
+    tags = frozenset(tags)
+    return _TAGS_INTERNADAS.setdefault(tags, tags)
+
+
+def tipo_principal(tags: FrozenSet[str]) -> str:
+    """Rótulo do tipo de contrato de maior prioridade com indicação forte, ou ''"""
+    for tipo, (rotulo, _, _) in TIPOS_CONTRATO.items():
+        if f'tipo:{tipo}' in tags:
+            return rotulo
+    return ''
+
+
+def modalidade_canonica(tags: FrozenSet[str]) -> str:
+    """Modalidade canônica (HOME OFFICE | HIBRIDO | PRESENCIAL) da vaga, ou ''"""
+    return next((m for m in MODALIDADES if f'modalidade:{m}' in tags), '')
+
+
+def modalidade_de(tags: FrozenSet[str]) -> str:
+    """Rótulo exibido da modalidade ('Home office', 'Híbrido', 'Presencial'), ou ''"""
+    for mod, (rotulo, _, _) in MODALIDADES.items():
+        if f'modalidade:{mod}' in tags:
+            return rotulo
+    return ''
+
+
+def aceita_tipo(tags: FrozenSet[str], tipos_aceitos) -> bool:
+    """True se a vaga tem indicação (forte ou fraca) de algum dos tipos aceitos (já normalizados)"""
+    return any(f'tipo:{t}' in tags or f'indicio:{t}' in tags for t in tipos_aceitos)
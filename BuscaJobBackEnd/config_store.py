@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+BuscaJob - Armazém de configurações de busca
+Configurações salvas em SQLite (mesmo arquivo do armazém de resultados), com
+ids únicos mesmo sob gravações simultâneas, escrita atômica por transação e
+índices por dono, cargo (normalizado) e data de atualização. As
+configurações ativas são percorridas em lotes por chave (`iterar_ativas`),
+sem carregar a tabela inteira.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import uuid
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+from result_cache import normalizar_texto
+
+logger = logging.getLogger(__name__)
+
+_ESQUEMA = (
+    'CREATE TABLE IF NOT EXISTS configuracoes ('
+    ' seq INTEGER PRIMARY KEY AUTOINCREMENT, id TEXT NOT NULL UNIQUE, dono TEXT NOT NULL DEFAULT \'\','
+    ' cargo TEXT NOT NULL DEFAULT \'\', config TEXT NOT NULL, ativa INTEGER NOT NULL DEFAULT 1,'
+    ' criada_em TEXT NOT NULL, atualizada_em TEXT NOT NULL)',
+    'CREATE INDEX IF NOT EXISTS idx_config_dono ON configuracoes (dono, atualizada_em)',
+    'CREATE INDEX IF NOT EXISTS idx_config_cargo ON configuracoes (cargo, atualizada_em)',
+    'CREATE INDEX IF NOT EXISTS idx_config_atualizada ON configuracoes (atualizada_em)',
+    'CREATE INDEX IF NOT EXISTS idx_config_ativas ON configuracoes (seq) WHERE ativa = 1',
+)
+
+_COLUNAS = 'id, dono, cargo, config, ativa, criada_em, atualizada_em'
+
+
+def novo_id_configuracao() -> str:
+    """Id legível e ordenável por data, com sufixo aleatório para não colidir no mesmo segundo"""
+    return f"config_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+
+
+class ArmazemConfiguracoes:
+    """Configurações de busca salvas; seguro para uso entre threads"""
+
+    def __init__(self, caminho: str):
+        self.caminho = caminho
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(caminho, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        for comando in _ESQUEMA:
+            self._conn.execute(comando)
+
+    @staticmethod
+    def _de_linha(row) -> Optional[Dict]:
+        if row is None:
+            return None
+        # `timestamp` mantém o formato antigo de /api/configuracoes
+        return {'id': row[0], 'dono': row[1], 'cargo': row[2], 'config': json.loads(row[3]), 'ativa': bool(row[4]),
+                'criada_em': row[5], 'atualizada_em': row[6], 'timestamp': row[6]}
+
+    def salvar(self, config: Dict, dono: str = '', ativa: bool = True, config_id: Optional[str] = None) -> Dict:
+        """Insere uma configuração (ou substitui a de `config_id`, preservando a criação) e a retorna"""
+        agora = datetime.now().isoformat()
+        config_id = config_id or novo_id_configuracao()
+        cargo = normalizar_texto(str(config.get('cargo') or ''))
+        with self._lock:
+            self._conn.execute(
+                f'INSERT INTO configuracoes ({_COLUNAS}) VALUES (?, ?, ?, ?, ?, ?, ?)'
+                ' ON CONFLICT(id) DO UPDATE SET dono = excluded.dono, cargo = excluded.cargo,'
+                ' config = excluded.config, ativa = excluded.ativa, atualizada_em = excluded.atualizada_em',
+                (config_id, dono or '', cargo, json.dumps(config, ensure_ascii=False), int(ativa), agora, agora),
+            )
+        return self.obter(config_id)
+
+    def obter(self, config_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute(f'SELECT {_COLUNAS} FROM configuracoes WHERE id = ?', (config_id,)).fetchone()
+        return self._de_linha(row)
+
+    def definir_ativa(self, config_id: str, ativa: bool) -> bool:
+        with self._lock:
+            cursor = self._conn.execute(
+                'UPDATE configuracoes SET ativa = ?, atualizada_em = ? WHERE id = ?',
+                (int(ativa), datetime.now().isoformat(), config_id),
+            )
+        return cursor.rowcount > 0
+
+    def remover(self, config_id: str) -> bool:
+        with self._lock:
+            cursor = self._conn.execute('DELETE FROM configuracoes WHERE id = ?', (config_id,))
+        return cursor.rowcount > 0
+
+    def listar(self, dono: Optional[str] = None, cargo: Optional[str] = None, ativa: Optional[bool] = None,
+               limite: Optional[int] = None, offset: int = 0) -> List[Dict]:
+        """Configurações da mais recente para a mais antiga (por atualização), com filtros indexados"""
+        condicoes, parametros = [], []
+        if dono is not None:
+            condicoes.append('dono = ?')
+            parametros.append(dono)
+        if cargo:
+            condicoes.append('cargo = ?')
+            parametros.append(normalizar_texto(cargo))
+        if ativa is not None:
+            condicoes.append('ativa = ?')
+            parametros.append(int(ativa))
+        sql = f'SELECT {_COLUNAS} FROM configuracoes'
+        if condicoes:
+            sql += ' WHERE ' + ' AND '.join(condicoes)
+        sql += ' ORDER BY atualizada_em DESC, seq DESC'
+        if limite is not None:
+            sql += ' LIMIT ? OFFSET ?'
+            parametros.extend([limite, offset])
+        with self._lock:
+            rows = self._conn.execute(sql, parametros).fetchall()
+        return [self._de_linha(row) for row in rows]
+
+    def contar(self, ativa: Optional[bool] = None) -> int:
+        sql, parametros = 'SELECT COUNT(*) FROM configuracoes', []
+        if ativa is not None:
+            sql += ' WHERE ativa = ?'
+            parametros.append(int(ativa))
+        with self._lock:
+            return self._conn.execute(sql, parametros).fetchone()[0]
+
+    def iterar_ativas(self, lote: int = 500) -> Iterator[Dict]:
+        """
+        Todas as configurações ativas, em ordem de criação, lidas em lotes de
+        `lote` pelo índice parcial (seq > último visto): o lock não fica preso
+        enquanto o chamador processa cada lote
+        """
+        ultimo = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    f'SELECT seq, {_COLUNAS} FROM configuracoes WHERE ativa = 1 AND seq > ? ORDER BY seq LIMIT ?',
+                    (ultimo, lote),
+                ).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield self._de_linha(row[1:])
+            ultimo = rows[-1][0]
+
+    def importar_json(self, caminho: str) -> int:
+        """Migra o `configuracoes.json` antigo ({id: {id, config, timestamp}}) para um armazém vazio"""
+        if self.contar() or not os.path.exists(caminho):
+            return 0
+        try:
+            with open(caminho, 'r', encoding='utf-8') as f:
+                dados = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Falha ao importar {os.path.basename(caminho)}: {e}")
+            return 0
+        itens = sorted(dados.values(), key=lambda item: item.get('timestamp') or '')
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                for item in itens:
+                    config = item.get('config') or {}
+                    quando = item.get('timestamp') or datetime.now().isoformat()
+                    self._conn.execute(
+                        f'INSERT OR IGNORE INTO configuracoes ({_COLUNAS}) VALUES (?, ?, ?, ?, 1, ?, ?)',
+                        (item.get('id') or novo_id_configuracao(), '', normalizar_texto(str(config.get('cargo') or '')),
+                         json.dumps(config, ensure_ascii=False), quando, quando),
+                    )
+                self._conn.execute('COMMIT')
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+        logger.info(f"{len(itens)} configuração(ões) importadas de {os.path.basename(caminho)}")
+        return len(itens)
+
+    def fechar(self):
+        with self._lock:
+            self._conn.close()
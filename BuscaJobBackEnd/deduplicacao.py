@@ -0,0 +1,419 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+BuscaJob - Detecção de vagas quase duplicadas entre sites
+A mesma vaga publicada em vários sites costuma vir com pequenas diferenças no
+título ou na grafia da empresa. Cada vaga vira dois conjuntos de shingles
+(título + localização e empresa, normalizados); assinaturas MinHash agrupadas
+em bandas (LSH) apontam os pares candidatos sem comparar todos com todos, e
+cada candidato é confirmado pela similaridade de Jaccard exata do título.
+
+A empresa normalizada (sem sufixos societários, acentos, caixa e espaços)
+precisa ser igual: nomes que diferem só por um número ou termo curto
+("Empresa 1" x "Empresa 2") são empregadores diferentes, e aproximá-los
+mesclaria vagas distintas. Um nome feito só de termos genéricos ("Consultoria
+Tech") mantém esses termos, em vez de virar vazio e coincidir com outros assim.
+
+O custo é aproximadamente linear no número de vagas. Vagas do mesmo grupo
+são mescladas em um único registro com as URLs de todas as fontes.
+"""
+
+import random
+import re
+import zlib
+from dataclasses import replace
+from functools import lru_cache
+from itertools import chain
+from typing import Callable, Dict, FrozenSet, Iterator, List, Sequence, Tuple
+
+from result_cache import normalizar_texto
+
+# Sufixos societários, termos genéricos de nomes de empresa e palavras vazias que não distinguem vagas
+_SUFIXOS_EMPRESA = frozenset({
+    'ltda', 'sa', 'me', 'epp', 'eireli', 'inc', 'llc', 'ltd', 'corp', 'grupo', 'group', 'brasil', 'do',
+    'tecnologia', 'tech', 'digital', 'sistemas', 'software', 'consultoria', 'solucoes', 'servicos',
+    'informatica', 'labs',
+})
+# Só os sufixos societários: o que resta quando o nome inteiro é feito de termos genéricos
+_SUFIXOS_SOCIETARIOS = frozenset({'ltda', 'sa', 'me', 'epp', 'eireli', 'inc', 'llc', 'ltd', 'corp'})
+# Termos genéricos que às vezes vêm colados ao nome ("VinxaTech", "CoxaGroup")
+_SUFIXOS_COLADOS = tuple(sorted((p for p in _SUFIXOS_EMPRESA if len(p) >= 4), key=len, reverse=True))
+# Abreviações comuns em títulos
+_SINONIMOS = {
+    'jr': 'junior', 'sr': 'senior', 'pl': 'pleno', 'dev': 'desenvolvedor', 'desenvolvedora': 'desenvolvedor',
+    'eng': 'engenheiro', 'engenheira': 'engenheiro', 'estagiaria': 'estagiario',
+}
+_PALAVRAS_VAZIAS = frozenset({'de', 'da', 'do', 'das', 'dos', 'e', 'em', 'para', 'a', 'o', 'com', 'vaga', 'oportunidade'})
+_NAO_ALFANUMERICO = re.compile(r'[^a-z0-9]+')
+_SA = re.compile(r'\bs a\b')
+
+_MASCARA_64 = (1 << 64) - 1
+# Vagas por bloco no cálculo vetorizado das assinaturas (limita a matriz shingles x permutações)
+_BLOCO_ASSINATURAS = 1024
+
+
+@lru_cache(maxsize=65536)
+def _normalizar(valor: str, descartar: FrozenSet[str] = frozenset()) -> str:
+    palavras = _NAO_ALFANUMERICO.sub(' ', normalizar_texto(valor)).split()
+    return ' '.join(p for p in palavras if p not in descartar)
+
+
+@lru_cache(maxsize=65536)
+def _normalizar_titulo(valor: str) -> str:
+    # "Desenvolvedor(a) Python Sr." -> "desenvolvedor python senior"
+    return ' '.join(_SINONIMOS.get(p, p) for p in _normalizar(valor, _PALAVRAS_VAZIAS).split())
+
+
+@lru_cache(maxsize=65536)
+def _normalizar_empresa(valor: str) -> str:
+    # "Nubank S.A." -> "nubank", "Grupo Boticário Ltda" -> "boticario", "VinxaTech" -> "vinxa"
+    completas = _SA.sub(' ', _normalizar(valor)).split()
+    palavras = [p for p in completas if p not in _SUFIXOS_EMPRESA]
+    if not palavras:
+        # Nome só de termos genéricos ("Consultoria Tech", "Grupo Software Ltda"): sem eles sobraria
+        # '', igual ao de qualquer outra empresa assim; mantém o nome sem os sufixos societários
+        return ' '.join(p for p in completas if p not in _SUFIXOS_SOCIETARIOS) or ' '.join(completas)
+    ultima = palavras[-1]
+    sufixo = next((s for s in _SUFIXOS_COLADOS if ultima.endswith(s) and len(ultima) - len(s) >= 3), None)
+    if sufixo:
+        palavras[-1] = ultima[:-len(sufixo)]
+    return ' '.join(palavras)
+
+
+def chave_exata(vaga) -> tuple:
+    """Título e empresa normalizados: vagas com a mesma chave são sempre duplicatas"""
+    return _chave(vaga.titulo, vaga.empresa)
+
+
+def _chave(titulo: str, empresa: str) -> tuple:
+    return _normalizar_titulo(titulo or ''), _normalizar_empresa(empresa or '')
+
+
+@lru_cache(maxsize=65536)
+def _shingles_texto(texto: str, prefixo: str, tamanho: int) -> FrozenSet[int]:
+    if not texto:
+        return frozenset()
+    texto = f' {texto} '
+    return frozenset(zlib.crc32(f'{prefixo}{texto[i:i + tamanho]}'.encode())
+                     for i in range(max(1, len(texto) - tamanho + 1)))
+
+
+@lru_cache(maxsize=4096)
+def _shingles_local(localizacao: str) -> FrozenSet[int]:
+    return frozenset(zlib.crc32(f'l{palavra}'.encode()) for palavra in _normalizar(localizacao).split())
+
+
+def shingles(vaga, tamanho: int = 3, usar_localizacao: bool = True) -> Tuple[FrozenSet[int], FrozenSet[int], str]:
+    """Shingles de uma vaga (ver `shingles_campos`)"""
+    return shingles_campos(vaga.titulo, vaga.empresa, vaga.localizacao, tamanho, usar_localizacao)
+
+
+def shingles_campos(titulo: str, empresa: str, localizacao: str, tamanho: int = 3,
+                    usar_localizacao: bool = True) -> Tuple[FrozenSet[int], FrozenSet[int], str]:
+    """
+    Shingles (hash de 32 bits) da vaga: (trigramas do título + palavras da
+    localização, trigramas da empresa, empresa normalizada sem espaços). A
+    empresa fica separada para que um título comum ("analista de dados") não
+    aproxime vagas de empresas diferentes; sem espaços, "Vinxa Tech" e
+    "VinxaTech" têm os mesmos trigramas e caem nos mesmos baldes.
+    """
+    titulo, empresa = _chave(titulo, empresa)
+    empresa = empresa.replace(' ', '')
+    cargo = _shingles_texto(titulo, 't', tamanho)
+    if usar_localizacao:
+        cargo = cargo | _shingles_local(localizacao or '')
+    return cargo, _shingles_texto(empresa, 'e', tamanho), empresa
+
+
+def _niveis(vaga) -> FrozenSet[str]:
+    return _niveis_tags(getattr(vaga, 'tags', ()))
+
+
+def _niveis_tags(tags) -> FrozenSet[str]:
+    return frozenset(t for t in tags or () if t.startswith('nivel:'))
+
+
+def jaccard(a: FrozenSet[int], b: FrozenSet[int]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class _UniaoBusca:
+    """Union-find cujo representante de cada grupo é o menor índice (primeira ocorrência)"""
+
+    def __init__(self, n: int):
+        self.pai = list(range(n))
+
+    def achar(self, i: int) -> int:
+        while self.pai[i] != i:
+            self.pai[i] = self.pai[self.pai[i]]
+            i = self.pai[i]
+        return i
+
+    def unir(self, a: int, b: int):
+        ra, rb = self.achar(a), self.achar(b)
+        if ra != rb:
+            self.pai[max(ra, rb)] = min(ra, rb)
+
+
+class DeduplicadorVagas:
+    """
+    Agrupa vagas quase duplicadas e devolve um registro mesclado por grupo.
+
+    - `limiar`: Jaccard mínimo entre os shingles de título/localização (1.0 = só chave exata);
+      a empresa normalizada tem de ser igual
+    - `bandas`, `linhas_cargo` e `linhas_empresa`: cada banda do LSH junta
+      `linhas_cargo` mínimos da assinatura do título e `linhas_empresa` da
+      empresa; um par vira candidato se coincidir em alguma banda inteira.
+      Mais linhas por banda = menos candidatos (mais rápido, menos sensível)
+    - `tamanho_shingle` e `usar_localizacao`: como a vaga vira shingles
+    - `max_balde`: baldes maiores que isso são ignorados; vêm de trechos muito
+      genéricos e tornariam a comparação quadrática (duplicatas reais
+      coincidem em outras bandas)
+
+    Vagas com níveis explícitos diferentes (ex.: júnior x sênior) nunca são agrupadas.
+    """
+
+    def __init__(self, limiar: float = 0.75, bandas: int = 16,
+                 linhas_cargo: int = 4, linhas_empresa: int = 2, tamanho_shingle: int = 3,
+                 usar_localizacao: bool = True, max_balde: int = 50, semente: int = 1):
+        self.limiar = limiar
+        self.bandas = bandas
+        self.linhas_cargo = linhas_cargo
+        self.linhas_empresa = linhas_empresa
+        self.tamanho_shingle = tamanho_shingle
+        self.usar_localizacao = usar_localizacao
+        self.max_balde = max_balde
+        # Hash multiplica-desloca: ((a * x + b) mod 2^64) >> 32, com a ímpar
+        rnd = random.Random(semente)
+        self._coeficientes = {
+            parte: [(rnd.getrandbits(64) | 1, rnd.getrandbits(64)) for _ in range(bandas * linhas)]
+            for parte, linhas in (('cargo', linhas_cargo), ('empresa', linhas_empresa))
+        }
+        self._mistura = [rnd.getrandbits(64) | 1 for _ in range(linhas_cargo + linhas_empresa)]
+
+    def assinatura(self, conjunto: FrozenSet[int], parte: str = 'cargo') -> tuple:
+        """Assinatura MinHash de um conjunto de shingles (`parte`: 'cargo' ou 'empresa')"""
+        # Conjunto vazio vira o shingle 0, para que "sem empresa" também forme baldes
+        conjunto = conjunto or (0,)
+        return tuple(min((((a * x + b) & _MASCARA_64) >> 32) for x in conjunto) for a, b in self._coeficientes[parte])
+
+    def chaves_bandas(self, conjunto: tuple) -> List[tuple]:
+        """Chave de cada banda do LSH para os shingles (cargo, empresa) de uma vaga"""
+        rc, re_ = self.linhas_cargo, self.linhas_empresa
+        sc, se = self.assinatura(conjunto[0], 'cargo'), self.assinatura(conjunto[1], 'empresa')
+        return [(banda, sc[banda * rc:(banda + 1) * rc], se[banda * re_:(banda + 1) * re_])
+                for banda in range(self.bandas)]
+
+    def baldes(self, conjuntos: Sequence[tuple]) -> Iterator[List[int]]:
+        """
+        Baldes do LSH com 2 a `max_balde` posições de `conjuntos`: vagas que
+        coincidem em todas as linhas de alguma banda (vetorizado com numpy, quando instalado)
+        """
+        try:
+            import numpy as np
+        except ImportError:
+            baldes: Dict[tuple, List[int]] = {}
+            for pos, conjunto in enumerate(conjuntos):
+                for chave in self.chaves_bandas(conjunto):
+                    baldes.setdefault(chave, []).append(pos)
+            yield from (m for m in baldes.values() if 2 <= len(m) <= self.max_balde)
+            return
+
+        chaves = self._chaves_numpy(np, conjuntos)
+
+        # Por banda: ordena as chaves e devolve só as sequências de chaves iguais
+        n = len(conjuntos)
+        for banda in range(self.bandas):
+            ordem = np.argsort(chaves[:, banda], kind='stable')
+            ordenadas = chaves[ordem, banda]
+            inicios = np.flatnonzero(np.concatenate(([True], ordenadas[1:] != ordenadas[:-1])))
+            tamanhos = np.diff(np.append(inicios, n))
+            validos = (tamanhos >= 2) & (tamanhos <= self.max_balde)
+            for inicio, tamanho in zip(inicios[validos].tolist(), tamanhos[validos].tolist()):
+                yield ordem[inicio:inicio + tamanho].tolist()
+
+    def chaves_lote(self, conjuntos: Sequence[tuple]) -> List[List[tuple]]:
+        """`chaves_bandas` de cada posição de `conjuntos`, calculadas em lote (numpy, quando instalado)"""
+        if not conjuntos:
+            return []
+        try:
+            import numpy as np
+        except ImportError:
+            return [self.chaves_bandas(conjunto) for conjunto in conjuntos]
+        return [list(enumerate(linha)) for linha in self._chaves_numpy(np, conjuntos).tolist()]
+
+    def _chaves_numpy(self, np, conjuntos):
+        """Matriz (vagas × bandas) com as linhas de cargo e de empresa de cada banda combinadas em um inteiro"""
+        def _assinaturas(parte, indice):
+            a = np.array([c[0] for c in self._coeficientes[parte]], dtype=np.uint64)
+            b = np.array([c[1] for c in self._coeficientes[parte]], dtype=np.uint64)
+            blocos = []
+            for inicio in range(0, len(conjuntos), _BLOCO_ASSINATURAS):
+                bloco = [c[indice] or (0,) for c in conjuntos[inicio:inicio + _BLOCO_ASSINATURAS]]
+                tamanhos = np.fromiter((len(c) for c in bloco), dtype=np.int64, count=len(bloco))
+                x = np.fromiter(chain.from_iterable(bloco), dtype=np.uint64, count=int(tamanhos.sum()))
+                # Overflow de uint64 é exatamente o "mod 2^64" do hash
+                h = (np.outer(x, a) + b) >> np.uint64(32)
+                inicios = np.concatenate(([0], np.cumsum(tamanhos)[:-1]))
+                blocos.append(np.minimum.reduceat(h, inicios, axis=0))
+            return np.concatenate(blocos).reshape(len(conjuntos), self.bandas, -1)
+
+        linhas = np.concatenate((_assinaturas('cargo', 0), _assinaturas('empresa', 1)), axis=2)
+        return (linhas * np.array(self._mistura, dtype=np.uint64)).sum(axis=2, dtype=np.uint64)
+
+    def similares(self, a: tuple, b: tuple) -> bool:
+        """Mesma empresa normalizada e título/localização acima do `limiar` (tuplas de `shingles`)"""
+        return a[2] == b[2] and jaccard(a[0], b[0]) >= self.limiar
+
+    def grupos(self, vagas: Sequence) -> List[List[int]]:
+        """Índices das vagas agrupados por duplicata, na ordem da primeira ocorrência"""
+        return self.grupos_colunas([v.titulo for v in vagas], [v.empresa for v in vagas],
+                                   [v.localizacao for v in vagas], [getattr(v, 'tags', ()) for v in vagas])
+
+    def grupos_colunas(self, titulos: Sequence[str], empresas: Sequence[str], localizacoes: Sequence[str],
+                       tags: Sequence[FrozenSet[str]]) -> List[List[int]]:
+        """`grupos` sobre colunas (ex.: de um `VagaBatch`): a i-ésima vaga é a posição i de cada sequência"""
+        n = len(titulos)
+        uniao = _UniaoBusca(n)
+
+        # 1. Chave exata (caso mais comum): agrupa sem calcular assinatura
+        primeiro_por_chave: Dict[tuple, int] = {}
+        representantes = []
+        for i in range(n):
+            chave = _chave(titulos[i], empresas[i])
+            if chave in primeiro_por_chave:
+                uniao.unir(primeiro_por_chave[chave], i)
+            else:
+                primeiro_por_chave[chave] = i
+                representantes.append(i)
+
+        # 2. MinHash/LSH só entre chaves distintas
+        if self.limiar < 1.0 and len(representantes) > 1:
+            conjuntos = [shingles_campos(titulos[i], empresas[i], localizacoes[i], self.tamanho_shingle,
+                                         self.usar_localizacao) for i in representantes]
+            # Níveis explícitos de cada grupo (pela raiz), para não encadear júnior ~ sem nível ~ sênior
+            niveis = {i: _niveis_tags(tags[i]) for i in representantes}
+            verificados = set()
+            for membros in self.baldes(conjuntos):
+                for k, p in enumerate(membros):
+                    for q in membros[k + 1:]:
+                        if (p, q) in verificados:
+                            continue
+                        verificados.add((p, q))
+                        ri, rj = uniao.achar(representantes[p]), uniao.achar(representantes[q])
+                        if ri == rj:
+                            continue
+                        ni, nj = niveis.get(ri, frozenset()), niveis.get(rj, frozenset())
+                        if ni and nj and ni.isdisjoint(nj):
+                            continue
+                        if self.similares(conjuntos[p], conjuntos[q]):
+                            uniao.unir(ri, rj)
+                            niveis[uniao.achar(ri)] = ni | nj
+
+        por_raiz: Dict[int, List[int]] = {}
+        for i in range(n):
+            por_raiz.setdefault(uniao.achar(i), []).append(i)
+        return list(por_raiz.values())
+
+    def deduplicar(self, vagas: Sequence) -> List:
+        """Uma vaga por grupo (mesclada quando o grupo tem mais de uma), na ordem original"""
+        return [vagas[g[0]] if len(g) == 1 else mesclar([vagas[i] for i in g]) for g in self.grupos(vagas)]
+
+
+class DeduplicadorIncremental:
+    """
+    Deduplicação de vagas que chegam em lotes (ex.: um lote por site, conforme
+    cada busca termina): cada vaga nova é comparada só com as já aceitas que
+    têm a mesma chave exata ou caem em algum balde do LSH em comum, mantidos
+    em memória entre os lotes.
+    """
+
+    def __init__(self, deduplicador: DeduplicadorVagas):
+        self.deduplicador = deduplicador
+        self.aceitas: List = []
+        self.descartadas = 0
+        self._conjuntos: List[tuple] = []
+        self._niveis: List[FrozenSet[str]] = []
+        self._por_chave: Dict[tuple, int] = {}
+        self._baldes: Dict[tuple, List[int]] = {}
+
+    def _duplicata(self, conjunto: tuple, niveis: FrozenSet[str], chaves: List[tuple]) -> bool:
+        vistos = set()
+        for chave in chaves:
+            membros = self._baldes.get(chave, ())
+            if len(membros) >= self.deduplicador.max_balde:
+                continue
+            for j in membros:
+                if j in vistos:
+                    continue
+                vistos.add(j)
+                if niveis and self._niveis[j] and niveis.isdisjoint(self._niveis[j]):
+                    continue
+                if self.deduplicador.similares(conjunto, self._conjuntos[j]):
+                    return True
+        return False
+
+    def adicionar(self, vagas: Sequence) -> List:
+        """Aceita o lote e retorna só as vagas que não duplicam nenhuma já aceita (o lote é deduplicado antes)"""
+        d = self.deduplicador
+        lote = d.deduplicar(vagas)
+        self.descartadas += len(vagas) - len(lote)
+        # Duplicatas exatas de vagas já aceitas nem chegam a ter assinatura calculada
+        candidatas = []
+        for vaga in lote:
+            if chave_exata(vaga) in self._por_chave:
+                self.descartadas += 1
+            else:
+                candidatas.append(vaga)
+        conjuntos = [shingles(vaga, d.tamanho_shingle, d.usar_localizacao) for vaga in candidatas]
+        todas_chaves = d.chaves_lote(conjuntos) if d.limiar < 1.0 else [[] for _ in candidatas]
+
+        novas = []
+        for vaga, conjunto, chaves in zip(candidatas, conjuntos, todas_chaves):
+            chave = chave_exata(vaga)
+            niveis = _niveis(vaga)
+            if self._duplicata(conjunto, niveis, chaves):
+                self.descartadas += 1
+                continue
+            indice = len(self.aceitas)
+            self.aceitas.append(vaga)
+            self._conjuntos.append(conjunto)
+            self._niveis.append(niveis)
+            self._por_chave[chave] = indice
+            for chave_banda in chaves:
+                self._baldes.setdefault(chave_banda, []).append(indice)
+            novas.append(vaga)
+        return novas
+
+
+def mesclar(grupo: Sequence):
+    """
+    Registro único de um grupo de duplicatas: a primeira vaga, com os campos
+    vazios completados pelas demais e `urls_fontes` com as URLs de todas
+    """
+    return replace(grupo[0], **alteracoes_mescla(grupo, getattr))
+
+
+def alteracoes_mescla(grupo: Sequence, ler: Callable) -> Dict:
+    """
+    Campos do primeiro membro que mudam na mesclagem do grupo; `ler(membro, campo)`
+    lê um campo (atributo de `Vaga` ou índice de um `VagaBatch`). 'tags' vazio
+    indica que os campos usados na classificação mudaram e as tags devem ser recalculadas
+    """
+    urls = []
+    for membro in grupo:
+        for url in (ler(membro, 'urls_fontes') or (ler(membro, 'url'),)):
+            if url and url not in urls:
+                urls.append(url)
+
+    alteracoes = {'urls_fontes': tuple(urls)}
+    for campo in ('salario', 'descricao', 'tipo_contrato', 'nivel_experiencia', 'modalidade'):
+        if not ler(grupo[0], campo):
+            valor = next((ler(v, campo) for v in grupo[1:] if ler(v, campo)), None)
+            if valor:
+                alteracoes[campo] = valor
+    if alteracoes.keys() - {'urls_fontes', 'salario'}:
+        alteracoes['tags'] = frozenset()
+    return alteracoes
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+BuscaJob - Exportação de vagas
+Converte um iterador de vagas (ex.: `ArmazemVagas.iterar`) em blocos de bytes
+prontos para uma resposta HTTP em fluxo, sem pandas e sem montar a tabela
+inteira em memória:
+
+- csv: linhas escritas e enviadas em blocos (com BOM, para o Excel abrir em UTF-8)
+- xlsx: openpyxl em modo write-only (linhas gravadas em disco à medida que
+  chegam); o arquivo zip final é enviado em blocos
+- parquet: pyarrow opcional, um row group por lote de vagas
+- ndjson: uma vaga por linha, no mesmo formato da API
+"""
+
+import csv
+import io
+import json
+import tempfile
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List
+
+from job_store import COLUNAS_VAGA
+
+# Colunas exportadas, na ordem das planilhas; `fontes` vira texto separado por espaços
+COLUNAS_EXPORTACAO = ('id',) + COLUNAS_VAGA + ('fontes',)
+
+# formato -> (mimetype, extensão)
+FORMATOS = {
+    'csv': ('text/csv; charset=utf-8', 'csv'),
+    'xlsx': ('application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', 'xlsx'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+}
+SINONIMOS_FORMATO = {'excel': 'xlsx', 'json': 'ndjson'}
+
+TAMANHO_BLOCO = 64 * 1024
+LINHAS_POR_LOTE = 5000
+
+
+class ExportacaoIndisponivel(Exception):
+    """Formato desconhecido ou que depende de um pacote não instalado"""
+
+
+def normalizar_formato(formato: str) -> str:
+    formato = SINONIMOS_FORMATO.get((formato or 'csv').lower(), (formato or 'csv').lower())
+    if formato not in FORMATOS:
+        raise ExportacaoIndisponivel(f"Formato não suportado: {formato} (use {', '.join(FORMATOS)})")
+    return formato
+
+
+def _linha(vaga: Dict) -> List[str]:
+    return [' '.join(vaga.get(c) or ()) if c == 'fontes' else (vaga.get(c) or '') for c in COLUNAS_EXPORTACAO]
+
+
+def _blocos_do_arquivo(arquivo) -> Iterator[bytes]:
+    arquivo.seek(0)
+    try:
+        while True:
+            bloco = arquivo.read(TAMANHO_BLOCO)
+            if not bloco:
+                return
+            yield bloco
+    finally:
+        arquivo.close()
+
+
+def exportar_csv(vagas: Iterable[Dict]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+    buffer.write('\ufeff')
+    escritor.writerow(COLUNAS_EXPORTACAO)
+    for vaga in vagas:
+        escritor.writerow(_linha(vaga))
+        if buffer.tell() >= TAMANHO_BLOCO:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+
+def exportar_xlsx(vagas: Iterable[Dict]) -> Iterator[bytes]:
+    from openpyxl import Workbook
+    from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+
+    livro = Workbook(write_only=True)
+    planilha = livro.create_sheet('Vagas')
+    planilha.append(COLUNAS_EXPORTACAO)
+    for vaga in vagas:
+        # Caracteres de controle vindos do HTML tornam a célula inválida para o openpyxl
+        planilha.append([ILLEGAL_CHARACTERS_RE.sub('', valor) for valor in _linha(vaga)])
+    # O xlsx é um zip (precisa de arquivo com seek): grava em um temporário e envia em blocos
+    arquivo = tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024)
+    livro.save(arquivo)
+    yield from _blocos_do_arquivo(arquivo)
+
+
+def exportar_parquet(vagas: Iterable[Dict]) -> Iterator[bytes]:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ExportacaoIndisponivel("Exportação parquet requer o pacote 'pyarrow' (pip install pyarrow)") from e
+
+    esquema = pa.schema([(c, pa.string()) for c in COLUNAS_EXPORTACAO])
+    arquivo = tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024)
+    with pq.ParquetWriter(arquivo, esquema, compression='zstd') as escritor:
+        colunas: Dict[str, List[str]] = {c: [] for c in COLUNAS_EXPORTACAO}
+        for vaga in vagas:
+            for coluna, valor in zip(COLUNAS_EXPORTACAO, _linha(vaga)):
+                colunas[coluna].append(valor)
+            if len(colunas['id']) >= LINHAS_POR_LOTE:
+                escritor.write_table(pa.table(colunas, schema=esquema))
+                colunas = {c: [] for c in COLUNAS_EXPORTACAO}
+        if colunas['id']:
+            escritor.write_table(pa.table(colunas, schema=esquema))
+    yield from _blocos_do_arquivo(arquivo)
+
+
+def exportar_ndjson(vagas: Iterable[Dict]) -> Iterator[bytes]:
+    partes, tamanho = [], 0
+    for vaga in vagas:
+        linha = json.dumps(vaga, ensure_ascii=False, separators=(',', ':')).encode('utf-8') + b'\n'
+        partes.append(linha)
+        tamanho += len(linha)
+        if tamanho >= TAMANHO_BLOCO:
+            yield b''.join(partes)
+            partes, tamanho = [], 0
+    if partes:
+        yield b''.join(partes)
+
+
+_EXPORTADORES = {'csv': exportar_csv, 'xlsx': exportar_xlsx, 'parquet': exportar_parquet, 'ndjson': exportar_ndjson}
+
+
+def exportar(formato: str, vagas: Iterable[Dict]) -> Iterator[bytes]:
+    """
+    Blocos do arquivo exportado. O primeiro bloco é produzido antes do retorno,
+    para que falhas de dependência (ExportacaoIndisponivel) surjam antes de a
+    resposta HTTP começar
+    """
+    gerador = _EXPORTADORES[normalizar_formato(formato)](vagas)
+    primeiro = next(gerador, b'')
+
+    def _todos():
+        yield primeiro
+        yield from gerador
+
+    return _todos()
+
+
+def nome_exportacao(formato: str, nome_resultado: str = '') -> str:
+    base = nome_resultado or f"vagas_buscajob_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    return f"{base}.{FORMATOS[normalizar_formato(formato)][1]}"
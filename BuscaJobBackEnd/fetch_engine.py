@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+BuscaJob - Motor assíncrono de requisições HTTP
+Executa as requisições dos scrapers em um event loop dedicado, com limite de
+conexões simultâneas por host, sem ocupar uma thread por requisição.
+"""
+
+import asyncio
+import atexit
+import concurrent.futures
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from urllib.parse import urlparse
+
+from http_cache import CacheHTTP, EntradaCache
+from metricas import METRICAS
+from rate_limiter import LimitadorPorHost
+
+LATENCIA_HOST = METRICAS.histograma(
+    'buscajob_requisicao_latencia_segundos', 'Latência de cada tentativa de GET por host', ('host',))
+REQUISICOES_HOST = METRICAS.contador(
+    'buscajob_requisicoes_total', 'GETs por host e resultado (rede, cache, revalidado, falha)', ('host', 'resultado'))
+ERROS_HOST = METRICAS.contador(
+    'buscajob_requisicao_erros_total', 'Tentativas que falharam por host (HTTP >= 400, timeout, conexão)', ('host',))
+RETENTATIVAS_HOST = METRICAS.contador(
+    'buscajob_requisicao_retentativas_total', 'Novas tentativas após falha por host', ('host',))
+BACKOFF_HOST = METRICAS.contador(
+    'buscajob_requisicao_backoff_segundos_total', 'Segundos de backoff impostos ao host após falhas', ('host',))
+
+# Backoff exponencial com jitter entre tentativas: 2-5 s, 4-10 s, ... até BACKOFF_MAXIMO
+BACKOFF_BASE = (2.0, 5.0)
+BACKOFF_MAXIMO = 60.0
+
+
+@dataclass
+class RespostaHTTP:
+    """Resposta HTTP já lida integralmente (independente do cliente usado)"""
+    url: str
+    status: int
+    conteudo: bytes
+    headers: Dict[str, str] = field(default_factory=dict)
+    encoding: Optional[str] = None
+
+    @property
+    def text(self) -> str:
+        return self.conteudo.decode(self.encoding or 'utf-8', errors='replace')
+
+
+class ErroHTTP(Exception):
+    """Resposta com status de erro (4xx/5xx)"""
+
+    def __init__(self, status: int, url: str):
+        super().__init__(f"HTTP {status} em {url}")
+        self.status = status
+        self.url = url
+
+
+class MotorRequisicoes:
+    """
+    Motor de requisições baseado em asyncio.
+
+    O event loop roda em uma thread própria (criada no primeiro uso), de modo
+    que código síncrono (Flask, scripts) pode submeter corrotinas com
+    `executar`. Cada host tem seu próprio semáforo, limitando quantas
+    requisições ficam em voo ao mesmo tempo para aquele site, e seu próprio
+    balde no `LimitadorPorHost`, limitando a taxa de requisições.
+    """
+
+    def __init__(
+        self,
+        limite_por_host: int = 4,
+        limites_host: Optional[Dict[str, int]] = None,
+        limite_global: int = 200,
+        timeout: float = 10,
+        headers: Optional[Dict[str, str]] = None,
+        user_agent: Optional[Callable[[], str]] = None,
+        limitador: Optional[LimitadorPorHost] = None,
+        cache: Optional[CacheHTTP] = None,
+    ):
+        self.limite_por_host = limite_por_host
+        self.limites_host = dict(limites_host or {})
+        self.limite_global = limite_global
+        self.timeout = timeout
+        self.headers = dict(headers or {})
+        self.user_agent = user_agent
+        self.limitador = limitador or LimitadorPorHost()
+        self.cache = cache
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._semaforos: Dict[str, asyncio.Semaphore] = {}
+        self._semaforo_global: Optional[asyncio.Semaphore] = None
+        self._sessao = None
+        # Alterados só na thread do event loop; lidos pelas métricas
+        self.aguardando = 0
+        self.em_voo = 0
+        atexit.register(self.fechar)
+
+    # ------------------------------------------------------------------
+    # Event loop
+    # ------------------------------------------------------------------
+
+    def _garantir_loop(self) -> asyncio.AbstractEventLoop:
+        """Cria (uma única vez) o event loop e a thread que o executa"""
+        with self._lock:
+            if self._loop is None or self._loop.is_closed():
+                loop = asyncio.new_event_loop()
+                pronto = threading.Event()
+
+                def _rodar():
+                    asyncio.set_event_loop(loop)
+                    loop.call_soon(pronto.set)
+                    loop.run_forever()
+
+                self._thread = threading.Thread(target=_rodar, name='buscajob-fetch', daemon=True)
+                self._thread.start()
+                pronto.wait()
+                self._loop = loop
+            return self._loop
+
+    def submeter(self, coro) -> concurrent.futures.Future:
+        """Agenda uma corrotina no loop do motor sem aguardar (use `as_completed` ou `.result()`)"""
+        loop = self._garantir_loop()
+        if threading.current_thread() is self._thread:
+            raise RuntimeError("submeter() não pode ser chamado de dentro do loop do motor; use await")
+        return asyncio.run_coroutine_threadsafe(coro, loop)
+
+    def executar(self, coro) -> Any:
+        """Executa uma corrotina no loop do motor e aguarda o resultado (fachada síncrona)"""
+        return self.submeter(coro).result()
+
+    def fechar(self):
+        """Fecha a sessão HTTP e encerra o event loop"""
+        with self._lock:
+            loop = self._loop
+            self._loop = None
+        if loop is None or loop.is_closed():
+            return
+        if self._sessao is not None:
+            asyncio.run_coroutine_threadsafe(self._sessao.close(), loop).result()
+            self._sessao = None
+        loop.call_soon_threadsafe(loop.stop)
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        loop.close()
+        self._semaforos.clear()
+        self._semaforo_global = None
+
+    # ------------------------------------------------------------------
+    # Requisições
+    # ------------------------------------------------------------------
+
+    def profundidade(self) -> Dict[str, int]:
+        """Requisições esperando token/semáforo e em voo, neste instante"""
+        return {'aguardando': self.aguardando, 'em_voo': self.em_voo}
+
+    def _semaforo(self, host: str) -> asyncio.Semaphore:
+        sem = self._semaforos.get(host)
+        if sem is None:
+            sem = asyncio.Semaphore(self.limites_host.get(host, self.limite_por_host))
+            self._semaforos[host] = sem
+        return sem
+
+    def _cabecalhos(self) -> Dict[str, str]:
+        headers = dict(self.headers)
+        if self.user_agent:
+            # Rotaciona User-Agent a cada requisição
+            headers['User-Agent'] = self.user_agent()
+        return headers
+
+    async def _obter_sessao(self):
+        """Sessão aiohttp compartilhada; None quando aiohttp não está instalado"""
+        if self._sessao is None:
+            try:
+                import aiohttp
+            except ImportError:
+                return None
+            self._sessao = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                connector=aiohttp.TCPConnector(limit=self.limite_global),
+            )
+        return self._sessao
+
+    async def _get(self, url: str, headers: Dict[str, str]) -> RespostaHTTP:
+        sessao = await self._obter_sessao()
+        if sessao is None:
+            # Fallback sem aiohttp: requests em thread do executor padrão
+            import requests
+
+            def _get_requests():
+                r = requests.get(url, headers=headers, timeout=self.timeout)
+                return RespostaHTTP(url=r.url, status=r.status_code, conteudo=r.content,
+                                    headers=dict(r.headers), encoding=r.encoding)
+
+            return await asyncio.get_running_loop().run_in_executor(None, _get_requests)
+
+        async with sessao.get(url, headers=headers) as r:
+            conteudo = await r.read()
+            return RespostaHTTP(url=str(r.url), status=r.status, conteudo=conteudo,
+                                headers=dict(r.headers), encoding=r.charset)
+
+    async def buscar(self, url: str, max_retries: int = 3) -> Optional[RespostaHTTP]:
+        """Faz GET com cache, retry e rate limiting; as esperas são assíncronas e não bloqueiam threads"""
+        host = urlparse(url).netloc.lower()
+        if self._semaforo_global is None:
+            self._semaforo_global = asyncio.Semaphore(self.limite_global)
+
+        entrada = await self._no_executor(self.cache.obter, url) if self.cache is not None else None
+        if entrada is not None and entrada.fresca:
+            self.cache.registrar('hits')
+            REQUISICOES_HOST.inc(host, 'cache')
+            return self._resposta_do_cache(url, entrada)
+
+        for tentativa in range(max_retries):
+            try:
+                self.aguardando += 1
+                aguardando = True
+                try:
+                    # O token é tirado só com a vaga no semáforo garantida: tirado antes, as tarefas
+                    # presas no semáforo acumulariam tokens já vencidos e sairiam juntas, estourando a rajada
+                    async with self._semaforo_global, self._semaforo(host):
+                        # Rate limiting (inclui o backoff de falhas anteriores, ver `_backoff`)
+                        await self.limitador.aguardar_async(host)
+                        self.aguardando -= 1
+                        aguardando = False
+                        headers = self._cabecalhos()
+                        if entrada is not None:
+                            headers.update(entrada.cabecalhos_condicionais())
+                        self.em_voo += 1
+                        inicio = time.perf_counter()
+                        try:
+                            resposta = await self._get(url, headers)
+                        finally:
+                            self.em_voo -= 1
+                            LATENCIA_HOST.observar(time.perf_counter() - inicio, host)
+                finally:
+                    if aguardando:
+                        self.aguardando -= 1
+
+                if resposta.status == 304:
+                    if entrada is None:
+                        # 304 sem validadores enviados: não há o que servir, conta como falha e tenta de novo
+                        raise ErroHTTP(resposta.status, url)
+                    # Conteúdo não mudou: renova a entrada sem novo download
+                    await self._no_executor(self.cache.renovar, url)
+                    self.cache.registrar('revalidacoes')
+                    REQUISICOES_HOST.inc(host, 'revalidado')
+                    return self._resposta_do_cache(url, entrada)
+                if resposta.status >= 400:
+                    raise ErroHTTP(resposta.status, url)
+                if self.cache is not None:
+                    self.cache.registrar('misses')
+                    if resposta.status == 200:
+                        await self._no_executor(self.cache.salvar, url, resposta.status, resposta.conteudo,
+                                                resposta.headers)
+                REQUISICOES_HOST.inc(host, 'rede')
+                return resposta
+
+            except Exception as e:
+                # ErroHTTP, timeouts e erros de conexão (aiohttp/requests)
+                ERROS_HOST.inc(host)
+                logging.warning(f"Tentativa {tentativa + 1} falhou para {url}: {e}")
+                if tentativa == max_retries - 1:
+                    logging.error(f"Falha definitiva ao acessar {url}")
+                    REQUISICOES_HOST.inc(host, 'falha')
+                    return None
+                RETENTATIVAS_HOST.inc(host)
+                self._backoff(host, tentativa)
+
+        return None
+
+    def _backoff(self, host: str, tentativa: int):
+        """
+        Registra o backoff da falha no balde do host em vez de dormir por fora dele:
+        a nova tentativa (e as demais requisições ao host) espera o backoff ao tirar o
+        próximo token, sem somar a espera do token à do backoff
+        """
+        espera = min(BACKOFF_MAXIMO, random.uniform(*BACKOFF_BASE) * 2 ** tentativa)
+        self.limitador.adiar(host, espera)
+        BACKOFF_HOST.inc(host, valor=espera)
+
+    @staticmethod
+    async def _no_executor(funcao: Callable, *args) -> Any:
+        """Roda IO bloqueante (SQLite do cache HTTP) fora do event loop, no executor padrão"""
+        return await asyncio.get_running_loop().run_in_executor(None, funcao, *args)
+
+    @staticmethod
+    def _resposta_do_cache(url: str, entrada: EntradaCache) -> RespostaHTTP:
+        return RespostaHTTP(url=url, status=entrada.status, conteudo=entrada.conteudo, headers=entrada.headers)
+
+    async def buscar_varias(self, urls: Iterable[str], max_retries: int = 3) -> List[Optional[RespostaHTTP]]:
+        """Busca várias URLs concorrentemente, preservando a ordem de entrada"""
+        return await asyncio.gather(*(self.buscar(u, max_retries) for u in urls))
+
+    def buscar_sync(self, url: str, max_retries: int = 3) -> Optional[RespostaHTTP]:
+        """Fachada síncrona de `buscar`"""
+        return self.executar(self.buscar(url, max_retries))
+
+    def buscar_varias_sync(self, urls: Iterable[str], max_retries: int = 3) -> List[Optional[RespostaHTTP]]:
+        """Fachada síncrona de `buscar_varias`"""
+        return self.executar(self.buscar_varias(list(urls), max_retries))
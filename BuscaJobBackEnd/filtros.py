@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+BuscaJob - Filtros compilados de critérios de busca
+Os critérios são convertidos uma única vez em uma cadeia ordenada de
+predicados (mais baratos e seletivos primeiro), reaproveitável em qualquer
+quantidade de listas de vagas.
+
+Localização e palavras-chave são comparadas sem acentos e sem caixa, dos
+dois lados ("São Paulo" e "Sao Paulo" encontram as mesmas vagas), coerente
+com a chave de cache dos critérios (`result_cache.chave_criterios`), que
+também ignora acentos e caixa.
+"""
+
+import re
+from functools import lru_cache
+from operator import attrgetter
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from classificador import MODALIDADES, normalizar_modalidade, normalizar_tipo
+from result_cache import normalizar_texto
+
+_NUMERO = re.compile(r'[\d.,]+')
+_SEPARADORES_LOCAL = re.compile(r'[;,/\\|]')
+
+
+@lru_cache(maxsize=8192)
+def extrair_valor_salario(salario_str: Optional[str]) -> float:
+    """Extrai valor numérico do salário (memorizado: os textos de salário se repetem muito)"""
+    if not salario_str or salario_str.lower() in ['a combinar', 'não informado']:
+        return 0.0
+
+    # Primeiro número, em formato brasileiro (vírgula como decimal)
+    numero = _NUMERO.search(salario_str)
+    if numero:
+        try:
+            return float(numero.group().replace('.', '').replace(',', '.'))
+        except ValueError:
+            return 0.0
+
+    return 0.0
+
+
+_sem_acentos = lru_cache(maxsize=16384)(normalizar_texto)
+
+
+def comparavel(texto: Optional[str]) -> str:
+    """Texto na forma usada pelos filtros: `normalizar_texto` (ASCII puro só passa por lower/split)"""
+    if not texto:
+        return ''
+    if texto.isascii():
+        return ' '.join(texto.lower().split())
+    return _sem_acentos(texto)
+
+
+def _valor(criterio) -> Optional[float]:
+    try:
+        return float(criterio) if criterio not in (None, '') else None
+    except (TypeError, ValueError):
+        return None
+
+
+class Predicado(NamedTuple):
+    """Um passo da cadeia: nome, campos da vaga lidos e função sobre os valores desses campos"""
+    nome: str
+    campos: Tuple[str, ...]
+    funcao: Callable[..., bool]
+
+
+class FiltroCompilado:
+    """
+    Cadeia de predicados derivada de um dicionário de critérios.
+
+    Cada predicado é aplicado sobre a saída do anterior, de modo que os
+    filtros mais caros (texto livre) só veem as vagas que sobraram. Como cada
+    predicado declara os campos que lê, a mesma cadeia serve para listas de
+    `Vaga` (`aplicar`) e para colunas de um `VagaBatch` (`aplicar_colunas`).
+    """
+
+    def __init__(self, criterios: Dict):
+        self.predicados: List[Predicado] = []
+
+        # 1. Modalidade e tipo: interseção com conjuntos de tags pré-montados
+        if criterios.get('modalidades'):
+            mods_aceitas = frozenset(f'modalidade:{normalizar_modalidade(m)}' for m in criterios['modalidades'])
+            mods_recusadas = frozenset(f'modalidade:{m}' for m in MODALIDADES) - mods_aceitas
+            # Cada vaga tem no máximo uma modalidade; quando não é possível inferir, não filtra
+            self.predicados.append(Predicado('modalidade', ('tags',), mods_recusadas.isdisjoint))
+
+        if criterios.get('tipos_contratacao'):
+            tipos_aceitos = frozenset(
+                f'{prefixo}:{normalizar_tipo(t)}' for t in criterios['tipos_contratacao'] for prefixo in ('tipo', 'indicio')
+            )
+            self.predicados.append(Predicado('tipo', ('tags',), lambda tags: not tipos_aceitos.isdisjoint(tags)))
+
+        # 2. Faixa salarial: um número por texto de salário distinto (memorizado)
+        minimo = _valor(criterios.get('salario_minimo'))
+        maximo = _valor(criterios.get('salario_maximo'))
+        if minimo or maximo:
+            def _salario(salario):
+                valor = extrair_valor_salario(salario)
+                if not valor:
+                    return True
+                return not ((minimo and valor < minimo) or (maximo and valor > maximo))
+            self.predicados.append(Predicado('salario', ('salario',), _salario))
+
+        # 3. Localização: campo curto, uma busca com regex pré-compilada
+        if criterios.get('localizacao'):
+            loc = comparavel(criterios['localizacao'])
+            if loc == 'remoto':
+                tokens = ['remoto']
+            else:
+                # Suporta múltiplas localidades separadas por vírgula, barra, ponto e vírgula ou pipe
+                tokens = [t.strip() for t in _SEPARADORES_LOCAL.split(loc) if t.strip()]
+            if tokens:
+                regex_loc = re.compile('|'.join(map(re.escape, tokens)))
+                self.predicados.append(Predicado(
+                    'localizacao', ('localizacao',), lambda local: regex_loc.search(comparavel(local)) is not None,
+                ))
+
+        # 4. Palavras-chave: texto longo (título + descrição), por último
+        if criterios.get('palavras_chave'):
+            palavras = comparavel(criterios['palavras_chave']).split()
+            if palavras:
+                regex_palavras = re.compile('|'.join(map(re.escape, palavras)))
+                self.predicados.append(Predicado(
+                    'palavras_chave', ('titulo', 'descricao'),
+                    lambda titulo, descricao: regex_palavras.search(comparavel(titulo)) is not None
+                    or regex_palavras.search(comparavel(descricao)) is not None,
+                ))
+
+    def __call__(self, vaga) -> bool:
+        for _, campos, funcao in self.predicados:
+            if not funcao(*(getattr(vaga, c) for c in campos)):
+                return False
+        return True
+
+    def aplicar(self, vagas: List) -> List:
+        """Filtra a lista, aplicando cada predicado sobre o que restou do anterior"""
+        for _, campos, funcao in self.predicados:
+            ler = attrgetter(*campos)
+            if len(campos) == 1:
+                vagas = [vaga for vaga in vagas if funcao(ler(vaga))]
+            else:
+                vagas = [vaga for vaga in vagas if funcao(*ler(vaga))]
+        return list(vagas)
+
+    def aplicar_colunas(self, colunas: Dict[str, list], indices: Optional[List[int]] = None) -> List[int]:
+        """
+        Versão colunar de `aplicar`: retorna os índices das linhas aceitas.
+
+        Predicados de um só campo são avaliados uma vez por valor distinto
+        (colunas com strings internadas se repetem muito: local, tags, salário).
+        """
+        if indices is None:
+            indices = range(len(next(iter(colunas.values()), ())))
+        for _, campos, funcao in self.predicados:
+            if len(campos) == 1:
+                coluna = colunas[campos[0]]
+                memo: Dict = {}
+                aceitos = []
+                for i in indices:
+                    valor = coluna[i]
+                    ok = memo.get(valor)
+                    if ok is None:
+                        ok = memo[valor] = funcao(valor)
+                    if ok:
+                        aceitos.append(i)
+                indices = aceitos
+            else:
+                valores = [colunas[c] for c in campos]
+                indices = [i for i in indices if funcao(*(v[i] for v in valores))]
+        return list(indices)
+
+
+def compilar_filtros(criterios: Dict) -> FiltroCompilado:
+    return FiltroCompilado(criterios or {})
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+BuscaJob - Histórico de vagas vistas (modo incremental)
+Guarda, para cada busca salva (escopo), uma impressão digital compacta de cada
+vaga já vista: dois inteiros de 64 bits (identidade e conteúdo) e as datas da
+primeira e da última vez em que ela apareceu. Cada execução compara o que
+encontrou e recebe de volta só o delta, que só é gravado (`confirmar`) depois
+de entregue:
+
+- nova: identidade nunca vista no escopo
+- alterada: já vista, mas com conteúdo diferente (salário, local, tipo, nível
+  ou modalidade)
+
+A identidade é o id estável da vaga (`job_store.id_vaga`). Descrição, data de
+publicação e fontes ficam fora do conteúdo: variam entre execuções sem que a
+vaga mude (texto gerado, datas relativas, sites encontrados).
+"""
+
+import hashlib
+import logging
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from job_store import registro_de_vaga
+
+logger = logging.getLogger(__name__)
+
+NOVA = 'nova'
+ALTERADA = 'alterada'
+
+# Campos cuja mudança faz uma vaga já vista reaparecer no delta
+CAMPOS_CONTEUDO = ('localizacao', 'salario', 'tipo', 'nivel', 'modalidade')
+
+_ESQUEMA = (
+    'CREATE TABLE IF NOT EXISTS vagas_vistas ('
+    ' escopo TEXT NOT NULL, chave INTEGER NOT NULL, conteudo INTEGER NOT NULL,'
+    ' primeira_vez TEXT NOT NULL, ultima_vez TEXT NOT NULL, PRIMARY KEY (escopo, chave)) WITHOUT ROWID',
+    'CREATE INDEX IF NOT EXISTS idx_vistas_ultima ON vagas_vistas (ultima_vez)',
+)
+
+# Limite de parâmetros por consulta IN (SQLite antigo aceita até 999)
+_LOTE_CONSULTA = 500
+
+
+def impressao(texto: str) -> int:
+    """blake2b de 8 bytes como inteiro com sinal (cabe em um INTEGER do SQLite)"""
+    return int.from_bytes(hashlib.blake2b(texto.encode('utf-8'), digest_size=8).digest(), 'big', signed=True)
+
+
+def impressao_conteudo(registro: Dict) -> int:
+    return impressao('\x1f'.join(str(registro.get(campo) or '') for campo in CAMPOS_CONTEUDO))
+
+
+class HistoricoVagas:
+    """Impressões digitais das vagas vistas por escopo; seguro para uso entre threads"""
+
+    def __init__(self, caminho: str):
+        self.caminho = caminho
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(caminho, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        for comando in _ESQUEMA:
+            self._conn.execute(comando)
+
+    def comparar(self, escopo: str, vagas: Iterable, quando: Optional[datetime] = None,
+                 apenas_delta: bool = True) -> Tuple[List[Dict], List[tuple]]:
+        """
+        Compara as vagas encontradas em uma execução do escopo com o histórico,
+        sem gravá-las. Retorna as novas e alteradas (ou todas, com
+        `apenas_delta=False`), no formato de `registro_de_vaga` com 'primeiraVez',
+        'ultimaVez' e 'situacao', e as linhas a passar para `confirmar` depois
+        que o resultado tiver sido entregue. Vagas repetidas na mesma execução
+        contam uma vez
+        """
+        agora = (quando or datetime.now()).isoformat()
+        registros: Dict[int, Dict] = {}
+        for vaga in vagas:
+            registro = registro_de_vaga(vaga)
+            registros.setdefault(impressao(registro['id']), registro)
+        chaves = list(registros)
+        vistas = {}
+        with self._lock:
+            for inicio in range(0, len(chaves), _LOTE_CONSULTA):
+                parte = chaves[inicio:inicio + _LOTE_CONSULTA]
+                vistas.update((row[0], row[1:]) for row in self._conn.execute(
+                    'SELECT chave, conteudo, primeira_vez FROM vagas_vistas'
+                    f" WHERE escopo = ? AND chave IN ({', '.join('?' * len(parte))})",
+                    [escopo, *parte],
+                ))
+        saida = []
+        linhas = []
+        for chave, registro in registros.items():
+            conteudo = impressao_conteudo(registro)
+            anterior = vistas.get(chave)
+            if anterior is None:
+                situacao, primeira = NOVA, agora
+            else:
+                situacao, primeira = (ALTERADA if anterior[0] != conteudo else None), anterior[1]
+            linhas.append((escopo, chave, conteudo, primeira, agora))
+            if situacao or not apenas_delta:
+                registro.update(primeiraVez=primeira, ultimaVez=agora)
+                if situacao:
+                    registro['situacao'] = situacao
+                saida.append(registro)
+        return saida, linhas
+
+    def confirmar(self, linhas: List[tuple]):
+        """Grava as impressões retornadas por `comparar` (a próxima execução não as verá como novas)"""
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                self._conn.executemany(
+                    'INSERT INTO vagas_vistas (escopo, chave, conteudo, primeira_vez, ultima_vez)'
+                    ' VALUES (?, ?, ?, ?, ?) ON CONFLICT (escopo, chave) DO UPDATE SET'
+                    ' conteudo = excluded.conteudo, ultima_vez = excluded.ultima_vez',
+                    linhas,
+                )
+                self._conn.execute('COMMIT')
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+
+    def registrar(self, escopo: str, vagas: Iterable, quando: Optional[datetime] = None,
+                  apenas_delta: bool = True) -> List[Dict]:
+        """`comparar` e `confirmar` de uma vez"""
+        saida, linhas = self.comparar(escopo, vagas, quando, apenas_delta)
+        self.confirmar(linhas)
+        return saida
+
+    def contar(self, escopo: Optional[str] = None) -> int:
+        sql, parametros = 'SELECT COUNT(*) FROM vagas_vistas', []
+        if escopo is not None:
+            sql += ' WHERE escopo = ?'
+            parametros.append(escopo)
+        with self._lock:
+            return self._conn.execute(sql, parametros).fetchone()[0]
+
+    def esquecer(self, dias: float) -> int:
+        """Remove as vagas não vistas há mais de `dias` (se reaparecerem, voltam como novas)"""
+        limite = (datetime.now() - timedelta(days=dias)).isoformat()
+        with self._lock:
+            removidas = self._conn.execute('DELETE FROM vagas_vistas WHERE ultima_vez < ?', (limite,)).rowcount
+        if removidas:
+            logger.info(f"Histórico de vagas: {removidas} impressão(ões) com mais de {dias:g} dias removidas")
+        return removidas
+
+    def fechar(self):
+        with self._lock:
+            self._conn.close()
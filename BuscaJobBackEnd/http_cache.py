@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+BuscaJob - Cache HTTP persistente em disco
+Guarda respostas por URL normalizada, com TTL por host, revalidação condicional
+(ETag/Last-Modified) e limite de tamanho com descarte LRU.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+
+def normalizar_url(url: str) -> str:
+    """Normaliza a URL para uso como chave: esquema/host minúsculos, sem fragmento,
+    sem porta padrão e com parâmetros de query ordenados"""
+    partes = urlsplit((url or '').strip())
+    esquema = partes.scheme.lower()
+    host = (partes.hostname or '').lower()
+    porta = partes.port
+    if porta and not ((esquema == 'http' and porta == 80) or (esquema == 'https' and porta == 443)):
+        host = f"{host}:{porta}"
+    query = urlencode(sorted(parse_qsl(partes.query, keep_blank_values=True)))
+    return urlunsplit((esquema, host, partes.path or '/', query, ''))
+
+
+@dataclass
+class EntradaCache:
+    """Resposta armazenada no cache"""
+    url: str
+    status: int
+    conteudo: bytes
+    headers: Dict[str, str] = field(default_factory=dict)
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    expira_em: float = 0.0
+
+    @property
+    def fresca(self) -> bool:
+        return time.time() < self.expira_em
+
+    def cabecalhos_condicionais(self) -> Dict[str, str]:
+        """Cabeçalhos para GET condicional (If-None-Match / If-Modified-Since)"""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class CacheHTTP:
+    """
+    Cache de respostas HTTP em SQLite (um arquivo dentro de `diretorio`).
+
+    Entradas frescas são servidas sem rede; entradas vencidas com validadores
+    são revalidadas e, em caso de 304, renovadas sem novo download. Quando o
+    total armazenado passa de `max_bytes`, as entradas acessadas há mais tempo
+    são descartadas. `obter`, `salvar` e `renovar` fazem IO bloqueante: o motor
+    assíncrono os chama no executor, fora do event loop.
+    """
+
+    def __init__(self, diretorio: str, max_bytes: int = 200 * 1024 * 1024,
+                 ttl_padrao: float = 3600, ttls_host: Optional[Dict[str, float]] = None):
+        os.makedirs(diretorio, exist_ok=True)
+        self.caminho = os.path.join(diretorio, 'cache_http.sqlite3')
+        self.max_bytes = max_bytes
+        self.ttl_padrao = ttl_padrao
+        self.ttls_host = {h.lower(): t for h, t in (ttls_host or {}).items()}
+        self._lock = threading.Lock()
+        # Contadores têm lock próprio: `registrar` é chamado do event loop do motor e não pode
+        # esperar uma escrita em SQLite em andamento no executor
+        self._lock_contadores = threading.Lock()
+        self._conn = sqlite3.connect(self.caminho, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS entradas ('
+            ' chave TEXT PRIMARY KEY, status INTEGER, headers TEXT, etag TEXT, last_modified TEXT,'
+            ' expira_em REAL, acessado_em REAL, tamanho INTEGER, conteudo BLOB)'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_entradas_acesso ON entradas (acessado_em)')
+        self._total_bytes = self._conn.execute('SELECT COALESCE(SUM(tamanho), 0) FROM entradas').fetchone()[0]
+        self._contadores = {'hits': 0, 'misses': 0, 'revalidacoes': 0, 'descartes': 0}
+
+    def ttl_para(self, url: str) -> float:
+        host = (urlsplit(url).hostname or '').lower()
+        return self.ttls_host.get(host, self.ttl_padrao)
+
+    def obter(self, url: str) -> Optional[EntradaCache]:
+        """Retorna a entrada (fresca ou não) e atualiza o instante de acesso"""
+        chave = normalizar_url(url)
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT status, headers, etag, last_modified, expira_em, conteudo FROM entradas WHERE chave = ?',
+                (chave,),
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute('UPDATE entradas SET acessado_em = ? WHERE chave = ?', (time.time(), chave))
+        status, headers, etag, last_modified, expira_em, conteudo = row
+        return EntradaCache(url=chave, status=status, conteudo=conteudo, headers=json.loads(headers or '{}'),
+                            etag=etag, last_modified=last_modified, expira_em=expira_em)
+
+    def salvar(self, url: str, status: int, conteudo: bytes, headers: Dict[str, str]):
+        """Armazena uma resposta 200 e aplica o limite de tamanho"""
+        headers_min = {k.lower(): v for k, v in headers.items()}
+        if 'no-store' in headers_min.get('cache-control', '').lower():
+            return
+        chave = normalizar_url(url)
+        agora = time.time()
+        etag = headers_min.get('etag')
+        last_modified = headers_min.get('last-modified')
+        tamanho = len(conteudo)
+        with self._lock:
+            anterior = self._conn.execute('SELECT tamanho FROM entradas WHERE chave = ?', (chave,)).fetchone()
+            self._conn.execute(
+                'INSERT OR REPLACE INTO entradas VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (chave, status, json.dumps(headers), etag, last_modified,
+                 agora + self.ttl_para(url), agora, tamanho, sqlite3.Binary(conteudo)),
+            )
+            self._total_bytes += tamanho - (anterior[0] if anterior else 0)
+            if self._total_bytes > self.max_bytes:
+                self._descartar()
+
+    def renovar(self, url: str):
+        """Renova o TTL de uma entrada após revalidação (304)"""
+        agora = time.time()
+        with self._lock:
+            self._conn.execute(
+                'UPDATE entradas SET expira_em = ?, acessado_em = ? WHERE chave = ?',
+                (agora + self.ttl_para(url), agora, normalizar_url(url)),
+            )
+
+    def _descartar(self):
+        """Remove entradas LRU até ficar abaixo de 90% do limite (chamado com o lock)"""
+        alvo = self.max_bytes * 0.9
+        for chave, tamanho in self._conn.execute(
+            'SELECT chave, tamanho FROM entradas ORDER BY acessado_em'
+        ).fetchall():
+            if self._total_bytes <= alvo:
+                break
+            self._conn.execute('DELETE FROM entradas WHERE chave = ?', (chave,))
+            self._total_bytes -= tamanho
+            with self._lock_contadores:
+                self._contadores['descartes'] += 1
+        logging.info(f"Cache HTTP reduzido para {self._total_bytes} bytes")
+
+    def registrar(self, evento: str):
+        """Incrementa um contador: 'hits', 'misses' ou 'revalidacoes' (sem IO, seguro no event loop)"""
+        with self._lock_contadores:
+            self._contadores[evento] += 1
+
+    def estatisticas(self) -> Dict[str, float]:
+        with self._lock_contadores:
+            stats = dict(self._contadores)
+        with self._lock:
+            stats['bytes'] = self._total_bytes
+            stats['entradas'] = self._conn.execute('SELECT COUNT(*) FROM entradas').fetchone()[0]
+        consultas = stats['hits'] + stats['misses'] + stats['revalidacoes']
+        stats['taxa_acerto'] = (stats['hits'] + stats['revalidacoes']) / consultas if consultas else 0.0
+        return stats
+
+    def limpar(self):
+        with self._lock:
+            self._conn.execute('DELETE FROM entradas')
+            self._total_bytes = 0
@@ -5,37 +5,86 @@ BuscaJob - Automatizador de Busca de Vagas de Emprego
 Script principal para web scraping de sites de emprego
 """
 
-import requests
-from bs4 import BeautifulSoup
-import json
 import time
 import random
+import json
 from datetime import datetime, timedelta
 import re
 from urllib.parse import urljoin, quote_plus
 import logging
 import os
-from dataclasses import dataclass, asdict
-from typing import List, Dict, Optional
-import concurrent.futures
-from fake_useragent import UserAgent
+import sys
+import threading
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Callable, List, Dict, FrozenSet, Iterator, Optional, Tuple
+from concurrent.futures import as_completed
+from result_cache import CacheTTL, canonicalizar, chave_criterios
+from parsers import PARSERS
+from filtros import compilar_filtros, extrair_valor_salario
+from deduplicacao import DeduplicadorIncremental, DeduplicadorVagas
+from job_store import ArmazemVagas
+from vaga_batch import VagaBatch
+from metricas import METRICAS
+
+if TYPE_CHECKING:
+    # asyncio, motor HTTP, limitador e cache HTTP só são importados quando o motor é criado
+    from fetch_engine import MotorRequisicoes, RespostaHTTP
+from arquivo_vagas import EXTENSAO_INDICE, escrever_vagas
+from classificador import (
+    MODALIDADES, classificar, internar_tags, modalidade_de, normalizar_modalidade, tipo_principal,
+)
 
 # Diretório base do backend
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
-# Configuração de logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(os.path.join(BASE_DIR, 'buscajob.log')),
-        logging.StreamHandler()
-    ]
-)
 
-@dataclass
+LATENCIA_SITE = METRICAS.histograma(
+    'buscajob_site_latencia_segundos', 'Duração do scraping de um site (sem cache)', ('site',))
+VAGAS_SITE = METRICAS.contador('buscajob_site_vagas_total', 'Vagas extraídas por site (sem cache)', ('site',))
+ERROS_SITE = METRICAS.contador('buscajob_site_erros_total', 'Scrapers que terminaram com exceção', ('site',))
+LATENCIA_BUSCA = METRICAS.histograma(
+    'buscajob_busca_latencia_segundos', 'Duração de uma busca completa (incluindo cache)', ('tipo',))
+
+
+def configurar_logging():
+    """
+    Logging em arquivo (buscajob.log) e no console. Chamado só pelos pontos de
+    entrada (`main` daqui e do api_server): importar o módulo não abre arquivos
+    """
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler(os.path.join(BASE_DIR, 'buscajob.log')),
+            logging.StreamHandler()
+        ]
+    )
+
+
+# Cabeçalhos fixos de todas as requisições (o User-Agent é sorteado a cada uma)
+HEADERS_PADRAO = {
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'pt-BR,pt;q=0.9,en;q=0.8',
+    'Accept-Encoding': 'gzip, deflate',
+    'Connection': 'keep-alive',
+}
+# Usado quando o fake_useragent não está instalado ou não consegue carregar seus dados
+USER_AGENT_PADRAO = ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+                     '(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
+
+# Campos com poucos valores distintos: internados para que vagas repetidas compartilhem a mesma string
+CAMPOS_INTERNADOS = ('empresa', 'localizacao', 'data_publicacao', 'site_origem', 'tipo_contrato',
+                     'nivel_experiencia', 'modalidade')
+
+
+def internar(valor):
+    """`sys.intern` tolerante a valores que não são str (ex.: None vindo de um scraper)"""
+    return sys.intern(valor) if type(valor) is str else valor
+
+
+@dataclass(slots=True)
 class Vaga:
-    """Classe para representar uma vaga de emprego"""
+    """Classe para representar uma vaga de emprego (compacta: __slots__ e strings repetidas internadas)"""
     titulo: str
     empresa: str
     localizacao: str
@@ -46,26 +95,79 @@ class Vaga:
     url: str
     tipo_contrato: str = ""
     nivel_experiencia: str = ""
-    palavras_chave: List[str] = None
+    palavras_chave: Tuple[str, ...] = ()
     modalidade: str = ""
+    # URLs de todas as fontes quando a vaga é o registro mesclado de duplicatas (ver deduplicacao.py)
+    urls_fontes: Tuple[str, ...] = ()
+    # Tags de tipo/modalidade/nível calculadas uma vez na criação (ver classificador.py)
+    tags: FrozenSet[str] = field(default=frozenset(), compare=False, repr=False)
     
     def __post_init__(self):
-        if self.palavras_chave is None:
-            self.palavras_chave = []
+        self.palavras_chave = tuple(self.palavras_chave or ())
+        self.urls_fontes = tuple(self.urls_fontes or ())
+        for campo in CAMPOS_INTERNADOS:
+            setattr(self, campo, internar(getattr(self, campo)))
+        # Tags já informadas (ex.: vaga reconstruída de um VagaBatch) não são recalculadas
+        if self.tags:
+            self.tags = internar_tags(self.tags)
+        else:
+            self.classificar()
+
+    def classificar(self):
+        """Recalcula as tags (necessário apenas se título/descrição/tipo/modalidade mudarem)"""
+        self.tags = internar_tags(classificar(self.titulo, self.descricao, self.localizacao, self.tipo_contrato,
+                                              self.modalidade, self.nivel_experiencia))
+
+@dataclass
+class ResultadoLote:
+    """Resultado de `JobScraper.buscar_vagas_lote`"""
+    por_consulta: List[List[Vaga]]
+    vagas: List[Vaga]
+    buscas_executadas: int = 0
+
+class BuscaCancelada(Exception):
+    """Lote interrompido por pedido de cancelamento"""
 
 class JobScraper:
     """Classe principal para scraping de vagas de emprego"""
     
-    def __init__(self):
-        self.ua = UserAgent()
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': self.ua.random,
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-            'Accept-Language': 'pt-BR,pt;q=0.9,en;q=0.8',
-            'Accept-Encoding': 'gzip, deflate',
-            'Connection': 'keep-alive',
-        })
+    def __init__(self, armazem: Optional[ArmazemVagas] = None, retencao=None):
+        # Gerador de User-Agent criado na primeira requisição (ver `user_agent`)
+        self._ua = None
+        self._lock_ua = threading.Lock()
+
+        # Configuração por site (mesmas chaves de self.scrapers): taxa em
+        # requisições/segundo, rajada máxima sem espera, TTL do cache HTTP (s)
+        # e critérios que mudam o que o site retorna (consultas que só diferem
+        # nos demais campos são atendidas por uma única busca no site)
+        self.config_sites = {
+            'indeed': {'host': 'br.indeed.com', 'taxa': 0.5, 'rajada': 2, 'ttl_cache': 1800, 'parametros': ('cargo', 'localizacao')},
+            'catho': {'host': 'www.catho.com.br', 'taxa': 0.5, 'rajada': 2, 'ttl_cache': 1800, 'parametros': ('cargo',)},
+            'vagas': {'host': 'www.vagas.com.br', 'taxa': 1.0, 'rajada': 3, 'ttl_cache': 3600, 'parametros': ('cargo',)},
+            'linkedin': {'host': 'www.linkedin.com', 'taxa': 0.2, 'rajada': 1, 'ttl_cache': 900, 'parametros': ('cargo',)},
+            'glassdoor': {'host': 'www.glassdoor.com.br', 'taxa': 0.3, 'rajada': 1, 'ttl_cache': 3600, 'parametros': ('cargo', 'localizacao')},
+            'infojobs': {'host': 'www.infojobs.com.br', 'taxa': 1.0, 'rajada': 3, 'ttl_cache': 3600, 'parametros': ('cargo',)},
+            'stackoverflow': {'host': 'stackoverflow.com', 'taxa': 1.0, 'rajada': 3, 'ttl_cache': 7200, 'parametros': ('cargo', 'localizacao')},
+            'github': {'host': 'github.com', 'taxa': 1.0, 'rajada': 3, 'ttl_cache': 7200, 'parametros': ('cargo',)},
+            'trampos': {'host': 'trampos.co', 'taxa': 1.0, 'rajada': 2, 'ttl_cache': 3600, 'parametros': ('cargo', 'localizacao')},
+            'rocket': {'host': 'rocketjobs.com.br', 'taxa': 1.0, 'rajada': 2, 'ttl_cache': 3600, 'parametros': ('cargo',)},
+            'startup': {'host': 'startupjobs.com', 'taxa': 1.0, 'rajada': 2, 'ttl_cache': 3600, 'parametros': ('cargo',)},
+        }
+
+        # Motor HTTP, caches e armazém são criados no primeiro uso (ver `_instancia`):
+        # criar o scraper não cria arquivos nem o cache_http/, não registra o atexit
+        # do motor e não importa asyncio/aiohttp
+        self._instancias: Dict[str, object] = {}
+        self._lock_instancias = threading.RLock()
+
+        # Duplicatas aproximadas entre sites (MinHash/LSH); limiar=1.0 mantém só a chave exata
+        self.deduplicador = DeduplicadorVagas(limiar=0.75)
+
+        # Histórico de resultados indexado (SQLite + FTS5); sem um armazém informado, criado na primeira gravação
+        if armazem is not None:
+            self._instancias['armazem'] = armazem
+        # Retenção (retencao.GerenciadorRetencao) onde registrar os resultados gravados, se houver
+        self.retencao = retencao
         
         self.scrapers = {
             'indeed': self._scrape_indeed,
@@ -81,6 +183,91 @@ class JobScraper:
             'startup': self._scrape_startup
         }
 
+    def _instancia(self, nome: str, criar: Callable[[], object]):
+        """Objeto `nome`, criado com `criar()` na primeira chamada (uma vez, entre threads)"""
+        instancia = self._instancias.get(nome)
+        if instancia is None:
+            with self._lock_instancias:
+                instancia = self._instancias.get(nome)
+                if instancia is None:
+                    instancia = self._instancias[nome] = criar()
+        return instancia
+
+    def instanciado(self, nome: str) -> bool:
+        """Se `nome` (ex.: 'motor', 'cache_http') já foi criado; para coletas que não devem criá-lo"""
+        return nome in self._instancias
+
+    @property
+    def limitador(self):
+        """Limitador compartilhado por todas as threads e tarefas assíncronas"""
+        def _criar():
+            from rate_limiter import LimitadorPorHost
+            limitador = LimitadorPorHost(taxa_padrao=0.5, rajada_padrao=1)
+            for config in self.config_sites.values():
+                limitador.configurar(config['host'], config['taxa'], config['rajada'])
+            return limitador
+        return self._instancia('limitador', _criar)
+
+    @property
+    def cache_http(self):
+        """Cache HTTP persistente com revalidação condicional (ETag/Last-Modified)"""
+        def _criar():
+            from http_cache import CacheHTTP
+            return CacheHTTP(
+                os.path.join(BASE_DIR, 'cache_http'),
+                ttls_host={c['host']: c['ttl_cache'] for c in self.config_sites.values()},
+            )
+        return self._instancia('cache_http', _criar)
+
+    @property
+    def motor(self) -> 'MotorRequisicoes':
+        """Motor assíncrono compartilhado por todos os scrapers"""
+        def _criar():
+            from fetch_engine import MotorRequisicoes
+            return MotorRequisicoes(
+                limite_por_host=4,
+                headers=HEADERS_PADRAO,
+                user_agent=self.user_agent,
+                limitador=self.limitador,
+                cache=self.cache_http,
+            )
+        return self._instancia('motor', _criar)
+
+    # Memoização de buscas: resultados brutos por site e resultados filtrados
+    # por critérios completos (limitados pelo total de vagas guardadas)
+    @property
+    def cache_brutos(self) -> CacheTTL:
+        return self._instancia('cache_brutos', lambda: CacheTTL(ttl=600, max_peso=20000))
+
+    @property
+    def cache_resultados(self) -> CacheTTL:
+        return self._instancia('cache_resultados', lambda: CacheTTL(ttl=600, max_peso=20000))
+
+    @property
+    def cache_filtros(self) -> CacheTTL:
+        """Filtros compilados por critérios canônicos (reaproveitados entre buscas e lotes)"""
+        return self._instancia('cache_filtros', lambda: CacheTTL(ttl=3600, max_peso=256))
+
+    @property
+    def armazem(self) -> ArmazemVagas:
+        return self._instancia('armazem', lambda: ArmazemVagas(os.path.join(BASE_DIR, 'buscajob.sqlite3')))
+
+    def user_agent(self) -> str:
+        """
+        User-Agent aleatório para uma requisição. O fake_useragent (dependência
+        opcional, ~40 ms para importar) só é carregado na primeira chamada
+        """
+        if self._ua is None:
+            with self._lock_ua:
+                if self._ua is None:
+                    try:
+                        from fake_useragent import UserAgent
+                        self._ua = UserAgent()
+                    except Exception as e:
+                        logging.warning(f"fake_useragent indisponível, usando User-Agent fixo: {e}")
+                        self._ua = False
+        return self._ua.random if self._ua else USER_AGENT_PADRAO
+
     def _gerar_descricao(self, cargo: str, empresa: str) -> str:
         """Gera uma descrição variada e curta para a vaga (mock)."""
         responsaveis = [
@@ -128,50 +315,269 @@ class JobScraper:
             Lista de vagas encontradas
         """
         logging.info(f"Iniciando busca com critérios: {criterios}")
+        inicio = time.perf_counter()
         
-        todas_vagas = []
         sites_selecionados = criterios.get('sites', ['indeed', 'catho'])
+
+        # Mesmos critérios (a menos de ordem, caixa e acentos) reaproveitam o resultado
+        chave = chave_criterios(dict(criterios, sites=sites_selecionados))
+        em_cache = self.cache_resultados.obter(chave)
+        if em_cache is not None:
+            logging.info(f"Resultado em cache: {len(em_cache)} vagas")
+            LATENCIA_BUSCA.observar(time.perf_counter() - inicio, 'simples')
+            return list(em_cache)
         
-        # Executa scraping em paralelo para melhor performance
-        with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
-            futures = {}
-            
-            for site in sites_selecionados:
-                if site in self.scrapers:
-                    future = executor.submit(self.scrapers[site], criterios)
-                    futures[future] = site
-            
-            for future in concurrent.futures.as_completed(futures):
-                site = futures[future]
-                try:
-                    vagas = future.result()
-                    todas_vagas.extend(vagas)
-                    logging.info(f"Encontradas {len(vagas)} vagas no {site}")
-                except Exception as e:
-                    logging.error(f"Erro ao buscar no {site}: {e}")
+        # Executa o scraping de todos os sites concorrentemente no motor assíncrono
+        todas_vagas = self.motor.executar(self._coletar_sites(sites_selecionados, criterios))
         
-        # Remove duplicatas baseado no título e empresa
-        vagas_unicas = self._remover_duplicatas(todas_vagas)
-
-        # Normaliza URLs de vagas (corrige caminhos relativos e ausência de esquema)
-        for v in vagas_unicas:
-            try:
-                v.url = self._normalize_url(getattr(v, 'url', ''), getattr(v, 'site_origem', ''))
-            except Exception:
-                pass
-
-        # Infere modalidade quando não fornecida
-        for v in vagas_unicas:
-            if not getattr(v, 'modalidade', ''):
-                v.modalidade = self._inferir_modalidade(v.titulo, v.descricao, v.localizacao)
-
-        # Aplica filtros adicionais
-        vagas_filtradas = self._aplicar_filtros(vagas_unicas, criterios)
+        vagas_filtradas = self._pos_processar(todas_vagas, criterios)
         
         logging.info(f"Total de vagas encontradas: {len(vagas_filtradas)}")
+        self.cache_resultados.guardar(chave, tuple(vagas_filtradas), peso=len(vagas_filtradas))
+        LATENCIA_BUSCA.observar(time.perf_counter() - inicio, 'simples')
         return vagas_filtradas
+
+    def buscar_vagas_incremental(self, criterios: Dict) -> Iterator[Dict]:
+        """
+        Versão em fluxo de `buscar_vagas`: produz um evento por site assim que
+        a busca nele termina, sem esperar o site mais lento
+        
+        Cada evento {'evento': 'site', 'site', 'vagas', 'encontradas', 'duracao'}
+        traz só as vagas do site que passam nos filtros e não duplicam nenhuma
+        já produzida. O último evento, {'evento': 'fim', 'vagas', 'sites',
+        'duplicatas'}, traz a lista completa deduplicada (a mesma de `buscar_vagas`).
+        
+        Args:
+            criterios: Dicionário com critérios de busca
+        """
+        logging.info(f"Iniciando busca incremental com critérios: {criterios}")
+        inicio = time.perf_counter()
+        sites_selecionados = criterios.get('sites', ['indeed', 'catho'])
+        chave = chave_criterios(dict(criterios, sites=sites_selecionados))
+        em_cache = self.cache_resultados.obter(chave)
+        if em_cache is not None:
+            vagas = list(em_cache)
+            logging.info(f"Resultado em cache: {len(vagas)} vagas")
+            yield {'evento': 'site', 'site': 'cache', 'vagas': vagas, 'encontradas': len(vagas), 'duracao': 0.0}
+            yield {'evento': 'fim', 'vagas': vagas, 'sites': {}, 'duplicatas': 0}
+            return
+
+        async def _cronometrado(site: str):
+            inicio = time.perf_counter()
+            vagas = await self._executar_scraper(site, criterios)
+            return site, vagas, time.perf_counter() - inicio
+
+        futuros = [self.motor.submeter(_cronometrado(site)) for site in sites_selecionados if site in self.scrapers]
+        incremental = DeduplicadorIncremental(self.deduplicador)
+        todas_vagas: List[Vaga] = []
+        por_site: Dict[str, Dict] = {}
+        try:
+            for futuro in as_completed(futuros):
+                site, vagas, duracao = futuro.result()
+                todas_vagas.extend(vagas)
+                for v in vagas:
+                    v.url = self._normalize_url(v.url, v.site_origem) or v.url
+                    if not v.modalidade:
+                        v.modalidade = modalidade_de(v.tags)
+                novas = incremental.adicionar(self._aplicar_filtros(vagas, criterios))
+                por_site[site] = {'encontradas': len(vagas), 'enviadas': len(novas), 'duracao': round(duracao, 3)}
+                yield {'evento': 'site', 'site': site, 'vagas': novas, 'encontradas': len(vagas), 'duracao': duracao}
+        finally:
+            # Cliente desconectado no meio do fluxo: não deixa buscas órfãs no motor
+            for futuro in futuros:
+                futuro.cancel()
+
+        vagas_filtradas = self._pos_processar(todas_vagas, criterios)
+        logging.info(f"Total de vagas encontradas: {len(vagas_filtradas)}")
+        self.cache_resultados.guardar(chave, tuple(vagas_filtradas), peso=len(vagas_filtradas))
+        LATENCIA_BUSCA.observar(time.perf_counter() - inicio, 'incremental')
+        yield {'evento': 'fim', 'vagas': vagas_filtradas, 'sites': por_site, 'duplicatas': incremental.descartadas}
+
+    def buscar_vagas_lote(self, lista_criterios: List[Dict], max_concorrencia: int = 16,
+                          progresso: Optional[Callable[[Dict], None]] = None,
+                          cancelamento: Optional[threading.Event] = None) -> ResultadoLote:
+        """
+        Executa várias buscas de uma vez (ex.: cargo × cidade do relatório fixo)
+        
+        Todas as unidades (consulta, site) rodam em um único executor limitado a
+        `max_concorrencia` buscas simultâneas, e consultas que um site atende com
+        a mesma busca (ver `parametros` em config_sites) compartilham o resultado.
+        
+        Args:
+            lista_criterios: Lista de dicionários de critérios
+            max_concorrencia: Máximo de buscas em sites simultâneas
+            progresso: Chamada a cada busca concluída com {'consultas_concluidas',
+                'consultas_total', 'sites': {site: {'total', 'concluidas', 'vagas'}}}
+                (executada na thread do motor: deve ser rápida)
+            cancelamento: Evento que, quando sinalizado, impede o início de novas
+                buscas e faz o lote terminar com BuscaCancelada
+            
+        Returns:
+            ResultadoLote com as vagas por consulta e a visão mesclada sem duplicatas
+        """
+        logging.info(f"Iniciando lote com {len(lista_criterios)} consultas")
+        inicio = time.perf_counter()
+        resultado = self.motor.executar(
+            self._buscar_lote_async(lista_criterios, max_concorrencia, progresso, cancelamento)
+        )
+        LATENCIA_BUSCA.observar(time.perf_counter() - inicio, 'lote')
+        logging.info(
+            f"Lote concluído: {len(resultado.vagas)} vagas únicas em {resultado.buscas_executadas} buscas"
+        )
+        return resultado
+
+    async def _buscar_lote_async(self, lista_criterios: List[Dict], max_concorrencia: int,
+                                 progresso: Optional[Callable[[Dict], None]] = None,
+                                 cancelamento: Optional[threading.Event] = None) -> ResultadoLote:
+        import asyncio
+
+        limite = asyncio.Semaphore(max_concorrencia)
+        por_site: Dict[str, Dict[str, int]] = {}
+        consultas_por_chave: Dict[tuple, List[int]] = {}
+        faltando: List[set] = []
+        concluidas = [0]
+
+        def _registrar(chave: tuple, site: str, quantidade: int):
+            estado = por_site[site]
+            estado['concluidas'] += 1
+            estado['vagas'] += quantidade
+            for i in consultas_por_chave[chave]:
+                faltando[i].discard(chave)
+                if not faltando[i]:
+                    concluidas[0] += 1
+            if progresso is not None:
+                progresso({
+                    'consultas_concluidas': concluidas[0],
+                    'consultas_total': len(lista_criterios),
+                    'sites': {s: dict(e) for s, e in por_site.items()},
+                })
+
+        async def _unidade(chave: tuple, site: str, criterios: Dict) -> List[Vaga]:
+            async with limite:
+                # Cancelado: as buscas ainda na fila não chegam a começar
+                if cancelamento is not None and cancelamento.is_set():
+                    return []
+                vagas = await self._executar_scraper(site, criterios)
+            _registrar(chave, site, len(vagas))
+            return vagas
+
+        # Agrupa as unidades (consulta, site) pela chave bruta: uma busca por grupo
+        unidades: Dict[tuple, asyncio.Future] = {}
+        planos: List[List[tuple]] = []
+        for criterios in lista_criterios:
+            chaves = []
+            for site in criterios.get('sites', ['indeed', 'catho']):
+                if site not in self.scrapers:
+                    continue
+                chave = self._chave_bruta(site, criterios)
+                if chave not in unidades:
+                    unidades[chave] = asyncio.ensure_future(_unidade(chave, site, criterios))
+                    estado = por_site.setdefault(site, {'total': 0, 'concluidas': 0, 'vagas': 0})
+                    estado['total'] += 1
+                if chave not in chaves:
+                    consultas_por_chave.setdefault(chave, []).append(len(planos))
+                chaves.append(chave)
+            planos.append(chaves)
+            faltando.append(set(chaves))
+            if not chaves:
+                concluidas[0] += 1
+
+        await asyncio.gather(*unidades.values())
+        if cancelamento is not None and cancelamento.is_set():
+            raise BuscaCancelada(f"Lote cancelado após {concluidas[0]} de {len(lista_criterios)} consultas")
+
+        por_consulta = []
+        for criterios, chaves in zip(lista_criterios, planos):
+            todas_vagas = [vaga for chave in chaves for vaga in unidades[chave].result()]
+            por_consulta.append(self._pos_processar(todas_vagas, criterios))
+
+        vagas = self._remover_duplicatas([vaga for vagas in por_consulta for vaga in vagas])
+        return ResultadoLote(por_consulta=por_consulta, vagas=vagas, buscas_executadas=len(unidades))
+
+    def _pos_processar(self, todas_vagas: List[Vaga], criterios: Dict) -> List[Vaga]:
+        """
+        Normaliza URLs, infere modalidade, aplica os filtros dos critérios e remove
+        duplicatas, tudo sobre as colunas de um `VagaBatch`; só as vagas que
+        sobram voltam a ser objetos `Vaga`
+        """
+        lote = VagaBatch.de_vagas(todas_vagas)
+
+        # Normaliza URLs de vagas (corrige caminhos relativos e ausência de esquema),
+        # antes da deduplicação para que o registro mesclado guarde as URLs finais
+        lote.colunas['url'] = [self._normalizar_url_segura(url, site)
+                               for url, site in zip(lote.coluna('url'), lote.coluna('site_origem'))]
+
+        # Infere modalidade quando não fornecida (tags já calculadas na criação da vaga)
+        lote.colunas['modalidade'] = [modalidade or modalidade_de(tags)
+                                      for modalidade, tags in zip(lote.coluna('modalidade'), lote.coluna('tags'))]
+
+        # Filtra antes de deduplicar: uma vaga que passa no filtro não pode ser
+        # mesclada em uma duplicata que não passa e sumir junto com ela
+        lote = lote.filtrar(self._filtro(criterios))
+
+        # Remove duplicatas (exatas e aproximadas entre sites), mesclando as fontes
+        return lote.deduplicar(deduplicador=self.deduplicador).para_vagas()
+
+    def _normalizar_url_segura(self, url: Optional[str], site: Optional[str]) -> Optional[str]:
+        try:
+            return self._normalize_url(url, site)
+        except Exception:
+            return url
+
+    def invalidar_cache(self, site: Optional[str] = None) -> int:
+        """
+        Invalida os resultados memorizados
+        
+        Args:
+            site: Chave do site (ex.: 'indeed'); quando omitido, limpa tudo
+            
+        Returns:
+            Quantidade de entradas brutas removidas
+        """
+        if site is None:
+            removidas = self.cache_brutos.invalidar()
+        else:
+            removidas = self.cache_brutos.invalidar(lambda chave: chave[0] == site)
+        # Resultados filtrados derivam dos brutos e são sempre descartados
+        self.cache_resultados.invalidar()
+        return removidas
+
+    def _chave_bruta(self, site: str, criterios: Dict) -> tuple:
+        """Chave do cache bruto: só os critérios que mudam o que o site retorna"""
+        parametros = self.config_sites.get(site, {}).get('parametros', ('cargo', 'localizacao'))
+        return (site,) + tuple(canonicalizar(criterios.get(p) or '') for p in parametros)
+
+    async def _coletar_sites(self, sites: List[str], criterios: Dict) -> List[Vaga]:
+        """Executa os scrapers dos sites selecionados como tarefas concorrentes"""
+        import asyncio
+
+        resultados = await asyncio.gather(*(
+            self._executar_scraper(site, criterios) for site in sites if site in self.scrapers
+        ))
+        return [vaga for vagas in resultados for vaga in vagas]
+
+    async def _executar_scraper(self, site: str, criterios: Dict) -> List[Vaga]:
+        """Executa o scraper de um site, isolando falhas dos demais"""
+        chave = self._chave_bruta(site, criterios)
+        em_cache = self.cache_brutos.obter(chave)
+        if em_cache is not None:
+            logging.info(f"Encontradas {len(em_cache)} vagas no {site} (cache)")
+            return list(em_cache)
+        inicio = time.perf_counter()
+        try:
+            vagas = await self.scrapers[site](criterios)
+            logging.info(f"Encontradas {len(vagas)} vagas no {site}")
+            self.cache_brutos.guardar(chave, tuple(vagas), peso=len(vagas))
+            VAGAS_SITE.inc(site, valor=len(vagas))
+            return vagas
+        except Exception as e:
+            logging.error(f"Erro ao buscar no {site}: {e}")
+            ERROS_SITE.inc(site)
+            return []
+        finally:
+            LATENCIA_SITE.observar(time.perf_counter() - inicio, site)
     
-    def _scrape_indeed(self, criterios: Dict) -> List[Vaga]:
+    async def _scrape_indeed(self, criterios: Dict) -> List[Vaga]:
         """Scraping do Indeed (implementação simplificada para demonstração)"""
         vagas = []
         
@@ -207,50 +613,31 @@ class JobScraper:
         
         return vagas
     
+    def _extrair_vagas_indeed(self, html) -> List[Vaga]:
+        """Extrai todas as vagas de uma página de listagem do Indeed"""
+        vagas = []
+        for card in PARSERS['indeed'].cards(html):
+            vaga = self._extrair_vaga_indeed(card)
+            if vaga:
+                vagas.append(vaga)
+        return vagas
+    
     def _extrair_vaga_indeed(self, card) -> Optional[Vaga]:
-        """Extrai dados de uma vaga do Indeed"""
+        """Extrai dados de uma vaga do Indeed (card lxml, ou Tag do BeautifulSoup)"""
         try:
-            # Título
-            titulo_elem = card.find('h2', class_='jobTitle') or card.find('a', {'data-jk': True})
-            titulo = titulo_elem.get_text(strip=True) if titulo_elem else "Título não encontrado"
-            
-            # Empresa
-            empresa_elem = card.find('span', class_='companyName') or card.find('a', class_='turnstileLink')
-            empresa = empresa_elem.get_text(strip=True) if empresa_elem else "Empresa não informada"
-            
-            # Localização
-            loc_elem = card.find('div', class_='companyLocation')
-            localizacao = loc_elem.get_text(strip=True) if loc_elem else "Localização não informada"
-            
-            # Salário
-            salary_elem = card.find('span', class_='salary-snippet') or card.find('div', class_='salary-snippet-container')
-            salario = salary_elem.get_text(strip=True) if salary_elem else "Salário não informado"
-            
-            # Descrição
-            desc_elem = card.find('div', class_='job-snippet') or card.find('ul')
-            descricao = desc_elem.get_text(strip=True)[:200] + "..." if desc_elem else "Descrição não disponível"
-            
-            # Tentar extrair tipo de contratação da descrição
-            tipo_contrato = ""
-            descricao_upper = descricao.upper()
-            if any(palavra in descricao_upper for palavra in ['CLT', 'CARTEIRA', 'EFETIVO']):
-                tipo_contrato = "CLT"
-            elif any(palavra in descricao_upper for palavra in ['PJ', 'PESSOA JURÍDICA', 'CNPJ']):
-                tipo_contrato = "PJ"
-            elif any(palavra in descricao_upper for palavra in ['ESTÁGIO', 'ESTAGIÁRIO', 'TRAINEE']):
-                tipo_contrato = "Estágio"
-            elif any(palavra in descricao_upper for palavra in ['FREELANCER', 'FREELA', 'AUTÔNOMO']):
-                tipo_contrato = "Freelancer"
-            elif any(palavra in descricao_upper for palavra in ['TEMPORÁRIO', 'TEMP']):
-                tipo_contrato = "Temporário"
-            elif any(palavra in descricao_upper for palavra in ['TERCEIRIZADO', 'OUTSOURCING']):
-                tipo_contrato = "Terceirizado"
+            # Todos os campos do card em uma única passada
+            campos = PARSERS['indeed'].extrair_card(card)
+            titulo = campos.get('titulo') or "Título não encontrado"
+            empresa = campos.get('empresa') or "Empresa não informada"
+            localizacao = campos.get('localizacao') or "Localização não informada"
+            salario = campos.get('salario') or "Salário não informado"
+            descricao = campos['descricao'][:200] + "..." if 'descricao' in campos else "Descrição não disponível"
             
             # URL
-            link_elem = card.find('a', {'data-jk': True}) or titulo_elem
-            url = urljoin("https://br.indeed.com", link_elem.get('href', '')) if link_elem else ""
+            href = campos.get('link_href') or campos.get('titulo_href', '')
+            url = urljoin("https://br.indeed.com", href) if ('link' in campos or 'titulo' in campos) else ""
             
-            return Vaga(
+            vaga = Vaga(
                 titulo=titulo,
                 empresa=empresa,
                 localizacao=localizacao,
@@ -258,15 +645,17 @@ class JobScraper:
                 descricao=descricao,
                 data_publicacao=datetime.now().strftime('%d/%m/%Y'),
                 site_origem='Indeed',
-                url=url,
-                tipo_contrato=tipo_contrato
+                url=url
             )
+            # Tipo de contratação inferido pelas tags calculadas na criação da vaga
+            vaga.tipo_contrato = tipo_principal(vaga.tags)
+            return vaga
             
         except Exception as e:
             logging.warning(f"Erro ao extrair vaga: {e}")
             return None
     
-    def _scrape_catho(self, criterios: Dict) -> List[Vaga]:
+    async def _scrape_catho(self, criterios: Dict) -> List[Vaga]:
         """Scraping do Catho (implementação simplificada)"""
         vagas = []
         
@@ -301,7 +690,7 @@ class JobScraper:
         
         return vagas
     
-    def _scrape_vagas_com(self, criterios: Dict) -> List[Vaga]:
+    async def _scrape_vagas_com(self, criterios: Dict) -> List[Vaga]:
         """Scraping do Vagas.com (implementação simplificada)"""
         vagas = []
         
@@ -330,7 +719,7 @@ class JobScraper:
         
         return vagas
     
-    def _scrape_linkedin(self, criterios: Dict) -> List[Vaga]:
+    async def _scrape_linkedin(self, criterios: Dict) -> List[Vaga]:
         """Scraping do LinkedIn (implementação simplificada)"""
         vagas = []
         
@@ -360,145 +749,39 @@ class JobScraper:
         
         return vagas
     
-    def _fazer_requisicao(self, url: str, max_retries: int = 3) -> Optional[requests.Response]:
-        """Faz requisição HTTP com retry e rate limiting"""
-        for tentativa in range(max_retries):
-            try:
-                # Rate limiting
-                time.sleep(random.uniform(1, 3))
-                
-                # Rotaciona User-Agent
-                self.session.headers['User-Agent'] = self.ua.random
-                
-                response = self.session.get(url, timeout=10)
-                response.raise_for_status()
-                
-                return response
-                
-            except requests.RequestException as e:
-                logging.warning(f"Tentativa {tentativa + 1} falhou para {url}: {e}")
-                if tentativa == max_retries - 1:
-                    logging.error(f"Falha definitiva ao acessar {url}")
-                    return None
-                time.sleep(random.uniform(2, 5))
-        
-        return None
+    def _fazer_requisicao(self, url: str, max_retries: int = 3) -> Optional['RespostaHTTP']:
+        """Faz requisição HTTP com retry e rate limiting (fachada síncrona do motor)"""
+        return self.motor.buscar_sync(url, max_retries)
+
+    async def _fazer_requisicao_async(self, url: str, max_retries: int = 3) -> Optional['RespostaHTTP']:
+        """Versão assíncrona de `_fazer_requisicao`, para uso dentro dos `_scrape_*`"""
+        return await self.motor.buscar(url, max_retries)
+
+    async def _fazer_requisicoes_async(self, urls: List[str], max_retries: int = 3) -> List[Optional['RespostaHTTP']]:
+        """Busca várias páginas (ex.: paginação de listagem) concorrentemente"""
+        return await self.motor.buscar_varias(urls, max_retries)
     
     def _remover_duplicatas(self, vagas: List[Vaga]) -> List[Vaga]:
-        """Remove vagas duplicadas baseado em título e empresa"""
-        vagas_unicas = []
-        chaves_vistas = set()
-        
-        for vaga in vagas:
-            chave = f"{vaga.titulo.lower()}_{vaga.empresa.lower()}"
-            if chave not in chaves_vistas:
-                chaves_vistas.add(chave)
-                vagas_unicas.append(vaga)
-        
-        return vagas_unicas
+        """Remove vagas duplicadas (mesmo título/empresa ou quase iguais entre sites), mesclando as fontes"""
+        return VagaBatch.de_vagas(vagas).deduplicar(deduplicador=self.deduplicador).para_vagas()
     
+    def _filtro(self, criterios: Dict):
+        """Critérios compilados uma vez e reaproveitados (ver filtros.py)"""
+        chave = chave_criterios(criterios)
+        filtro = self.cache_filtros.obter(chave)
+        if filtro is None:
+            filtro = compilar_filtros(criterios)
+            self.cache_filtros.guardar(chave, filtro)
+        return filtro
+
     def _aplicar_filtros(self, vagas: List[Vaga], criterios: Dict) -> List[Vaga]:
         """Aplica filtros adicionais nas vagas"""
-        vagas_filtradas = []
-        
-        for vaga in vagas:
-            # Filtro por palavras-chave
-            if criterios.get('palavras_chave'):
-                palavras = criterios['palavras_chave'].lower().split()
-                texto_vaga = f"{vaga.titulo} {vaga.descricao}".lower()
-                if not any(palavra in texto_vaga for palavra in palavras):
-                    continue
-
-            # Filtro por localização
-            if criterios.get('localizacao'):
-                loc = criterios['localizacao'].strip().lower()
-                texto_loc_vaga = (vaga.localizacao or '').lower()
-                if loc == 'remoto':
-                    if 'remoto' not in texto_loc_vaga:
-                        continue
-                else:
-                    # Suporta múltiplas localidades separadas por vírgula, barra, ponto e vírgula ou pipe
-                    tokens = [t.strip() for t in re.split(r'[;,/\\|]', loc) if t.strip()]
-                    match = any(token in texto_loc_vaga for token in tokens)
-                    if not match:
-                        continue
-            
-            # Filtro por range salarial
-            if criterios.get('salario_minimo') or criterios.get('salario_maximo'):
-                salario_vaga = self._extrair_valor_salario(vaga.salario)
-                if salario_vaga:
-                    if criterios.get('salario_minimo') and salario_vaga < criterios['salario_minimo']:
-                        continue
-                    if criterios.get('salario_maximo') and salario_vaga > criterios['salario_maximo']:
-                        continue
-            
-            # Filtro por tipo de contratação
-            if criterios.get('tipos_contratacao'):
-                tipo_vaga = vaga.tipo_contrato.upper()
-                tipos_aceitos = [t.upper() for t in criterios['tipos_contratacao']]
-                
-                # Verificar se o tipo da vaga está nos tipos aceitos
-                # ou se a descrição/título contém indicações do tipo
-                tipo_encontrado = False
-                
-                if tipo_vaga in tipos_aceitos:
-                    tipo_encontrado = True
-                else:
-                    # Buscar indicações na descrição e título
-                    texto_busca = f"{vaga.titulo} {vaga.descricao}".upper()
-                    
-                    for tipo_aceito in tipos_aceitos:
-                        if tipo_aceito == 'CLT' and any(palavra in texto_busca for palavra in ['CLT', 'CARTEIRA', 'EFETIVO', 'CONTRATO']):
-                            tipo_encontrado = True
-                            break
-                        elif tipo_aceito == 'PJ' and any(palavra in texto_busca for palavra in ['PJ', 'PESSOA JURÍDICA', 'CNPJ', 'PRESTADOR']):
-                            tipo_encontrado = True
-                            break
-                        elif tipo_aceito == 'ESTÁGIO' and any(palavra in texto_busca for palavra in ['ESTÁGIO', 'ESTAGIÁRIO', 'TRAINEE']):
-                            tipo_encontrado = True
-                            break
-                        elif tipo_aceito == 'FREELANCER' and any(palavra in texto_busca for palavra in ['FREELANCER', 'FREELA', 'AUTÔNOMO', 'PROJETO']):
-                            tipo_encontrado = True
-                            break
-                        elif tipo_aceito == 'TEMPORÁRIO' and any(palavra in texto_busca for palavra in ['TEMPORÁRIO', 'TEMP', 'SAZONAL']):
-                            tipo_encontrado = True
-                            break
-                        elif tipo_aceito == 'TERCEIRIZADO' and any(palavra in texto_busca for palavra in ['TERCEIRIZADO', 'OUTSOURCING']):
-                            tipo_encontrado = True
-                            break
-                
-                if not tipo_encontrado:
-                    continue
-
-            # Filtro por modalidade (home office, presencial, híbrido)
-            if criterios.get('modalidades'):
-                mods_aceitas = [self._normalize_modalidade(m) for m in criterios['modalidades']]
-                mod_vaga = self._normalize_modalidade(getattr(vaga, 'modalidade', ''))
-                # Quando não é possível inferir, não filtra por modalidade
-                if mod_vaga and mod_vaga not in mods_aceitas:
-                    continue
-            
-            vagas_filtradas.append(vaga)
-        
-        return vagas_filtradas
+        return self._filtro(criterios).aplicar(vagas)
     
     def _extrair_valor_salario(self, salario_str: str) -> float:
         """Extrai valor numérico do salário"""
-        if not salario_str or salario_str.lower() in ['a combinar', 'não informado']:
-            return 0.0
-        
-        # Remove caracteres não numéricos exceto vírgula e ponto
-        numeros = re.findall(r'[\d.,]+', salario_str)
-        if numeros:
-            try:
-                # Assume formato brasileiro (vírgula como decimal)
-                valor_str = numeros[0].replace('.', '').replace(',', '.')
-                return float(valor_str)
-            except ValueError:
-                return 0.0
-        
-        return 0.0
-
+        return extrair_valor_salario(salario_str)
+    
     def _normalize_url(self, url: Optional[str], site: Optional[str]) -> Optional[str]:
         """Normaliza URLs de vagas, resolvendo caminhos relativos e adicionando esquema quando necessário."""
         if not url:
@@ -564,51 +847,64 @@ class JobScraper:
         except Exception:
             return None
     
-    def salvar_resultados(self, vagas: List[Vaga], arquivo: str = 'vagas_encontradas.json'):
-        """Salva resultados em arquivo JSON"""
+    def salvar_resultados(self, vagas: List[Vaga], arquivo: str = 'vagas_encontradas.json',
+                          criterios: Optional[Dict] = None) -> Optional[int]:
+        """
+        Salva resultados no arquivo e no armazém; o nome do arquivo identifica o
+        resultado gravado. `vagas` é uma lista de `Vaga` ou um `VagaBatch`; tudo é
+        gravado a partir das colunas do lote. Com extensão .ndjson (.ndjson.gz/.ndjson.zst)
+        as vagas são exportadas em fluxo no formato de `arquivo_vagas`, com .csv como
+        planilha e nos demais casos no JSON de sempre (timestamp, total_vagas, vagas).
+        Caminhos relativos são resolvidos a partir do diretório do módulo
+        """
         try:
-            dados = {
-                'timestamp': datetime.now().isoformat(),
-                'total_vagas': len(vagas),
-                'vagas': [asdict(vaga) for vaga in vagas]
-            }
-            
-            fullpath = arquivo if os.path.isabs(arquivo) else os.path.join(BASE_DIR, arquivo)
-            with open(fullpath, 'w', encoding='utf-8') as f:
-                json.dump(dados, f, ensure_ascii=False, indent=2)
-            
-            logging.info(f"Resultados salvos em {os.path.basename(fullpath)}")
+            arquivo = arquivo if os.path.isabs(arquivo) else os.path.join(BASE_DIR, arquivo)
+            nome = os.path.basename(arquivo).split('.', 1)[0]
+            lote = vagas if isinstance(vagas, VagaBatch) else VagaBatch.de_vagas(vagas)
+            if '.ndjson' in os.path.basename(arquivo):
+                total = escrever_vagas(arquivo, lote.registros(), {'criterios': criterios or {}})
+                logging.info(f"{total} vagas exportadas para {os.path.basename(arquivo)}")
+            elif arquivo.endswith('.csv'):
+                with open(arquivo, 'w', encoding='utf-8', newline='') as destino:
+                    lote.escrever_csv(destino)
+                logging.info(f"{len(lote)} vagas exportadas para {os.path.basename(arquivo)}")
+            else:
+                dados = {
+                    'timestamp': datetime.now().isoformat(),
+                    'total_vagas': len(lote),
+                    'vagas': list(lote.linhas()),
+                }
+                with open(arquivo, 'w', encoding='utf-8') as destino:
+                    json.dump(dados, destino, ensure_ascii=False, indent=2)
+                logging.info(f"Resultados salvos em {os.path.basename(arquivo)}")
+            resultado_id = self.armazem.salvar(lote.registros(), criterios, tipo='scraper', nome=nome)
+            logging.info(f"Resultados salvos no armazém: {nome} (id {resultado_id})")
+            if self.retencao is not None:
+                self._registrar_artefato(nome, arquivo, resultado_id)
+            return resultado_id
             
         except Exception as e:
             logging.error(f"Erro ao salvar resultados: {e}")
+            return None
+
+    def _registrar_artefato(self, nome: str, arquivo: str, resultado_id: int):
+        """Registra o resultado (e o arquivo exportado, se ficar no diretório da retenção) no manifesto"""
+        arquivos = []
+        if os.path.dirname(os.path.abspath(arquivo)) == os.path.abspath(self.retencao.diretorio):
+            arquivos = [f for f in (os.path.basename(arquivo), os.path.basename(arquivo) + EXTENSAO_INDICE)
+                        if os.path.exists(os.path.join(self.retencao.diretorio, f))]
+        self.retencao.registrar(nome, 'scraper', arquivos=arquivos, resultado_id=resultado_id)
 
     def _normalize_modalidade(self, valor: Optional[str]) -> str:
         """Normaliza modalidade para: HOME OFFICE | PRESENCIAL | HÍBRIDO."""
-        if not valor:
-            return ""
-        v = valor.strip().lower()
-        if any(x in v for x in ["home office", "home-office", "remoto", "remota"]):
-            return "HOME OFFICE"
-        if any(x in v for x in ["hibrido", "híbrido", "hibrida", "híbrida"]):
-            return "HÍBRIDO"
-        if "presencial" in v:
-            return "PRESENCIAL"
-        return ""
+        mod = normalizar_modalidade(valor)
+        return MODALIDADES[mod][1] if mod else ""
 
     def _inferir_modalidade(self, titulo: str, descricao: str, localizacao: str) -> str:
         """Infere modalidade com base em título, descrição e localização."""
-        texto = f"{titulo} {descricao} {localizacao}".lower()
-        if any(x in texto for x in ["home office", "home-office", "remoto", "remota"]):
-            return "Home office"
-        if any(x in texto for x in ["hibrido", "híbrido", "hibrida", "híbrida"]):
-            return "Híbrido"
-        if "presencial" in texto:
-            return "Presencial"
-        if (localizacao or '').strip().lower() == 'remoto':
-            return "Home office"
-        return ""
-
-    def _scrape_glassdoor(self, criterios: Dict) -> List[Vaga]:
+        return modalidade_de(classificar(titulo, descricao, localizacao))
+
+    async def _scrape_glassdoor(self, criterios: Dict) -> List[Vaga]:
         """Scraping do Glassdoor (simulado - API limitada)"""
         vagas = []
         try:
@@ -668,7 +964,7 @@ class JobScraper:
         
         return vagas
 
-    def _scrape_infojobs(self, criterios: Dict) -> List[Vaga]:
+    async def _scrape_infojobs(self, criterios: Dict) -> List[Vaga]:
         """Scraping do InfoJobs (simulado)"""
         vagas = []
         try:
@@ -722,7 +1018,7 @@ class JobScraper:
         
         return vagas
 
-    def _scrape_stackoverflow(self, criterios: Dict) -> List[Vaga]:
+    async def _scrape_stackoverflow(self, criterios: Dict) -> List[Vaga]:
         """Scraping do Stack Overflow Jobs (simulado)"""
         vagas = []
         try:
@@ -770,7 +1066,7 @@ class JobScraper:
         
         return vagas
 
-    def _scrape_github(self, criterios: Dict) -> List[Vaga]:
+    async def _scrape_github(self, criterios: Dict) -> List[Vaga]:
         """Scraping do GitHub Jobs (simulado)"""
         vagas = []
         try:
@@ -817,7 +1113,7 @@ class JobScraper:
         
         return vagas
 
-    def _scrape_trampos(self, criterios: Dict) -> List[Vaga]:
+    async def _scrape_trampos(self, criterios: Dict) -> List[Vaga]:
         """Scraping do Trampos.co (simulado)"""
         vagas = []
         try:
@@ -866,7 +1162,7 @@ class JobScraper:
         
         return vagas
 
-    def _scrape_rocket(self, criterios: Dict) -> List[Vaga]:
+    async def _scrape_rocket(self, criterios: Dict) -> List[Vaga]:
         """Scraping do Rocket Jobs (simulado)"""
         vagas = []
         try:
@@ -913,7 +1209,7 @@ class JobScraper:
         
         return vagas
 
-    def _scrape_startup(self, criterios: Dict) -> List[Vaga]:
+    async def _scrape_startup(self, criterios: Dict) -> List[Vaga]:
         """Scraping do Startup Jobs (simulado)"""
         vagas = []
         try:
@@ -962,6 +1258,7 @@ class JobScraper:
 
 def main():
     """Função principal para teste"""
+    configurar_logging()
     scraper = JobScraper()
     
     # Critérios de exemplo
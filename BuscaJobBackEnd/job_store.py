@@ -0,0 +1,502 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+BuscaJob - Armazém persistente de resultados
+Guarda cada busca (e suas vagas) em SQLite, com índices por site, data,
+modalidade, tipo e salário e um índice FTS5 sobre título e descrição, no
+lugar dos arquivos `resultados_*.json`.
+"""
+
+import base64
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from filtros import extrair_valor_salario
+
+logger = logging.getLogger(__name__)
+
+# Tipos de resultado considerados "busca" pelo /api/ultimo-resultado
+TIPOS_BUSCA = ('busca', 'agendada')
+
+# Colunas da tabela de vagas, na ordem do formato da API (VagaBatch.registros)
+COLUNAS_VAGA = ('titulo', 'empresa', 'localizacao', 'salario', 'descricao', 'dataPublicacao',
+                'site', 'url', 'tipo', 'nivel', 'modalidade')
+# Nomes alternativos (asdict de Vaga / arquivos antigos) para cada coluna
+_SINONIMOS = {
+    'dataPublicacao': 'data_publicacao',
+    'site': 'site_origem',
+    'tipo': 'tipo_contrato',
+    'nivel': 'nivel_experiencia',
+}
+# Campos opcionais das vagas de execuções incrementais (ver historico_vagas.py),
+# com a coluna de cada um; ausentes nas vagas de buscas completas
+CAMPOS_HISTORICO = {'primeiraVez': 'primeira_vez', 'ultimaVez': 'ultima_vez', 'situacao': 'situacao'}
+
+_TERMO_FTS = re.compile(r'\w+', re.UNICODE)
+
+# Datas de publicação como os sites as entregam: dd/mm/aaaa (ou dd-mm-aaaa, dd.mm.aaaa)
+# e ISO aaaa-mm-dd (com ou sem hora)
+_DATA_BR = re.compile(r'^\s*(\d{1,2})[/.-](\d{1,2})[/.-](\d{4})\b')
+_DATA_ISO = re.compile(r'^\s*(\d{4})-(\d{1,2})-(\d{1,2})\b')
+
+# Ordenações de `pagina`: nome -> expressão SQL sem NULL (comparável no cursor).
+# 'relevancia' é a ordem em que o resultado foi gravado (ordem da busca)
+ORDENACOES = {
+    'relevancia': 'v.id',
+    'salario': 'IFNULL(v.salario_valor, 0)',
+    'data': "IFNULL(v.data_iso, '')",
+    'titulo': 'v.titulo',
+    'empresa': 'v.empresa',
+}
+
+_ESQUEMA = (
+    'CREATE TABLE IF NOT EXISTS resultados ('
+    ' id INTEGER PRIMARY KEY, nome TEXT, tipo TEXT NOT NULL, criado_em TEXT NOT NULL,'
+    ' criterios TEXT, total INTEGER NOT NULL)',
+    'CREATE INDEX IF NOT EXISTS idx_resultados_tipo ON resultados (tipo, id)',
+    'CREATE INDEX IF NOT EXISTS idx_resultados_nome ON resultados (nome)',
+    'CREATE TABLE IF NOT EXISTS vagas ('
+    ' id INTEGER PRIMARY KEY, resultado_id INTEGER NOT NULL REFERENCES resultados (id) ON DELETE CASCADE,'
+    ' chave TEXT, titulo TEXT, empresa TEXT, localizacao TEXT, salario TEXT, salario_valor REAL,'
+    ' descricao TEXT, data_publicacao TEXT, site TEXT, url TEXT, tipo TEXT, nivel TEXT,'
+    ' modalidade TEXT, fontes TEXT)',
+    'CREATE INDEX IF NOT EXISTS idx_vagas_resultado ON vagas (resultado_id)',
+    'CREATE INDEX IF NOT EXISTS idx_vagas_site ON vagas (site)',
+    'CREATE INDEX IF NOT EXISTS idx_vagas_modalidade ON vagas (modalidade)',
+    'CREATE INDEX IF NOT EXISTS idx_vagas_tipo ON vagas (tipo)',
+    'CREATE INDEX IF NOT EXISTS idx_vagas_salario ON vagas (salario_valor)',
+    # Paginação por cursor dentro de um resultado, nas ordenações mais usadas
+    'CREATE INDEX IF NOT EXISTS idx_vagas_resultado_salario ON vagas (resultado_id, IFNULL(salario_valor, 0))',
+)
+
+# Colunas acrescentadas depois da criação da tabela (ALTER TABLE em bancos antigos).
+# data_iso é a data de publicação em aaaa-mm-dd, calculada na gravação: ordenação e filtro `desde`
+_COLUNAS_NOVAS = {'vagas': tuple(f'{coluna} TEXT' for coluna in CAMPOS_HISTORICO.values()) + ('data_iso TEXT',)}
+
+# Índices sobre colunas acrescentadas (criados depois da migração); os índices antigos
+# sobre o texto cru da data deixam de ser usados
+_ESQUEMA_INDICES_NOVOS = (
+    'DROP INDEX IF EXISTS idx_vagas_data',
+    'DROP INDEX IF EXISTS idx_vagas_resultado_data',
+    'CREATE INDEX IF NOT EXISTS idx_vagas_data_iso ON vagas (data_iso)',
+    "CREATE INDEX IF NOT EXISTS idx_vagas_resultado_data_iso ON vagas (resultado_id, IFNULL(data_iso, ''))",
+)
+
+# Índice de texto sincronizado com a tabela de vagas por gatilhos
+_ESQUEMA_FTS = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS vagas_fts USING fts5("
+    " titulo, descricao, content='vagas', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    'CREATE TRIGGER IF NOT EXISTS vagas_fts_ai AFTER INSERT ON vagas BEGIN'
+    ' INSERT INTO vagas_fts (rowid, titulo, descricao) VALUES (new.id, new.titulo, new.descricao); END',
+    'CREATE TRIGGER IF NOT EXISTS vagas_fts_ad AFTER DELETE ON vagas BEGIN'
+    " INSERT INTO vagas_fts (vagas_fts, rowid, titulo, descricao) VALUES ('delete', old.id, old.titulo, old.descricao); END",
+)
+
+_COLUNAS_SELECT = (
+    'v.id, v.chave, v.titulo, v.empresa, v.localizacao, v.salario, v.descricao, v.data_publicacao,'
+    ' v.site, v.url, v.tipo, v.nivel, v.modalidade, v.fontes, v.primeira_vez, v.ultima_vez, v.situacao'
+)
+_SELECT_VAGA = f'SELECT {_COLUNAS_SELECT} FROM vagas v'
+
+
+# Estimativa do tamanho de uma vaga no armazém (usada pela retenção por bytes)
+_TAMANHO_VAGA = ' + '.join(f'IFNULL(LENGTH(v.{c}), 0)' for c in (
+    'titulo', 'empresa', 'localizacao', 'salario', 'descricao', 'url', 'fontes'))
+
+
+def id_vaga(titulo: str, empresa: str, url: str) -> str:
+    """Id de vaga estável entre execuções (o `hash()` do Python muda a cada processo)"""
+    digest = hashlib.blake2b(f'{titulo}\x1f{empresa}\x1f{url}'.encode('utf-8'), digest_size=8).hexdigest()
+    return f'vaga_{digest}'
+
+
+def data_iso(texto: Optional[str]) -> Optional[str]:
+    """Data de publicação em aaaa-mm-dd (None se não reconhecida), para ordenar e filtrar"""
+    if not texto:
+        return None
+    m = _DATA_ISO.match(texto)
+    if m:
+        ano, mes, dia = m.groups()
+    else:
+        m = _DATA_BR.match(texto)
+        if not m:
+            return None
+        dia, mes, ano = m.groups()
+    try:
+        return datetime(int(ano), int(mes), int(dia)).strftime('%Y-%m-%d')
+    except ValueError:
+        return None
+
+
+def registro_de_vaga(vaga) -> Dict:
+    """
+    Normaliza uma vaga para o formato da API: aceita objetos `Vaga`, dicionários
+    de `VagaBatch.registros` e dicionários no formato de `asdict(vaga)`
+    """
+    if not isinstance(vaga, dict):
+        from vaga_batch import CAMPO_TAGS
+        vaga = {c: getattr(vaga, c) for c in getattr(vaga, '__slots__', ()) if c != CAMPO_TAGS}
+        if 'urls_fontes' in vaga:
+            vaga['fontes'] = list(vaga.pop('urls_fontes'))
+    registro = {'id': vaga.get('id')}
+    for coluna in COLUNAS_VAGA:
+        registro[coluna] = vaga.get(coluna) or vaga.get(_SINONIMOS.get(coluna, coluna)) or ''
+    fontes = vaga.get('fontes') or vaga.get('urls_fontes')
+    registro['fontes'] = list(fontes) if fontes else ([registro['url']] if registro['url'] else [])
+    registro['id'] = registro['id'] or id_vaga(registro['titulo'], registro['empresa'], registro['url'])
+    for campo in CAMPOS_HISTORICO:
+        if vaga.get(campo):
+            registro[campo] = vaga[campo]
+    return registro
+
+
+def consulta_fts(texto: str) -> Optional[str]:
+    """Converte texto livre em consulta FTS5 (qualquer um dos termos, com prefixo)"""
+    termos = _TERMO_FTS.findall(texto or '')
+    return ' OR '.join(f'"{t}"*' for t in termos) or None
+
+
+def codificar_cursor(ordem: str, valor: Any, vaga_id: int) -> str:
+    """Cursor opaco com a chave de ordenação e o id da última vaga entregue"""
+    bruto = json.dumps([ordem, valor, vaga_id], ensure_ascii=False, separators=(',', ':'))
+    return base64.urlsafe_b64encode(bruto.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decodificar_cursor(cursor: str) -> Tuple[str, Any, int]:
+    try:
+        bruto = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        ordem, valor, vaga_id = json.loads(bruto)
+        return ordem, valor, int(vaga_id)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Cursor inválido: {cursor!r}") from e
+
+
+class ArmazemVagas:
+    """
+    Resultados de busca em SQLite (um arquivo em `caminho`).
+
+    Cada chamada a `salvar` cria um resultado com suas vagas; o último
+    resultado é obtido pela chave primária e as consultas sobre vagas usam os
+    índices por coluna e o FTS5, sem ler nem renormalizar o histórico.
+    """
+
+    def __init__(self, caminho: str):
+        diretorio = os.path.dirname(os.path.abspath(caminho))
+        os.makedirs(diretorio, exist_ok=True)
+        self.caminho = caminho
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(caminho, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute('PRAGMA foreign_keys=ON')
+        for comando in _ESQUEMA:
+            self._conn.execute(comando)
+        for tabela, colunas in _COLUNAS_NOVAS.items():
+            existentes = {row[1] for row in self._conn.execute(f'PRAGMA table_info({tabela})')}
+            for coluna in colunas:
+                if coluna.split()[0] not in existentes:
+                    self._conn.execute(f'ALTER TABLE {tabela} ADD COLUMN {coluna}')
+                    if coluna.startswith('data_iso'):
+                        self._preencher_data_iso()
+        for comando in _ESQUEMA_INDICES_NOVOS:
+            self._conn.execute(comando)
+        try:
+            for comando in _ESQUEMA_FTS:
+                self._conn.execute(comando)
+            self.fts = True
+        except sqlite3.OperationalError as e:
+            # SQLite compilado sem FTS5: a busca textual cai para LIKE
+            logger.warning(f"FTS5 indisponível, busca textual sem índice: {e}")
+            self.fts = False
+
+    def _preencher_data_iso(self):
+        """Migração: calcula data_iso das vagas gravadas antes da coluna existir"""
+        rows = self._conn.execute(
+            "SELECT id, data_publicacao FROM vagas WHERE data_publicacao IS NOT NULL AND data_publicacao != ''"
+        ).fetchall()
+        self._conn.execute('BEGIN IMMEDIATE')
+        self._conn.executemany('UPDATE vagas SET data_iso = ? WHERE id = ?',
+                               ((data_iso(data), vaga_id) for vaga_id, data in rows))
+        self._conn.execute('COMMIT')
+        if rows:
+            logger.info(f"Armazém: data normalizada de {len(rows)} vaga(s) existentes")
+
+    def salvar(self, vagas: Iterable, criterios: Optional[Dict] = None, tipo: str = 'busca',
+               nome: Optional[str] = None) -> int:
+        """
+        Grava um resultado (vagas em qualquer formato aceito por `registro_de_vaga`)
+        e retorna seu id. As vagas são consumidas em fluxo: um iterador (ex.:
+        `arquivo_vagas.LeitorVagas`) é gravado sem ser carregado inteiro em memória
+        """
+        agora = datetime.now()
+        nome = nome or f"resultados_{agora.strftime('%Y%m%d_%H%M%S_%f')}"
+        total = [0]
+
+        def _linhas(resultado_id):
+            for vaga in vagas:
+                r = registro_de_vaga(vaga)
+                total[0] += 1
+                yield (
+                    resultado_id, r['id'], r['titulo'], r['empresa'], r['localizacao'], r['salario'],
+                    extrair_valor_salario(r['salario']) or None, r['descricao'], r['dataPublicacao'], r['site'],
+                    r['url'], r['tipo'], r['nivel'], r['modalidade'], json.dumps(r['fontes'], ensure_ascii=False),
+                    *(r.get(campo) for campo in CAMPOS_HISTORICO), data_iso(r['dataPublicacao']),
+                )
+
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                cursor = self._conn.execute(
+                    'INSERT INTO resultados (nome, tipo, criado_em, criterios, total) VALUES (?, ?, ?, ?, 0)',
+                    (nome, tipo, agora.isoformat(), json.dumps(criterios or {}, ensure_ascii=False)),
+                )
+                resultado_id = cursor.lastrowid
+                self._conn.executemany(
+                    'INSERT INTO vagas (resultado_id, chave, titulo, empresa, localizacao, salario, salario_valor,'
+                    ' descricao, data_publicacao, site, url, tipo, nivel, modalidade, fontes,'
+                    ' primeira_vez, ultima_vez, situacao, data_iso)'
+                    ' VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    _linhas(resultado_id),
+                )
+                self._conn.execute('UPDATE resultados SET total = ? WHERE id = ?', (total[0], resultado_id))
+                self._conn.execute('COMMIT')
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+        return resultado_id
+
+    def resultado(self, resultado_id: int) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT id, nome, tipo, criado_em, criterios, total FROM resultados WHERE id = ?', (resultado_id,)
+            ).fetchone()
+        return self._resultado_de_linha(row)
+
+    def ultimo(self, tipos: Optional[Sequence[str]] = TIPOS_BUSCA) -> Optional[Dict]:
+        """Metadados do resultado mais recente (dos `tipos` dados, ou de qualquer tipo com None)"""
+        sql = 'SELECT id, nome, tipo, criado_em, criterios, total FROM resultados'
+        parametros: list = []
+        if tipos:
+            sql += f" WHERE tipo IN ({', '.join('?' * len(tipos))})"
+            parametros.extend(tipos)
+        with self._lock:
+            row = self._conn.execute(sql + ' ORDER BY id DESC LIMIT 1', parametros).fetchone()
+        return self._resultado_de_linha(row)
+
+    def resultados(self) -> List[Dict]:
+        """Metadados de todos os resultados, do mais antigo ao mais recente, com o tamanho estimado em bytes"""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT r.id, r.nome, r.tipo, r.criado_em, r.criterios, r.total,'
+                f' (SELECT IFNULL(SUM({_TAMANHO_VAGA}), 0) FROM vagas v WHERE v.resultado_id = r.id)'
+                ' FROM resultados r ORDER BY r.id'
+            ).fetchall()
+        return [dict(self._resultado_de_linha(row), tamanho=row[6]) for row in rows]
+
+    def tamanho_resultado(self, resultado_id: int) -> int:
+        """Tamanho estimado (bytes de texto das vagas) de um resultado"""
+        with self._lock:
+            row = self._conn.execute(
+                f'SELECT IFNULL(SUM({_TAMANHO_VAGA}), 0) FROM vagas v WHERE v.resultado_id = ?', (resultado_id,)
+            ).fetchone()
+        return row[0]
+
+    def remover(self, resultado_id: int) -> bool:
+        """Apaga um resultado e suas vagas (o índice FTS acompanha pelos gatilhos)"""
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                self._conn.execute('DELETE FROM vagas WHERE resultado_id = ?', (resultado_id,))
+                removido = self._conn.execute('DELETE FROM resultados WHERE id = ?', (resultado_id,)).rowcount
+                self._conn.execute('COMMIT')
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+        return removido > 0
+
+    @staticmethod
+    def _resultado_de_linha(row) -> Optional[Dict]:
+        if row is None:
+            return None
+        return {'id': row[0], 'nome': row[1], 'tipo': row[2], 'criado_em': row[3],
+                'criterios': json.loads(row[4] or '{}'), 'total': row[5]}
+
+    def _where(self, resultado_id=None, site=None, modalidade=None, tipo=None, salario_min=None,
+               salario_max=None, texto=None, desde=None):
+        condicoes = []
+        parametros: list = []
+        if resultado_id is not None:
+            condicoes.append('v.resultado_id = ?')
+            parametros.append(resultado_id)
+        for coluna, valor in (('site', site), ('modalidade', modalidade), ('tipo', tipo)):
+            if valor:
+                valores = [valor] if isinstance(valor, str) else list(valor)
+                condicoes.append(f"v.{coluna} IN ({', '.join('?' * len(valores))})")
+                parametros.extend(valores)
+        if salario_min is not None:
+            condicoes.append('v.salario_valor >= ?')
+            parametros.append(float(salario_min))
+        if salario_max is not None:
+            condicoes.append('v.salario_valor <= ?')
+            parametros.append(float(salario_max))
+        if desde:
+            # Aceita o limite em qualquer formato de data reconhecido (ex.: 2025-01-01 ou 01/01/2025)
+            condicoes.append('v.data_iso >= ?')
+            parametros.append(data_iso(desde) or desde)
+        if texto:
+            if self.fts:
+                consulta = consulta_fts(texto)
+                if consulta:
+                    sub = 'SELECT rowid FROM vagas_fts WHERE vagas_fts MATCH ?'
+                    parametros.append(consulta)
+                    if resultado_id is not None:
+                        # As vagas de um resultado têm ids contíguos: restringe o FTS a esse intervalo
+                        sub += (' AND rowid BETWEEN (SELECT MIN(id) FROM vagas WHERE resultado_id = ?)'
+                                ' AND (SELECT MAX(id) FROM vagas WHERE resultado_id = ?)')
+                        parametros.extend([resultado_id, resultado_id])
+                    condicoes.append(f'v.id IN ({sub})')
+            else:
+                termos = _TERMO_FTS.findall(texto)
+                if termos:
+                    condicoes.append('(' + ' OR '.join(['v.titulo LIKE ? OR v.descricao LIKE ?'] * len(termos)) + ')')
+                    for termo in termos:
+                        parametros.extend([f'%{termo}%'] * 2)
+        return (' WHERE ' + ' AND '.join(condicoes)) if condicoes else '', parametros
+
+    def vagas(self, resultado_id: Optional[int] = None, limite: Optional[int] = None, offset: int = 0,
+              **filtros) -> List[Dict]:
+        """
+        Vagas no formato da API, na ordem em que foram gravadas. Filtros: site,
+        modalidade, tipo (valor ou lista), salario_min, salario_max, desde
+        (data de publicação) e texto (FTS sobre título e descrição)
+        """
+        where, parametros = self._where(resultado_id=resultado_id, **filtros)
+        sql = f'{_SELECT_VAGA}{where} ORDER BY v.id'
+        if limite is not None:
+            sql += ' LIMIT ? OFFSET ?'
+            parametros += [int(limite), int(offset)]
+        with self._lock:
+            rows = self._conn.execute(sql, parametros).fetchall()
+        return [self._vaga_de_linha(row) for row in rows]
+
+    def iterar(self, resultado_id: Optional[int] = None, lote: int = 1000, **filtros) -> Iterator[Dict]:
+        """
+        As mesmas vagas de `vagas`, lidas em lotes de `lote` por chave (v.id > último):
+        para exportar resultados grandes sem carregá-los inteiros em memória
+        """
+        where, parametros = self._where(resultado_id=resultado_id, **filtros)
+        sql = f"{_SELECT_VAGA}{where}{' AND' if where else ' WHERE'} v.id > ? ORDER BY v.id LIMIT ?"
+        ultimo = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(sql, parametros + [ultimo, lote]).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield self._vaga_de_linha(row)
+            ultimo = rows[-1][0]
+
+    def pagina(self, resultado_id: Optional[int] = None, ordem: str = 'relevancia', cursor: Optional[str] = None,
+               limite: int = 20, offset: int = 0, **filtros) -> Dict:
+        """
+        Uma janela de vagas por paginação de conjunto de chaves (keyset): o
+        cursor guarda (valor da ordenação, id) da última vaga entregue e a
+        próxima página começa logo depois dele, pelo índice, sem percorrer as
+        anteriores. `ordem` é um nome de ORDENACOES, com '-' para decrescente;
+        `offset` só é usado sem cursor (salto direto para uma página).
+        Retorna {'vagas', 'proximo_cursor'} (cursor None na última página).
+        """
+        decrescente = ordem.startswith('-')
+        expressao = ORDENACOES.get(ordem.lstrip('-'))
+        if expressao is None:
+            raise ValueError(f"Ordenação inválida: {ordem}")
+        where, parametros = self._where(resultado_id=resultado_id, **filtros)
+        operador, sentido = ('<', 'DESC') if decrescente else ('>', 'ASC')
+        por_id = expressao == 'v.id'
+        if cursor:
+            ordem_cursor, valor, vaga_id = decodificar_cursor(cursor)
+            if ordem_cursor != ordem:
+                raise ValueError(f"Cursor gerado para outra ordenação ({ordem_cursor})")
+            if por_id:
+                condicao, valores = f'v.id {operador} ?', [vaga_id]
+            else:
+                # A comparação simples na expressão permite ao SQLite usar a faixa do índice
+                condicao = f'{expressao} {operador}= ? AND ({expressao}, v.id) {operador} (?, ?)'
+                valores = [valor, valor, vaga_id]
+            where = f'{where} AND {condicao}' if where else f' WHERE {condicao}'
+            parametros += valores
+            offset = 0
+        ordenacao = f'v.id {sentido}' if por_id else f'{expressao} {sentido}, v.id {sentido}'
+        limite = max(1, int(limite))
+        sql = (f'SELECT {_COLUNAS_SELECT}, {expressao} FROM vagas v{where}'
+               f' ORDER BY {ordenacao} LIMIT ? OFFSET ?')
+        # Uma linha a mais indica se existe próxima página
+        with self._lock:
+            rows = self._conn.execute(sql, parametros + [limite + 1, max(0, int(offset))]).fetchall()
+        proximo = None
+        if len(rows) > limite:
+            rows = rows[:limite]
+            ultima = rows[-1]
+            proximo = codificar_cursor(ordem, ultima[-1], ultima[0])
+        return {'vagas': [self._vaga_de_linha(row) for row in rows], 'proximo_cursor': proximo}
+
+    def contar(self, resultado_id: Optional[int] = None, **filtros) -> int:
+        where, parametros = self._where(resultado_id=resultado_id, **filtros)
+        with self._lock:
+            return self._conn.execute(f'SELECT COUNT(*) FROM vagas v{where}', parametros).fetchone()[0]
+
+    @staticmethod
+    def _vaga_de_linha(row) -> Dict:
+        vaga = {'id': row[1] or f'vaga_{row[0]}'}
+        vaga.update(zip(COLUNAS_VAGA, row[2:13]))
+        vaga['fontes'] = json.loads(row[13] or '[]')
+        for campo, valor in zip(CAMPOS_HISTORICO, row[14:17]):
+            if valor:
+                vaga[campo] = valor
+        return vaga
+
+    def importar_arquivo(self, caminho: str, tipo: str = 'busca') -> Optional[int]:
+        """
+        Importa um `resultados_*.json` antigo ou um arquivo NDJSON de
+        `arquivo_vagas` (lido em fluxo); ignorado se já importado
+        """
+        nome = os.path.basename(caminho).split('.', 1)[0]
+        with self._lock:
+            if self._conn.execute('SELECT 1 FROM resultados WHERE nome = ?', (nome,)).fetchone():
+                return None
+        if '.ndjson' in os.path.basename(caminho):
+            from arquivo_vagas import LeitorVagas
+            leitor = LeitorVagas(caminho)
+            return self.salvar(leitor, leitor.cabecalho.get('criterios'), tipo=tipo, nome=nome)
+        with open(caminho, 'r', encoding='utf-8') as f:
+            dados = json.load(f)
+        return self.salvar(dados.get('vagas', []), dados.get('criterios'), tipo=tipo, nome=nome)
+
+    def importar_legados(self, diretorio: str) -> int:
+        """Importa os `resultados_*.json` de `diretorio`, do mais antigo ao mais recente"""
+        arquivos = sorted(
+            (os.path.join(diretorio, f) for f in os.listdir(diretorio)
+             if f.startswith('resultados_') and f.endswith('.json')),
+            key=os.path.getmtime,
+        )
+        importados = 0
+        for caminho in arquivos:
+            try:
+                if self.importar_arquivo(caminho) is not None:
+                    importados += 1
+            except (OSError, ValueError) as e:
+                logger.warning(f"Falha ao importar {os.path.basename(caminho)}: {e}")
+        if importados:
+            logger.info(f"{importados} arquivo(s) de resultados importados para o armazém")
+        return importados
+
+    def fechar(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+BuscaJob - Métricas no formato de texto do Prometheus
+Registro mínimo, sem dependências, para os caminhos quentes do scraper e da
+API: contadores e histogramas são atualizados com um lock por métrica e uma
+busca binária nos limites (alguns microssegundos, podem ficar sempre
+ligados); medidores são funções chamadas só quando /api/metrics é lido
+(profundidade de filas, taxas de acerto de cache), sem custo no caminho
+das requisições.
+
+Uso:
+    LATENCIA = METRICAS.histograma('buscajob_x_segundos', 'Latência de x', ('site',))
+    LATENCIA.observar(0.12, 'indeed')
+    METRICAS.exportar()  # texto para a resposta HTTP
+"""
+
+import threading
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# Limites padrão dos histogramas de latência (segundos) e de tamanho (bytes)
+LIMITES_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+LIMITES_BYTES = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+MIMETYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _escapar(valor) -> str:
+    return str(valor).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _rotulos(nomes: Sequence[str], valores: Sequence, extra: str = '') -> str:
+    pares = [f'{nome}="{_escapar(valor)}"' for nome, valor in zip(nomes, valores)]
+    if extra:
+        pares.append(extra)
+    return '{' + ','.join(pares) + '}' if pares else ''
+
+
+def _numero(valor: float) -> str:
+    if valor == float('inf'):
+        return '+Inf'
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+class Contador:
+    """Valor que só cresce, por combinação de rótulos"""
+    tipo = 'counter'
+
+    def __init__(self, nome: str, ajuda: str, rotulos: Sequence[str] = ()):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.rotulos = tuple(rotulos)
+        self._valores: Dict[Tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *valores_rotulos, valor: float = 1):
+        with self._lock:
+            self._valores[valores_rotulos] = self._valores.get(valores_rotulos, 0) + valor
+
+    def valor(self, *valores_rotulos) -> float:
+        with self._lock:
+            return self._valores.get(valores_rotulos, 0)
+
+    def amostras(self) -> List[str]:
+        with self._lock:
+            itens = list(self._valores.items())
+        return [f'{self.nome}{_rotulos(self.rotulos, chave)} {_numero(v)}' for chave, v in itens]
+
+
+class Histograma:
+    """Distribuição em faixas cumulativas (`_bucket`), com `_sum` e `_count`"""
+    tipo = 'histogram'
+
+    def __init__(self, nome: str, ajuda: str, rotulos: Sequence[str] = (),
+                 limites: Sequence[float] = LIMITES_LATENCIA):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.rotulos = tuple(rotulos)
+        self.limites = tuple(sorted(limites))
+        # rótulos -> [contagem por faixa (não cumulativa, última = +Inf), soma]
+        self._series: Dict[Tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observar(self, valor: float, *valores_rotulos):
+        faixa = bisect_left(self.limites, valor)
+        with self._lock:
+            serie = self._series.get(valores_rotulos)
+            if serie is None:
+                serie = self._series[valores_rotulos] = [[0] * (len(self.limites) + 1), 0.0]
+            serie[0][faixa] += 1
+            serie[1] += valor
+
+    def contagem(self, *valores_rotulos) -> int:
+        with self._lock:
+            serie = self._series.get(valores_rotulos)
+            return sum(serie[0]) if serie else 0
+
+    def amostras(self) -> List[str]:
+        with self._lock:
+            series = [(chave, list(contagens), soma) for chave, (contagens, soma) in self._series.items()]
+        linhas = []
+        for chave, contagens, soma in series:
+            acumulado = 0
+            for limite, quantidade in zip(self.limites + (float('inf'),), contagens):
+                acumulado += quantidade
+                le = 'le="' + _numero(limite) + '"'
+                linhas.append(f'{self.nome}_bucket{_rotulos(self.rotulos, chave, le)} {acumulado}')
+            linhas.append(f'{self.nome}_sum{_rotulos(self.rotulos, chave)} {_numero(soma)}')
+            linhas.append(f'{self.nome}_count{_rotulos(self.rotulos, chave)} {acumulado}')
+        return linhas
+
+
+class Medidor:
+    """
+    Valor lido na coleta: `funcao()` retorna um número (sem rótulos) ou um
+    dicionário {valores dos rótulos (tupla): número}. `tipo` pode ser 'counter'
+    para expor contadores mantidos em outro lugar (ex.: hits de um cache)
+    """
+
+    def __init__(self, nome: str, ajuda: str, funcao: Callable[[], object], rotulos: Sequence[str] = (),
+                 tipo: str = 'gauge'):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.funcao = funcao
+        self.rotulos = tuple(rotulos)
+        self.tipo = tipo
+
+    def amostras(self) -> List[str]:
+        valores = self.funcao()
+        if not isinstance(valores, dict):
+            valores = {(): valores}
+        return [f'{self.nome}{_rotulos(self.rotulos, chave)} {_numero(v)}'
+                for chave, v in valores.items() if v is not None]
+
+
+class RegistroMetricas:
+    """Métricas por nome; registrar de novo o mesmo nome devolve a métrica existente"""
+
+    def __init__(self):
+        self._metricas: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def _registrar(self, metrica):
+        with self._lock:
+            return self._metricas.setdefault(metrica.nome, metrica)
+
+    def contador(self, nome: str, ajuda: str, rotulos: Sequence[str] = ()) -> Contador:
+        return self._registrar(Contador(nome, ajuda, rotulos))
+
+    def histograma(self, nome: str, ajuda: str, rotulos: Sequence[str] = (),
+                   limites: Sequence[float] = LIMITES_LATENCIA) -> Histograma:
+        return self._registrar(Histograma(nome, ajuda, rotulos, limites))
+
+    def medidor(self, nome: str, ajuda: str, funcao: Callable[[], object], rotulos: Sequence[str] = (),
+                tipo: str = 'gauge') -> Medidor:
+        """Registra (ou substitui: a função pode depender de objetos recriados) um medidor"""
+        medidor = Medidor(nome, ajuda, funcao, rotulos, tipo)
+        with self._lock:
+            self._metricas[nome] = medidor
+        return medidor
+
+    def obter(self, nome: str) -> Optional[object]:
+        with self._lock:
+            return self._metricas.get(nome)
+
+    def exportar(self) -> str:
+        with self._lock:
+            metricas = list(self._metricas.values())
+        linhas = []
+        for metrica in metricas:
+            try:
+                amostras = metrica.amostras()
+            except Exception as e:
+                # Um medidor com defeito não derruba a coleta das demais métricas
+                linhas.append(f'# {metrica.nome}: erro na coleta ({_escapar(e)})')
+                continue
+            linhas.append(f'# HELP {metrica.nome} {metrica.ajuda}')
+            linhas.append(f'# TYPE {metrica.nome} {metrica.tipo}')
+            linhas.extend(amostras)
+        return '\n'.join(linhas) + '\n'
+
+
+# Registro do processo, compartilhado por scraper, motor HTTP e API
+METRICAS = RegistroMetricas()
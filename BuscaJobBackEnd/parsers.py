@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+BuscaJob - Parsers rápidos de páginas de listagem
+Localiza os cards de vaga com XPath pré-compilado (lxml) e extrai todos os
+campos de um card em uma única passada pelos seus elementos.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class Regra:
+    """Seletor simples de um campo: tag + classe CSS ou atributo presente.
+
+    Regras de menor `prioridade` vencem quando mais de um elemento do card
+    casa com o mesmo campo (equivale a `find(a) or find(b)`)."""
+    campo: str
+    tag: str
+    classe: Optional[str] = None
+    atributo: Optional[str] = None
+    prioridade: int = 0
+
+    def casa(self, elem) -> bool:
+        if self.classe is not None:
+            classes = elem.get('class') or ''
+            if isinstance(classes, str):
+                classes = classes.split()
+            # BeautifulSoup já devolve a classe como lista
+            return self.classe in classes
+        if self.atributo is not None:
+            return elem.get(self.atributo) is not None
+        return True
+
+
+def _texto(elem) -> str:
+    """Equivalente ao `get_text(strip=True)` do BeautifulSoup"""
+    return ''.join(t.strip() for t in elem.itertext())
+
+
+class ParserListagem:
+    """
+    Parser de listagem de um site.
+
+    `tag_card`/`classe_card` identificam o elemento que envolve cada vaga; as
+    regras dizem onde está cada campo dentro do card. Para cada campo é
+    retornado o texto do elemento e, em `<campo>_href`, o link quando houver.
+    """
+
+    def __init__(self, tag_card: str, classe_card: str, regras: List[Regra]):
+        self.tag_card = tag_card
+        self.classe_card = classe_card
+        self.regras = regras
+        self._regras_por_tag: Dict[str, Tuple[Regra, ...]] = {}
+        for regra in regras:
+            self._regras_por_tag[regra.tag] = self._regras_por_tag.get(regra.tag, ()) + (regra,)
+        self._xpath_cards = None
+
+    def _cards_xpath(self):
+        if self._xpath_cards is None:
+            from lxml import etree
+            self._xpath_cards = etree.XPath(
+                f"//{self.tag_card}[contains(concat(' ', normalize-space(@class), ' '), ' {self.classe_card} ')]"
+            )
+        return self._xpath_cards
+
+    def cards(self, html) -> list:
+        """Retorna os elementos (lxml) de cada card da página"""
+        try:
+            import lxml.html
+        except ImportError:
+            return self._cards_bs4(html)
+        if not html:
+            return []
+        doc = lxml.html.fromstring(html)
+        return self._cards_xpath()(doc)
+
+    def _cards_bs4(self, html) -> list:
+        """Fallback sem lxml: BeautifulSoup restrito aos cards (SoupStrainer)"""
+        from bs4 import BeautifulSoup, SoupStrainer
+        # Durante o parse a classe ainda é a string bruta do atributo
+        somente_cards = SoupStrainer(self.tag_card, class_=lambda c: bool(c) and self.classe_card in c.split())
+        return BeautifulSoup(html, 'html.parser', parse_only=somente_cards).find_all(self.tag_card, recursive=False)
+
+    def extrair_card(self, card) -> Dict[str, str]:
+        """Extrai todos os campos de um card percorrendo seus elementos uma única vez"""
+        # Elementos lxml têm itertext; Tags do BeautifulSoup (fallback), não
+        eh_lxml = hasattr(type(card), 'itertext')
+        achados: Dict[str, Tuple[int, object]] = {}
+        regras_por_tag = self._regras_por_tag
+        for elem in (card.iter() if eh_lxml else card.find_all(True)):
+            regras = regras_por_tag.get(elem.tag if eh_lxml else elem.name)
+            if not regras:
+                continue
+            for regra in regras:
+                atual = achados.get(regra.campo)
+                if (atual is None or regra.prioridade < atual[0]) and regra.casa(elem):
+                    achados[regra.campo] = (regra.prioridade, elem)
+
+        campos = {}
+        for campo, (_, elem) in achados.items():
+            campos[campo] = _texto(elem) if eh_lxml else elem.get_text(strip=True)
+            href = elem.get('href')
+            if href:
+                campos[f'{campo}_href'] = href
+        return campos
+
+    def extrair(self, html) -> List[Dict[str, str]]:
+        """Extrai os campos de todos os cards da página"""
+        return [self.extrair_card(card) for card in self.cards(html)]
+
+
+# Parsers por site (mesmas chaves de JobScraper.scrapers)
+PARSERS = {
+    'indeed': ParserListagem('div', 'job_seen_beacon', [
+        Regra('titulo', 'h2', classe='jobTitle', prioridade=0),
+        Regra('titulo', 'a', atributo='data-jk', prioridade=1),
+        Regra('link', 'a', atributo='data-jk'),
+        Regra('empresa', 'span', classe='companyName', prioridade=0),
+        Regra('empresa', 'a', classe='turnstileLink', prioridade=1),
+        Regra('localizacao', 'div', classe='companyLocation'),
+        Regra('salario', 'span', classe='salary-snippet', prioridade=0),
+        Regra('salario', 'div', classe='salary-snippet-container', prioridade=1),
+        Regra('descricao', 'div', classe='job-snippet', prioridade=0),
+        Regra('descricao', 'ul', prioridade=1),
+    ]),
+}
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+BuscaJob - Limitador de taxa por host (token bucket)
+Compartilhado entre threads e tarefas asyncio: cada host tem um balde com taxa
+(requisições/segundo) e rajada próprias.
+"""
+
+import asyncio
+import threading
+import time
+from typing import Dict
+
+
+class TokenBucket:
+    """
+    Balde de tokens thread-safe.
+
+    `reservar` consome um token imediatamente e devolve quanto tempo o chamador
+    deve esperar até que esse token exista. O saldo pode ficar negativo, o que
+    enfileira os chamadores em ordem de chegada sem que ninguém durma mais que
+    o necessário.
+    """
+
+    def __init__(self, taxa: float, rajada: int = 1):
+        if taxa <= 0:
+            raise ValueError("taxa deve ser maior que zero")
+        self.taxa = float(taxa)
+        self.rajada = max(1, int(rajada))
+        self._tokens = float(self.rajada)
+        self._ultimo = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _repor(self, agora: float):
+        self._tokens = min(self.rajada, self._tokens + (agora - self._ultimo) * self.taxa)
+        self._ultimo = agora
+
+    def reservar(self) -> float:
+        """Consome um token e retorna a espera necessária em segundos (0 se disponível)"""
+        with self._lock:
+            self._repor(time.monotonic())
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.taxa
+
+    def adiar(self, segundos: float):
+        """
+        Recua o balde em `segundos` (backoff após falha): a próxima reserva espera
+        pelo menos esse tempo, e as seguintes continuam na taxa normal a partir daí
+        """
+        if segundos <= 0:
+            return
+        with self._lock:
+            self._repor(time.monotonic())
+            self._tokens = min(self._tokens, 1.0) - segundos * self.taxa
+
+    def aguardar(self):
+        """Bloqueia a thread atual somente pelo tempo necessário"""
+        espera = self.reservar()
+        if espera > 0:
+            time.sleep(espera)
+
+    async def aguardar_async(self):
+        """Versão assíncrona de `aguardar` (não bloqueia o event loop)"""
+        espera = self.reservar()
+        if espera > 0:
+            await asyncio.sleep(espera)
+
+
+class LimitadorPorHost:
+    """Registro de baldes por host, com taxa/rajada padrão para hosts não configurados"""
+
+    def __init__(self, taxa_padrao: float = 1.0, rajada_padrao: int = 2):
+        self.taxa_padrao = taxa_padrao
+        self.rajada_padrao = rajada_padrao
+        self._baldes: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def configurar(self, host: str, taxa: float, rajada: int = 1):
+        """Define (ou redefine) a taxa e a rajada de um host"""
+        with self._lock:
+            self._baldes[host.lower()] = TokenBucket(taxa, rajada)
+
+    def balde(self, host: str) -> TokenBucket:
+        host = (host or '').lower()
+        with self._lock:
+            balde = self._baldes.get(host)
+            if balde is None:
+                balde = TokenBucket(self.taxa_padrao, self.rajada_padrao)
+                self._baldes[host] = balde
+            return balde
+
+    def aguardar(self, host: str):
+        self.balde(host).aguardar()
+
+    def adiar(self, host: str, segundos: float):
+        self.balde(host).adiar(segundos)
+
+    async def aguardar_async(self, host: str):
+        await self.balde(host).aguardar_async()
+
+    def limites(self) -> Dict[str, Dict[str, float]]:
+        """Retorna os limites configurados (útil para diagnóstico)"""
+        with self._lock:
+            return {h: {'taxa': b.taxa, 'rajada': b.rajada} for h, b in self._baldes.items()}
+
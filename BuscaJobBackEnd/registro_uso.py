@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+BuscaJob - Registro de uso (favoritos e estatísticas)
+Vagas favoritas e contadores de uso em memória (conjunto indexado e
+dicionário protegidos por lock), persistidos em um log NDJSON só de acréscimo:
+cada favorito é uma linha anexada na hora (O(1)), e os incrementos dos
+contadores são acumulados e gravados em lote, como uma linha de deltas, a
+cada `intervalo` segundos. Quando o log cresce além de `compactar_apos`
+linhas, ele é reescrito como uma única linha de snapshot.
+
+Formato das linhas:
+    {"snapshot": {"favoritos": [...], "contadores": {...}}}
+    {"fav": "<vaga_id>"}
+    {"cont": {"total_buscas": 1, ...}}
+"""
+
+import atexit
+import json
+import logging
+import os
+import threading
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class RegistroUso:
+    """Favoritos e contadores; leituras nunca acessam o disco"""
+
+    def __init__(self, caminho: str, padrao: Optional[Dict[str, int]] = None, intervalo: float = 5.0,
+                 compactar_apos: int = 1000):
+        self.caminho = caminho
+        self.intervalo = intervalo
+        self.compactar_apos = compactar_apos
+        # dict como conjunto ordenado: pertinência O(1) e ordem de inclusão preservada
+        self._favoritos: Dict[str, None] = {}
+        self._contadores: Dict[str, int] = dict(padrao or {})
+        self._pendentes: Dict[str, int] = {}
+        self._linhas = 0
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        self._carregar()
+        self._arquivo = open(caminho, 'a', encoding='utf-8')
+        if self._arquivo.tell() and not self._termina_em_nova_linha():
+            # Fecha a linha truncada para que a próxima não seja anexada a ela
+            self._arquivo.write('\n')
+        atexit.register(self.fechar)
+
+    def _carregar(self):
+        if not os.path.exists(self.caminho):
+            return
+        with open(self.caminho, 'r', encoding='utf-8') as f:
+            for numero, linha in enumerate(f, 1):
+                if not linha.strip():
+                    continue
+                try:
+                    registro = json.loads(linha)
+                except ValueError:
+                    # Linha truncada por uma interrupção no meio da escrita
+                    logger.warning(f"Registro de uso: linha {numero} ilegível ignorada")
+                    continue
+                self._aplicar(registro)
+                self._linhas += 1
+
+    def _termina_em_nova_linha(self) -> bool:
+        with open(self.caminho, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b'\n'
+
+    def _aplicar(self, registro: Dict):
+        if 'snapshot' in registro:
+            self._favoritos = dict.fromkeys(registro['snapshot'].get('favoritos', []))
+            self._contadores.update(registro['snapshot'].get('contadores', {}))
+        elif 'fav' in registro:
+            self._favoritos[registro['fav']] = None
+        elif 'cont' in registro:
+            for nome, delta in registro['cont'].items():
+                self._contadores[nome] = self._contadores.get(nome, 0) + delta
+
+    def _anexar(self, registro: Dict):
+        """Anexa uma linha ao log (com o lock já adquirido)"""
+        self._arquivo.write(json.dumps(registro, ensure_ascii=False, separators=(',', ':')) + '\n')
+        self._arquivo.flush()
+        self._linhas += 1
+
+    def _agendar(self):
+        """Agenda a próxima descarga em lote (com o lock já adquirido)"""
+        if self._timer is None:
+            self._timer = threading.Timer(self.intervalo, self.descarregar)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def importar_legados(self, vagas_salvas: str, estatisticas: str) -> bool:
+        """
+        Migra `vagas_salvas.json` e `estatisticas.json` para um log ainda vazio;
+        retorna True se algo foi importado
+        """
+        with self._lock:
+            if self._linhas:
+                return False
+            favoritos: List[str] = []
+            contadores: Dict[str, int] = {}
+            for caminho, destino in ((vagas_salvas, favoritos), (estatisticas, contadores)):
+                try:
+                    with open(caminho, 'r', encoding='utf-8') as f:
+                        dados = json.load(f)
+                except FileNotFoundError:
+                    continue
+                except (OSError, ValueError) as e:
+                    logger.warning(f"Registro de uso: falha ao importar {os.path.basename(caminho)}: {e}")
+                    continue
+                if isinstance(destino, list):
+                    destino.extend(str(v) for v in dados)
+                else:
+                    destino.update({k: int(v) for k, v in dados.items()})
+            if not favoritos and not contadores:
+                return False
+            self._favoritos.update(dict.fromkeys(favoritos))
+            self._contadores.update(contadores)
+            self._anexar({'snapshot': {'favoritos': list(self._favoritos), 'contadores': self._contadores}})
+        logger.info(f"Registro de uso: {len(favoritos)} favorito(s) e estatísticas importados")
+        return True
+
+    def favoritar(self, vaga_id: str) -> bool:
+        """Inclui a vaga nos favoritos; retorna False se ela já estava lá"""
+        with self._lock:
+            if vaga_id in self._favoritos:
+                return False
+            self._favoritos[vaga_id] = None
+            self._anexar({'fav': vaga_id})
+            if self._linhas > self.compactar_apos:
+                self._agendar()
+        return True
+
+    def __contains__(self, vaga_id: str) -> bool:
+        with self._lock:
+            return vaga_id in self._favoritos
+
+    def favoritos(self) -> List[str]:
+        with self._lock:
+            return list(self._favoritos)
+
+    def incrementar(self, **deltas: int):
+        """Soma os deltas aos contadores; a gravação sai no próximo lote"""
+        with self._lock:
+            for nome, delta in deltas.items():
+                self._contadores[nome] = self._contadores.get(nome, 0) + delta
+                self._pendentes[nome] = self._pendentes.get(nome, 0) + delta
+            self._agendar()
+
+    def contadores(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._contadores)
+
+    def descarregar(self):
+        """Grava os deltas pendentes em uma linha e compacta o log se ele passou do limite"""
+        with self._lock:
+            self._timer = None
+            if self._arquivo.closed:
+                return
+            if self._pendentes:
+                self._anexar({'cont': self._pendentes})
+                self._pendentes = {}
+            if self._linhas > self.compactar_apos:
+                self._compactar()
+
+    def compactar(self):
+        with self._lock:
+            if self._pendentes:
+                self._anexar({'cont': self._pendentes})
+                self._pendentes = {}
+            self._compactar()
+
+    def _compactar(self):
+        """Reescreve o log como um snapshot (arquivo temporário + os.replace)"""
+        temporario = self.caminho + '.tmp'
+        snapshot = {'snapshot': {'favoritos': list(self._favoritos), 'contadores': self._contadores}}
+        with open(temporario, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(snapshot, ensure_ascii=False, separators=(',', ':')) + '\n')
+        self._arquivo.close()
+        os.replace(temporario, self.caminho)
+        self._arquivo = open(self.caminho, 'a', encoding='utf-8')
+        logger.info(f"Registro de uso compactado ({self._linhas} linhas -> 1)")
+        self._linhas = 1
+
+    def fechar(self):
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if self._arquivo.closed:
+                return
+            if self._pendentes:
+                self._anexar({'cont': self._pendentes})
+                self._pendentes = {}
+            self._arquivo.close()
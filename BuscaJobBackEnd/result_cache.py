@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+BuscaJob - Cache de resultados de busca
+Memoização com TTL e descarte LRU, limitada pelo número total de vagas
+guardadas, com chaves canônicas para critérios de busca.
+"""
+
+import json
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+def normalizar_texto(valor: str) -> str:
+    """Minúsculas, sem acentos e com espaços colapsados"""
+    sem_acento = unicodedata.normalize('NFKD', valor)
+    sem_acento = ''.join(c for c in sem_acento if not unicodedata.combining(c))
+    return ' '.join(sem_acento.lower().split())
+
+
+def canonicalizar(valor: Any) -> Any:
+    """
+    Forma canônica (hashable) de um valor de critério: textos normalizados,
+    listas tratadas como conjuntos ordenados e dicionários sem chaves vazias.
+    """
+    if isinstance(valor, dict):
+        itens = []
+        for k, v in valor.items():
+            v = canonicalizar(v)
+            if v in (None, '', ()):
+                continue
+            itens.append((normalizar_texto(str(k)).replace('-', '_'), v))
+        return tuple(sorted(itens))
+    if isinstance(valor, (list, tuple, set, frozenset)):
+        return tuple(sorted({canonicalizar(v) for v in valor} - {None, ''}, key=repr))
+    if isinstance(valor, str):
+        return normalizar_texto(valor)
+    if isinstance(valor, float) and valor.is_integer():
+        return int(valor)
+    return valor
+
+
+def chave_criterios(criterios: Dict) -> str:
+    """Chave estável para um dicionário de critérios"""
+    return json.dumps(canonicalizar(criterios or {}), ensure_ascii=False, separators=(',', ':'))
+
+
+class CacheTTL:
+    """
+    Cache LRU thread-safe com expiração por TTL.
+
+    Cada entrada tem um peso (ex.: quantidade de vagas); quando a soma dos
+    pesos passa de `max_peso`, as entradas menos usadas são descartadas.
+    """
+
+    def __init__(self, ttl: float = 600, max_peso: int = 20000):
+        self.ttl = ttl
+        self.max_peso = max_peso
+        self._dados: 'OrderedDict[Hashable, tuple]' = OrderedDict()
+        self._peso_total = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def obter(self, chave: Hashable) -> Optional[Any]:
+        with self._lock:
+            item = self._dados.get(chave)
+            if item is None:
+                self._misses += 1
+                return None
+            valor, peso, expira_em = item
+            if time.monotonic() >= expira_em:
+                del self._dados[chave]
+                self._peso_total -= peso
+                self._misses += 1
+                return None
+            self._dados.move_to_end(chave)
+            self._hits += 1
+            return valor
+
+    def guardar(self, chave: Hashable, valor: Any, peso: int = 1):
+        peso = max(1, peso)
+        with self._lock:
+            anterior = self._dados.pop(chave, None)
+            if anterior is not None:
+                self._peso_total -= anterior[1]
+            if peso > self.max_peso:
+                return
+            self._dados[chave] = (valor, peso, time.monotonic() + self.ttl)
+            self._peso_total += peso
+            while self._peso_total > self.max_peso:
+                _, (_, peso_antigo, _) = self._dados.popitem(last=False)
+                self._peso_total -= peso_antigo
+
+    def invalidar(self, predicado: Optional[Callable[[Hashable], bool]] = None) -> int:
+        """Remove as entradas cuja chave satisfaz `predicado` (todas, se omitido)"""
+        with self._lock:
+            if predicado is None:
+                removidas = len(self._dados)
+                self._dados.clear()
+                self._peso_total = 0
+                return removidas
+            chaves = [k for k in self._dados if predicado(k)]
+            for k in chaves:
+                self._peso_total -= self._dados.pop(k)[1]
+            return len(chaves)
+
+    def estatisticas(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'entradas': len(self._dados),
+                'peso': self._peso_total,
+                'hits': self._hits,
+                'misses': self._misses,
+            }
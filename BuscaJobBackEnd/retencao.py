@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+BuscaJob - Retenção de artefatos
+Manifesto dos artefatos produzidos (resultados no armazém e arquivos de
+relatório: nome, tipo, criação e tamanho) e políticas de retenção por idade,
+quantidade e bytes, aplicadas periodicamente em uma thread própria em vez de
+varrer o diretório a cada requisição.
+
+O manifesto fica em memória, indexado por tipo em ordem de criação (o
+artefato mais recente de um tipo sai em O(1)), e é persistido em
+`artefatos.json` com escrita atômica. Na inicialização ele é reconciliado uma
+única vez com o diretório e com o armazém.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field, replace
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# Prefixos e extensões dos arquivos de resultado gerenciados ('legado': resultados_*.json anteriores ao armazém)
+PREFIXOS_ARQUIVO = {'resultados_': 'legado', 'relatorio_fixo_': 'relatorio'}
+EXTENSOES_ARQUIVO = ('.json', '.ndjson', '.ndjson.gz', '.ndjson.zst', '.idx')
+
+
+@dataclass
+class Artefato:
+    """Um resultado produzido; `arquivos` são relativos ao diretório do manifesto"""
+    nome: str
+    tipo: str
+    criado_em: float
+    tamanho: int = 0
+    arquivos: List[str] = field(default_factory=list)
+    resultado_id: Optional[int] = None
+
+    @property
+    def chave(self) -> str:
+        # Nomes de resultado podem se repetir no armazém; o id não
+        return str(self.resultado_id) if self.resultado_id is not None else self.nome
+
+
+@dataclass
+class PoliticaRetencao:
+    """Limites de um tipo de artefato (None = sem limite); os `manter_minimo` mais recentes nunca saem"""
+    max_idade_horas: Optional[float] = None
+    max_quantidade: Optional[int] = None
+    max_bytes: Optional[int] = None
+    manter_minimo: int = 1
+
+    def expirados(self, artefatos: Sequence[Artefato], agora: float) -> List[Artefato]:
+        """Artefatos (do mais antigo ao mais recente) que violam a política"""
+        candidatos = list(artefatos[:max(0, len(artefatos) - self.manter_minimo)])
+        removidos = []
+        if self.max_idade_horas is not None:
+            limite = agora - self.max_idade_horas * 3600
+            removidos = [a for a in candidatos if a.criado_em < limite]
+            candidatos = [a for a in candidatos if a.criado_em >= limite]
+        quantidade = len(artefatos) - len(removidos)
+        total = sum(a.tamanho for a in artefatos) - sum(a.tamanho for a in removidos)
+        for artefato in candidatos:
+            excede_quantidade = self.max_quantidade is not None and quantidade > self.max_quantidade
+            excede_bytes = self.max_bytes is not None and total > self.max_bytes
+            if not (excede_quantidade or excede_bytes):
+                break
+            removidos.append(artefato)
+            quantidade -= 1
+            total -= artefato.tamanho
+        return removidos
+
+
+def _tipo_do_arquivo(nome: str) -> Optional[str]:
+    if not nome.endswith(EXTENSOES_ARQUIVO):
+        return None
+    for prefixo, tipo in PREFIXOS_ARQUIVO.items():
+        if nome.startswith(prefixo):
+            return tipo
+    return None
+
+
+class ManifestoArtefatos:
+    """Índice em memória dos artefatos por tipo, persistido em JSON"""
+
+    def __init__(self, caminho: str):
+        self.caminho = caminho
+        self.diretorio = os.path.dirname(os.path.abspath(caminho))
+        self._por_tipo: Dict[str, 'OrderedDict[str, Artefato]'] = {}
+        self._lock = threading.Lock()
+        self._alterado = False
+        self._carregar()
+
+    def _carregar(self):
+        try:
+            with open(self.caminho, 'r', encoding='utf-8') as f:
+                dados = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.warning(f"Manifesto de artefatos ilegível, será reconstruído: {e}")
+            return
+        for item in sorted(dados.get('artefatos', []), key=lambda a: a['criado_em']):
+            artefato = Artefato(**item)
+            self._por_tipo.setdefault(artefato.tipo, OrderedDict())[artefato.chave] = artefato
+
+    def salvar(self):
+        """Grava o manifesto (arquivo temporário + os.replace) se houve mudança"""
+        with self._lock:
+            if not self._alterado:
+                return
+            dados = {'artefatos': [asdict(a) for tipo in self._por_tipo.values() for a in tipo.values()]}
+            self._alterado = False
+        temporario = self.caminho + '.tmp'
+        with open(temporario, 'w', encoding='utf-8') as f:
+            json.dump(dados, f, ensure_ascii=False)
+        os.replace(temporario, self.caminho)
+
+    def registrar(self, artefato: Artefato):
+        with self._lock:
+            artefatos = self._por_tipo.setdefault(artefato.tipo, OrderedDict())
+            artefatos.pop(artefato.chave, None)
+            anterior = next(reversed(artefatos.values()), None)
+            artefatos[artefato.chave] = artefato
+            # Registros fora de ordem (reconciliação) são reposicionados pela data de criação
+            if anterior is not None and anterior.criado_em > artefato.criado_em:
+                ordenados = sorted(artefatos.values(), key=lambda a: a.criado_em)
+                artefatos.clear()
+                artefatos.update((a.chave, a) for a in ordenados)
+            self._alterado = True
+
+    def remover(self, artefato: Artefato):
+        with self._lock:
+            if self._por_tipo.get(artefato.tipo, {}).pop(artefato.chave, None) is not None:
+                self._alterado = True
+
+    def ultimo(self, tipos: Iterable[str]) -> Optional[Artefato]:
+        """Artefato mais recente entre os `tipos` (o último de cada tipo, sem varrer o histórico)"""
+        with self._lock:
+            ultimos = [next(reversed(self._por_tipo[t].values())) for t in tipos if self._por_tipo.get(t)]
+        return max(ultimos, key=lambda a: a.criado_em, default=None)
+
+    def listar(self, tipo: Optional[str] = None) -> List[Artefato]:
+        """Artefatos do mais antigo ao mais recente"""
+        with self._lock:
+            tipos = [tipo] if tipo is not None else list(self._por_tipo)
+            return [a for t in tipos for a in self._por_tipo.get(t, {}).values()]
+
+    def tipos(self) -> List[str]:
+        with self._lock:
+            return list(self._por_tipo)
+
+
+class GerenciadorRetencao:
+    """
+    Aplica as políticas de retenção a cada `intervalo` segundos em uma thread
+    daemon. Remover um artefato apaga seus arquivos e, se houver, o resultado
+    correspondente no armazém.
+    """
+
+    def __init__(self, diretorio: str, armazem=None, politicas: Optional[Dict[str, PoliticaRetencao]] = None,
+                 intervalo: float = 900, nome_manifesto: str = 'artefatos.json'):
+        self.diretorio = diretorio
+        self.armazem = armazem
+        self.politicas = politicas or {}
+        self.intervalo = intervalo
+        self.manifesto = ManifestoArtefatos(os.path.join(diretorio, nome_manifesto))
+        self._parar = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._sincronizado = False
+        self._lock = threading.Lock()
+
+    def registrar(self, nome: str, tipo: str, arquivos: Sequence[str] = (), resultado_id: Optional[int] = None,
+                  tamanho: Optional[int] = None) -> Artefato:
+        """Registra um artefato recém-produzido; o tamanho padrão é o dos arquivos mais o do resultado"""
+        if tamanho is None:
+            tamanho = self._tamanho_arquivos(arquivos)
+            if resultado_id is not None and self.armazem is not None:
+                tamanho += self.armazem.tamanho_resultado(resultado_id)
+        artefato = Artefato(nome=nome, tipo=tipo, criado_em=time.time(), tamanho=tamanho,
+                            arquivos=list(arquivos), resultado_id=resultado_id)
+        self.manifesto.registrar(artefato)
+        return artefato
+
+    def ultimo(self, tipos: Iterable[str]) -> Optional[Artefato]:
+        return self.manifesto.ultimo(tipos)
+
+    def sincronizar(self):
+        """
+        Reconcilia o manifesto com o diretório e o armazém (uma vez): adota
+        artefatos produzidos antes do manifesto e esquece os que já sumiram.
+        Os `resultados_*.json` anteriores ao armazém são importados antes, para
+        que nenhuma varredura apague um arquivo cujos dados ainda não migraram.
+        """
+        if self.armazem is not None:
+            self.armazem.importar_legados(self.diretorio)
+        conhecidos = {a.chave: a for a in self.manifesto.listar()}
+        arquivos_por_nome: Dict[str, List[str]] = {}
+        for nome_arquivo in os.listdir(self.diretorio):
+            if _tipo_do_arquivo(nome_arquivo):
+                arquivos_por_nome.setdefault(nome_arquivo.split('.', 1)[0], []).append(nome_arquivo)
+
+        vivos = set()
+        if self.armazem is not None:
+            for resultado in self.armazem.resultados():
+                chave = str(resultado['id'])
+                vivos.add(chave)
+                if chave in conhecidos:
+                    continue
+                arquivos = sorted(arquivos_por_nome.pop(resultado['nome'], []))
+                tamanho = resultado['tamanho'] + self._tamanho_arquivos(arquivos)
+                self.manifesto.registrar(Artefato(
+                    nome=resultado['nome'], tipo=resultado['tipo'], criado_em=_epoca(resultado['criado_em']),
+                    tamanho=tamanho, arquivos=arquivos, resultado_id=resultado['id'],
+                ))
+        for artefato in conhecidos.values():
+            for arquivo in artefato.arquivos:
+                arquivos_por_nome.pop(arquivo.split('.', 1)[0], None)
+        for nome, arquivos in arquivos_por_nome.items():
+            caminhos = [os.path.join(self.diretorio, a) for a in arquivos]
+            self.manifesto.registrar(Artefato(
+                nome=nome, tipo=_tipo_do_arquivo(arquivos[0]), criado_em=min(os.path.getmtime(c) for c in caminhos),
+                tamanho=self._tamanho_arquivos(arquivos), arquivos=sorted(arquivos),
+            ))
+        # Esquece artefatos cujo resultado e arquivos já não existem
+        for chave, artefato in conhecidos.items():
+            existe = any(os.path.exists(os.path.join(self.diretorio, a)) for a in artefato.arquivos)
+            if chave not in vivos and not existe:
+                self.manifesto.remover(artefato)
+        self._sincronizado = True
+        self.manifesto.salvar()
+
+    def _tamanho_arquivos(self, arquivos: Iterable[str]) -> int:
+        total = 0
+        for arquivo in arquivos:
+            try:
+                total += os.path.getsize(os.path.join(self.diretorio, arquivo))
+            except OSError:
+                pass
+        return total
+
+    def aplicar(self, agora: Optional[float] = None) -> List[Artefato]:
+        """Aplica as políticas uma vez e retorna os artefatos removidos"""
+        with self._lock:
+            if not self._sincronizado:
+                self.sincronizar()
+            agora = time.time() if agora is None else agora
+            removidos = []
+            for tipo in self.manifesto.tipos():
+                politica = self.politicas.get(tipo) or self.politicas.get('*')
+                if politica is None:
+                    continue
+                for artefato in politica.expirados(self.manifesto.listar(tipo), agora):
+                    self._remover(artefato)
+                    removidos.append(artefato)
+            self.manifesto.salvar()
+        if removidos:
+            logger.info(f"Retenção: {len(removidos)} artefato(s) removido(s): {[a.nome for a in removidos]}")
+        return removidos
+
+    def _remover(self, artefato: Artefato):
+        for arquivo in artefato.arquivos:
+            try:
+                os.remove(os.path.join(self.diretorio, arquivo))
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(f"Retenção: falha ao remover {arquivo}: {e}")
+        if artefato.resultado_id is not None and self.armazem is not None:
+            self.armazem.remover(artefato.resultado_id)
+        self.manifesto.remover(artefato)
+
+    def _laco(self):
+        while not self._parar.is_set():
+            try:
+                self.aplicar()
+            except Exception as e:
+                logger.error(f"Erro na retenção de artefatos: {e}")
+            self._parar.wait(self.intervalo)
+
+    def iniciar(self):
+        """Inicia a thread de retenção (idempotente)"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._parar.clear()
+        self._thread = threading.Thread(target=self._laco, name='buscajob-retencao', daemon=True)
+        self._thread.start()
+
+    def parar(self, timeout: Optional[float] = None):
+        self._parar.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self.manifesto.salvar()
+
+
+def _epoca(iso: str) -> float:
+    try:
+        return datetime.fromisoformat(iso).timestamp()
+    except (TypeError, ValueError):
+        return time.time()
+
+
+def politicas_do_ambiente(padrao: Dict[str, PoliticaRetencao]) -> Dict[str, PoliticaRetencao]:
+    """
+    Aplica RETENCAO_<TIPO>_MAX_HORAS / _MAX_QUANTIDADE / _MAX_MB (ex.:
+    RETENCAO_RELATORIO_MAX_HORAS=48) sobre as políticas padrão
+    """
+    politicas = {}
+    for tipo in set(padrao) | {'busca', 'agendada', 'relatorio', 'scraper', 'legado'}:
+        valores = {}
+        for sufixo, atributo, conversor in (('MAX_HORAS', 'max_idade_horas', float),
+                                            ('MAX_QUANTIDADE', 'max_quantidade', int),
+                                            ('MAX_MB', 'max_bytes', lambda v: int(float(v) * 1024 * 1024))):
+            variavel = f"RETENCAO_{tipo.upper()}_{sufixo}"
+            if os.environ.get(variavel):
+                try:
+                    valores[atributo] = conversor(os.environ[variavel])
+                except ValueError:
+                    logger.warning(f"Valor inválido para {variavel}: {os.environ[variavel]}")
+        if tipo in padrao or valores:
+            politicas[tipo] = replace(padrao.get(tipo) or PoliticaRetencao(), **valores)
+    return politicas
@@ -29,11 +29,22 @@ if backend_dir not in sys.path:
     sys.path.insert(0, backend_dir)
 
 from api_server import app
+from job_scraper import configurar_logging
 
 if __name__ == '__main__':
+    configurar_logging()
     with app.test_client() as client:
-        resp = client.get('/api/relatorio-fixo')
+        # O relatório roda como tarefa em segundo plano; aguardar=1 espera o resultado final
+        resp = client.post('/api/relatorio-fixo?aguardar=1')
         data = resp.get_json()
+        # Execução única: entrega aqui o e-mail enfileirado (sem esperar a thread da caixa de saída)
+        if data and data.get('email_id'):
+            from api_server import obter_caixa_saida
+            caixa_saida = obter_caixa_saida()
+            caixa_saida.enviar_pendentes()
+            email = caixa_saida.obter(data['email_id'])
+            data['email_enviado'] = email['status'] == 'enviado'
+            data['email_erro'] = data.get('email_erro') or email['erro']
         # Imprime somente JSON para facilitar o parse no PowerShell
         print(json.dumps(data, ensure_ascii=False))
 "@
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+BuscaJob - Tarefas em segundo plano
+Executa trabalhos longos (ex.: relatório fixo) fora da requisição HTTP, em um
+pool limitado de threads, com progresso consultável, cancelamento cooperativo
+e histórico das tarefas recentes.
+"""
+
+import logging
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Estados de uma tarefa; os três últimos são finais
+PENDENTE = 'pendente'
+EXECUTANDO = 'executando'
+CONCLUIDA = 'concluida'
+CANCELADA = 'cancelada'
+ERRO = 'erro'
+
+
+class FilaCheia(Exception):
+    """Limite de tarefas pendentes atingido"""
+
+
+class TarefaCancelada(Exception):
+    """Levantada pela própria tarefa ao perceber o pedido de cancelamento"""
+
+
+@dataclass
+class Tarefa:
+    """Estado de uma tarefa; `progresso` é um dicionário livre atualizado pela função executada"""
+    id: str
+    tipo: str
+    status: str = PENDENTE
+    criada_em: str = field(default_factory=lambda: datetime.now().isoformat())
+    iniciada_em: Optional[str] = None
+    concluida_em: Optional[str] = None
+    progresso: Dict[str, Any] = field(default_factory=dict)
+    resultado: Optional[Dict[str, Any]] = None
+    erro: Optional[str] = None
+    cancelamento: threading.Event = field(default_factory=threading.Event, repr=False)
+    finalizada: threading.Event = field(default_factory=threading.Event, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def atualizar(self, **progresso):
+        """Mescla valores no progresso (seguro entre threads)"""
+        with self._lock:
+            self.progresso.update(progresso)
+
+    def verificar_cancelamento(self):
+        """Ponto de cancelamento cooperativo: levanta TarefaCancelada se pedido"""
+        if self.cancelamento.is_set():
+            raise TarefaCancelada(self.id)
+
+    def aguardar(self, timeout: Optional[float] = None) -> bool:
+        return self.finalizada.wait(timeout)
+
+    def para_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            progresso = dict(self.progresso)
+        return {
+            'id': self.id,
+            'tipo': self.tipo,
+            'status': self.status,
+            'criada_em': self.criada_em,
+            'iniciada_em': self.iniciada_em,
+            'concluida_em': self.concluida_em,
+            'progresso': progresso,
+            'resultado': self.resultado,
+            'erro': self.erro,
+        }
+
+
+class GerenciadorTarefas:
+    """
+    Fila de tarefas com no máximo `max_trabalhadores` em execução simultânea.
+
+    Submissões além de `max_pendentes` tarefas aguardando são recusadas
+    (FilaCheia), para que trabalhos pesados não se acumulem; as tarefas
+    finalizadas mais antigas são esquecidas além de `max_historico`.
+    """
+
+    def __init__(self, max_trabalhadores: int = 1, max_pendentes: int = 4, max_historico: int = 50,
+                 nome: str = 'buscajob-tarefa'):
+        self.max_trabalhadores = max_trabalhadores
+        self.max_pendentes = max_pendentes
+        self.max_historico = max_historico
+        self.nome = nome
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._tarefas: 'OrderedDict[str, Tarefa]' = OrderedDict()
+        self._futuros: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def _obter_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_trabalhadores, thread_name_prefix=self.nome)
+        return self._executor
+
+    def submeter(self, tipo: str, funcao: Callable[[Tarefa], Optional[Dict]]) -> Tarefa:
+        """Enfileira `funcao(tarefa)`; o dicionário retornado vira `tarefa.resultado`"""
+        with self._lock:
+            pendentes = sum(1 for t in self._tarefas.values() if t.status == PENDENTE)
+            if pendentes >= self.max_pendentes:
+                raise FilaCheia(f"{pendentes} tarefas aguardando execução")
+            tarefa = Tarefa(id=uuid.uuid4().hex, tipo=tipo)
+            self._tarefas[tarefa.id] = tarefa
+            self._futuros[tarefa.id] = self._obter_executor().submit(self._executar, tarefa, funcao)
+            self._podar()
+        logger.info(f"Tarefa {tarefa.tipo} {tarefa.id} enfileirada")
+        return tarefa
+
+    def _executar(self, tarefa: Tarefa, funcao: Callable[[Tarefa], Optional[Dict]]):
+        if tarefa.cancelamento.is_set():
+            self._finalizar(tarefa, CANCELADA)
+            return
+        tarefa.status = EXECUTANDO
+        tarefa.iniciada_em = datetime.now().isoformat()
+        try:
+            tarefa.resultado = funcao(tarefa)
+            self._finalizar(tarefa, CONCLUIDA)
+        except Exception as e:
+            # Qualquer falha depois de um pedido de cancelamento conta como cancelamento
+            if tarefa.cancelamento.is_set():
+                self._finalizar(tarefa, CANCELADA)
+            else:
+                logger.exception(f"Tarefa {tarefa.tipo} {tarefa.id} falhou")
+                tarefa.erro = str(e)
+                self._finalizar(tarefa, ERRO)
+
+    def _finalizar(self, tarefa: Tarefa, status: str):
+        tarefa.status = status
+        tarefa.concluida_em = datetime.now().isoformat()
+        with self._lock:
+            self._futuros.pop(tarefa.id, None)
+        tarefa.finalizada.set()
+        logger.info(f"Tarefa {tarefa.tipo} {tarefa.id}: {status}")
+
+    def _podar(self):
+        finalizadas = [i for i, t in self._tarefas.items() if t.finalizada.is_set()]
+        for tarefa_id in finalizadas[:max(0, len(self._tarefas) - self.max_historico)]:
+            del self._tarefas[tarefa_id]
+
+    def obter(self, tarefa_id: str) -> Optional[Tarefa]:
+        with self._lock:
+            return self._tarefas.get(tarefa_id)
+
+    def listar(self, tipo: Optional[str] = None) -> List[Tarefa]:
+        with self._lock:
+            return [t for t in self._tarefas.values() if tipo is None or t.tipo == tipo]
+
+    def profundidade(self) -> Dict[str, int]:
+        """Tarefas aguardando e em execução neste instante"""
+        with self._lock:
+            status = [t.status for t in self._tarefas.values() if not t.finalizada.is_set()]
+        return {PENDENTE: status.count(PENDENTE), EXECUTANDO: status.count(EXECUTANDO)}
+
+    def cancelar(self, tarefa_id: str) -> bool:
+        """
+        Pede o cancelamento: tarefas ainda na fila são descartadas na hora; as em
+        execução param no próximo ponto de verificação. Retorna False se a tarefa
+        não existe ou já terminou.
+        """
+        with self._lock:
+            tarefa = self._tarefas.get(tarefa_id)
+            futuro = self._futuros.get(tarefa_id)
+        if tarefa is None or tarefa.finalizada.is_set():
+            return False
+        tarefa.cancelamento.set()
+        if futuro is not None and futuro.cancel():
+            self._finalizar(tarefa, CANCELADA)
+        return True
+
+    def fechar(self):
+        with self._lock:
+            tarefas = list(self._tarefas.values())
+        for tarefa in tarefas:
+            tarefa.cancelamento.set()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
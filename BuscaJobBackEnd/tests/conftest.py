@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+"""Configuração comum dos testes: os módulos do backend são importados pelo nome, como nos pontos de entrada"""
+
+import os
+import sys
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+SERVICOS_API = ('armazem', 'retencao', 'tarefas_relatorio', 'configuracoes', 'historico', 'caixa_saida',
+                'registro_uso', 'agendador', 'scraper')
+
+
+@pytest.fixture
+def api(tmp_path, monkeypatch):
+    """Test client do api_server com banco e arquivos em `tmp_path` e serviços recriados no primeiro uso"""
+    import api_server
+
+    monkeypatch.setattr(api_server, 'BASE_DIR', str(tmp_path))
+    monkeypatch.setattr(api_server, 'CAMINHO_BANCO', str(tmp_path / 'buscajob.sqlite3'))
+    for nome in SERVICOS_API:
+        monkeypatch.setattr(api_server, nome, None)
+    api_server.respostas_resultado.invalidar()
+    return api_server.app.test_client()
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""Agendador: horários adiados por sobreposição e gravação do estado só quando muda"""
+
+import json
+import threading
+import time
+
+import pytest
+
+import agendador
+from agendador import Agendador
+
+
+@pytest.fixture
+def criar_agendador(tmp_path):
+    criados = []
+
+    def _criar():
+        a = Agendador(str(tmp_path / 'agendador.json'))
+        criados.append(a)
+        return a
+
+    yield _criar
+    for a in criados:
+        a.parar(timeout=5)
+
+
+def esperar(condicao, timeout=5.0):
+    limite = time.monotonic() + timeout
+    while not condicao():
+        if time.monotonic() > limite:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def test_horario_pulado_por_sobreposicao_e_tentado_de_novo(criar_agendador, monkeypatch):
+    monkeypatch.setattr(agendador, 'RETENTATIVA_PULADA', 0.05)
+    liberar = threading.Event()
+    execucoes = []
+
+    def trabalho(tarefa):
+        execucoes.append(time.monotonic())
+        if len(execucoes) == 1:
+            liberar.wait(5)
+
+    a = criar_agendador()
+    t = a.adicionar('busca', trabalho, intervalo=0.2)
+    a.iniciar()
+    t.proxima = time.time()
+    with a._condicao:
+        a._condicao.notify()
+
+    assert esperar(lambda: len(execucoes) == 1)
+    # o próximo horário chega com a primeira execução ainda rodando: adiado, não perdido
+    assert esperar(lambda: t.adiado)
+    assert t.execucoes_puladas == 1
+    assert t.proxima - time.time() <= 0.05 + 0.01
+    time.sleep(0.2)
+    assert t.execucoes_puladas == 1  # novas tentativas do mesmo horário não contam de novo
+
+    liberar.set()
+    assert esperar(lambda: len(execucoes) == 2)
+    assert esperar(lambda: not t.adiado)
+
+
+def test_estado_so_e_regravado_quando_muda(criar_agendador, tmp_path):
+    a = criar_agendador()
+    a.adicionar('busca', lambda tarefa: None, intervalo=3600)
+    a.iniciar()
+    caminho = tmp_path / 'agendador.json'
+    gravado = caminho.stat().st_mtime_ns
+    assert set(json.loads(caminho.read_text())) == {'busca'}
+
+    a._salvar_estado()
+    assert caminho.stat().st_mtime_ns == gravado
+
+    a.adicionar('relatorio', lambda tarefa: None, intervalo=60)
+    assert set(json.loads(caminho.read_text())) == {'busca', 'relatorio'}
+    assert not (tmp_path / 'agendador.json.tmp').exists()
+
+
+def test_recupera_execucao_perdida_ao_iniciar(tmp_path, criar_agendador):
+    (tmp_path / 'agendador.json').write_text(json.dumps({'busca': time.time() - 3600}))
+    executou = threading.Event()
+
+    a = criar_agendador()
+    a.adicionar('busca', lambda tarefa: executou.set(), intervalo=3600)
+    a.iniciar()
+
+    assert executou.wait(5)
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+"""Rotas do api_server via test client, com o banco em um diretório temporário"""
+
+import json
+
+import pytest
+
+
+@pytest.mark.parametrize('corpo', [[{'formato': 'csv'}], 'csv', 3])
+def test_exportar_vagas_rejeita_corpo_que_nao_e_objeto(api, corpo):
+    resposta = api.post('/api/exportar-vagas', json=corpo)
+
+    assert resposta.status_code == 400
+    assert 'objeto JSON' in resposta.get_json()['error']
+
+
+def test_exportar_vagas_sem_resultado(api):
+    assert api.post('/api/exportar-vagas', json={'formato': 'csv'}).status_code == 404
+
+
+def test_resultados_legados_importados_so_por_migrar_legados(api, tmp_path):
+    import api_server
+
+    legado = {'timestamp': '2024-01-01T00:00:00', 'total_vagas': 1,
+              'vagas': [{'titulo': 'Desenvolvedor', 'empresa': 'Acme', 'url': 'https://vagas.exemplo/1'}]}
+    (tmp_path / 'resultados_20240101_000000.json').write_text(json.dumps(legado), encoding='utf-8')
+
+    # A rota não migra nada: só lê o armazém
+    assert api_server.resultado_solicitado() is None
+
+    api_server.migrar_legados()
+    assert api_server.resultado_solicitado()['nome'] == 'resultados_20240101_000000'
+
+
+def test_relatorio_fixo_get_sem_aguardar_nao_enfileira(api):
+    import api_server
+
+    resposta = api.get('/api/relatorio-fixo')
+
+    assert resposta.status_code == 405
+    assert resposta.headers['Allow'] == 'POST'
+    assert api_server.tarefas_relatorio is None
+
+
+def test_relatorio_fixo_post_enfileira(api, monkeypatch):
+    import api_server
+
+    monkeypatch.setattr(api_server, 'gerar_relatorio_fixo', lambda tarefa, completo=False: {'total': 0})
+    resposta = api.post('/api/relatorio-fixo')
+
+    assert resposta.status_code == 202
+    tarefa = api_server.tarefas_relatorio.obter(resposta.get_json()['id'])
+    assert tarefa.aguardar(5)
+    api_server.tarefas_relatorio.fechar()
+
+
+def salvar_resultado(total=25):
+    """Grava um resultado de busca com `total` vagas de salários e títulos distintos"""
+    import api_server
+
+    vagas = [{'titulo': f'Desenvolvedor {i:02d}', 'empresa': f'Empresa {i % 4}', 'localizacao': 'São Paulo, SP',
+              'salario': f'R$ {3000 + (i * 7919) % 10000}', 'descricao': 'Vaga CLT',
+              'data_publicacao': f'2025-10-{1 + i % 28:02d}', 'site_origem': ('Indeed', 'LinkedIn')[i % 2],
+              'url': f'https://vagas.exemplo/{i}'} for i in range(total)]
+    return api_server.obter_armazem().salvar(vagas, {'cargo': 'Desenvolvedor'}, tipo='busca')
+
+
+def percorrer(api, **parametros):
+    """Segue os cursores de /api/ultimo-resultado até a última página"""
+    vagas, cursor, paginas = [], None, 0
+    while True:
+        args = dict(parametros, cursor=cursor) if cursor else parametros
+        resposta = api.get('/api/ultimo-resultado', query_string=args)
+        assert resposta.status_code == 200
+        dados = resposta.get_json()
+        vagas.extend(dados['vagas'])
+        paginas += 1
+        cursor = dados['next_cursor']
+        if cursor is None:
+            return vagas, paginas, dados
+
+
+@pytest.mark.parametrize('sort', ['relevancia', 'salario', 'data', 'titulo', 'empresa'])
+def test_cursor_percorre_o_resultado_sem_repetir_nem_pular(api, sort):
+    salvar_resultado(25)
+
+    vagas, paginas, _ = percorrer(api, page_size=7, sort=sort)
+
+    assert paginas == 4
+    assert len(vagas) == 25 and len({v['id'] for v in vagas}) == 25
+    if sort == 'salario':
+        valores = [int(v['salario'].split()[-1]) for v in vagas]
+        assert valores == sorted(valores)
+
+
+def test_cursor_com_filtro(api):
+    salvar_resultado(25)
+
+    vagas, _, dados = percorrer(api, page_size=5, site='Indeed', sort='titulo')
+
+    assert {v['site'] for v in vagas} == {'Indeed'}
+    assert len(vagas) == dados['total'] == 13
+    assert [v['titulo'] for v in vagas] == sorted(v['titulo'] for v in vagas)
+
+
+@pytest.mark.parametrize('cursor', [
+    'nao-e-um-cursor!',
+    'bGl4bw',  # base64 de "lixo"
+    'WzFd',  # base64 de "[1]"
+    'WyJyZWxldmFuY2lhIiwxLCJ4Il0',  # base64 de ["relevancia",1,"x"]
+])
+def test_cursor_invalido_retorna_400(api, cursor):
+    salvar_resultado(5)
+
+    resposta = api.get('/api/ultimo-resultado', query_string={'cursor': cursor})
+
+    assert resposta.status_code == 400
+    assert 'Cursor inválido' in resposta.get_json()['error']
+
+
+def test_cursor_de_outra_ordenacao_retorna_400(api):
+    salvar_resultado(10)
+    cursor = api.get('/api/ultimo-resultado?page_size=3&sort=salario').get_json()['next_cursor']
+
+    resposta = api.get('/api/ultimo-resultado', query_string={'cursor': cursor, 'sort': 'titulo'})
+
+    assert resposta.status_code == 400
+
+
+def test_ultimo_resultado_if_none_match_responde_304(api):
+    salvar_resultado(5)
+    primeira = api.get('/api/ultimo-resultado')
+    etag = primeira.headers['ETag']
+
+    revalidada = api.get('/api/ultimo-resultado', headers={'If-None-Match': etag})
+
+    assert primeira.status_code == 200 and len(primeira.get_json()['vagas']) == 5
+    assert 'no-cache' in primeira.headers['Cache-Control']
+    assert revalidada.status_code == 304 and revalidada.data == b''
+    assert revalidada.headers['ETag'] == etag
+
+
+def test_ultimo_resultado_etag_muda_com_nova_busca_e_com_a_query(api):
+    salvar_resultado(5)
+    etag = api.get('/api/ultimo-resultado').headers['ETag']
+
+    assert api.get('/api/ultimo-resultado?page_size=2', headers={'If-None-Match': etag}).status_code == 200
+    salvar_resultado(6)
+    resposta = api.get('/api/ultimo-resultado', headers={'If-None-Match': etag})
+    assert resposta.status_code == 200 and len(resposta.get_json()['vagas']) == 6
+    assert resposta.headers['ETag'] != etag
+
+
+def test_ultimo_resultado_if_modified_since(api):
+    salvar_resultado(3)
+    modificado = api.get('/api/ultimo-resultado').headers['Last-Modified']
+
+    assert api.get('/api/ultimo-resultado', headers={'If-Modified-Since': modificado}).status_code == 304
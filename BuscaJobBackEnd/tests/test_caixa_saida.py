@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+"""CaixaSaida com um servidor SMTP falso: entrega, novas tentativas com espera exponencial e falhas definitivas"""
+
+import email
+import gzip
+import smtplib
+import time
+
+import pytest
+
+from caixa_saida import ENVIADO, FALHOU, PENDENTE, CaixaSaida, ConfigSMTP
+
+CONFIG = ConfigSMTP(host='smtp.exemplo', remetente='buscajob@exemplo.com', destinatarios=('eu@exemplo.com',))
+
+
+class SMTPFalso:
+    """Servidor que responde a cada sendmail com o próximo item de `respostas` (exceção a levantar ou None)"""
+
+    def __init__(self, caixa):
+        self.caixa = caixa
+
+    def sendmail(self, remetente, destinatarios, mensagem):
+        resposta = self.caixa.respostas.pop(0) if self.caixa.respostas else None
+        if resposta is not None:
+            raise resposta
+        self.caixa.enviadas.append(mensagem)
+
+    def quit(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class CaixaFalsa(CaixaSaida):
+    def __init__(self, *args, respostas=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        self.respostas = list(respostas)
+        self.enviadas = []
+        self.conexoes = 0
+
+    def _conectar(self, config):
+        self.conexoes += 1
+        return SMTPFalso(self)
+
+
+@pytest.fixture
+def criar_caixa(tmp_path):
+    caixas = []
+
+    def _criar(**kwargs):
+        kwargs.setdefault('espera_base', 30)
+        caixa = CaixaFalsa(str(tmp_path / 'buscajob.sqlite3'), config=CONFIG, **kwargs)
+        caixas.append(caixa)
+        return caixa
+
+    yield _criar
+    for caixa in caixas:
+        caixa.fechar()
+
+
+def vencer(caixa):
+    """Antecipa as novas tentativas agendadas (sem esperar a espera exponencial)"""
+    with caixa._lock:
+        caixa._conn.execute('UPDATE emails SET proxima_tentativa = 0 WHERE status = ?', (PENDENTE,))
+
+
+def test_entrega_reaproveitando_a_conexao(criar_caixa):
+    caixa = criar_caixa()
+    ids = [caixa.enfileirar(f'Relatório {i}', 'corpo') for i in range(3)]
+
+    assert caixa.enviar_pendentes() == {'enviados': 3, 'falhas': 0, 'proxima_em': None}
+    assert caixa.conexoes == 1
+    assert all(caixa.obter(i)['status'] == ENVIADO for i in ids)
+
+
+def test_falha_temporaria_repete_com_espera_exponencial(criar_caixa):
+    erro = smtplib.SMTPDataError(451, b'tente mais tarde')
+    caixa = criar_caixa(respostas=[erro, erro], espera_base=30)
+    email_id = caixa.enfileirar('Relatório', 'corpo')
+
+    antes = time.time()
+    resumo = caixa.enviar_pendentes()
+    primeira = caixa.obter(email_id)
+    assert resumo['falhas'] == 1 and primeira['status'] == PENDENTE and primeira['tentativas'] == 1
+    # espera_base com jitter de ±20%; a mensagem não é reenviada antes disso
+    assert 30 * 0.8 - 1 <= resumo['proxima_em'] <= 30 * 1.2
+    assert caixa.enviar_pendentes()['falhas'] == 0
+
+    vencer(caixa)
+    resumo = caixa.enviar_pendentes()
+    assert resumo['falhas'] == 1 and 60 * 0.8 - 1 <= resumo['proxima_em'] <= 60 * 1.2
+    assert caixa.obter(email_id)['erro'].startswith('(451')
+
+    vencer(caixa)
+    assert caixa.enviar_pendentes()['enviados'] == 1
+    enviado = caixa.obter(email_id)
+    assert enviado['status'] == ENVIADO and enviado['tentativas'] == 3 and enviado['erro'] is None
+    assert time.time() - antes < 5
+
+
+def test_desiste_apos_max_tentativas(criar_caixa):
+    caixa = criar_caixa(respostas=[smtplib.SMTPConnectError(421, b'ocupado')] * 3, max_tentativas=3)
+    email_id = caixa.enfileirar('Relatório', 'corpo')
+
+    for _ in range(3):
+        caixa.enviar_pendentes()
+        vencer(caixa)
+
+    falha = caixa.obter(email_id)
+    assert falha['status'] == FALHOU and falha['tentativas'] == 3
+    assert caixa.enviar_pendentes() == {'enviados': 0, 'falhas': 0, 'proxima_em': None}
+
+
+def test_recusa_definitiva_falha_na_hora(criar_caixa):
+    caixa = criar_caixa(respostas=[smtplib.SMTPRecipientsRefused({'eu@exemplo.com': (550, b'inexistente')})])
+    email_id = caixa.enfileirar('Relatório', 'corpo')
+
+    caixa.enviar_pendentes()
+
+    assert caixa.obter(email_id)['status'] == FALHOU and caixa.obter(email_id)['tentativas'] == 1
+    assert caixa.contar() == {FALHOU: 1}
+
+
+def test_reconecta_uma_vez_se_o_servidor_derrubou_a_conexao(criar_caixa):
+    caixa = criar_caixa(respostas=[smtplib.SMTPServerDisconnected('fechada')])
+    email_id = caixa.enfileirar('Relatório', 'corpo')
+
+    assert caixa.enviar_pendentes()['enviados'] == 1
+    assert caixa.conexoes == 2 and caixa.obter(email_id)['tentativas'] == 1
+
+
+def test_anexo_enviado_compactado(criar_caixa, tmp_path):
+    caixa = criar_caixa()
+    anexo = tmp_path / 'relatorio.ndjson'
+    anexo.write_text('{"titulo": "Desenvolvedor"}\n' * 100, encoding='utf-8')
+
+    caixa.enfileirar('Relatório', 'corpo', anexos=[str(anexo)])
+    caixa.enviar_pendentes()
+
+    mensagem = email.message_from_bytes(caixa.enviadas[0])
+    (parte,) = [p for p in mensagem.walk() if p.get_filename()]
+    assert parte.get_filename() == 'relatorio.ndjson.gz'
+    assert gzip.decompress(parte.get_payload(decode=True)) == anexo.read_bytes()
+
+
+def test_pendentes_sobrevivem_a_reinicio(criar_caixa):
+    primeira = criar_caixa(respostas=[smtplib.SMTPDataError(451, b'depois')])
+    email_id = primeira.enfileirar('Relatório', 'corpo')
+    primeira.enviar_pendentes()
+    primeira.fechar()
+
+    segunda = criar_caixa()
+    vencer(segunda)
+    assert segunda.enviar_pendentes()['enviados'] == 1
+    assert segunda.obter(email_id)['status'] == ENVIADO
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""Classificador de vagas: tipo de contrato, modalidade e nível em uma varredura"""
+
+import pytest
+
+from classificador import (aceita_tipo, classificar, internar_tags, modalidade_de, normalizar_modalidade,
+                           tipo_principal)
+
+
+@pytest.mark.parametrize('descricao', [
+    'Regime de tempo integral, 40h semanais',
+    'Atuação em tempo parcial',
+    'Temperatura controlada no ambiente de trabalho',
+    'Contemporâneo e dinâmico',
+])
+def test_palavras_com_prefixo_temp_nao_sao_temporario(descricao):
+    tags = classificar('Analista de Sistemas', descricao)
+
+    assert 'tipo:TEMPORARIO' not in tags
+    assert tipo_principal(tags) != 'Temporário'
+
+
+@pytest.mark.parametrize('descricao', ['Vaga temp por 3 meses', 'Contrato temporário', 'Vaga temporária',
+                                       'Temporary position'])
+def test_temporario(descricao):
+    assert 'tipo:TEMPORARIO' in classificar('Auxiliar Administrativo', descricao)
+
+
+@pytest.mark.parametrize('titulo, descricao, esperado', [
+    ('Desenvolvedor Python', 'Contratação CLT com benefícios', 'CLT'),
+    ('Desenvolvedor Python', 'Contratação como Pessoa Jurídica', 'PJ'),
+    ('Estagiário de TI', '', 'Estágio'),
+    ('Designer Freela', '', 'Freelancer'),
+    ('Analista', 'Vaga efetiva, regime CLT ou PJ', 'CLT'),  # prioridade de TIPOS_CONTRATO
+])
+def test_tipo_principal(titulo, descricao, esperado):
+    assert tipo_principal(classificar(titulo, descricao)) == esperado
+
+
+def test_indicio_so_serve_para_filtrar():
+    tags = classificar('Analista', 'Contrato por projeto')
+
+    assert tipo_principal(tags) == ''
+    assert aceita_tipo(tags, {'CLT'}) and aceita_tipo(tags, {'FREELANCER'})
+    assert not aceita_tipo(tags, {'PJ'})
+
+
+@pytest.mark.parametrize('descricao, localizacao, esperado', [
+    ('Trabalho 100% remoto', 'São Paulo, SP', 'Home office'),
+    ('Modelo híbrido, 2x por semana', 'Campinas, SP', 'Híbrido'),
+    ('Atuação presencial', 'Curitiba, PR', 'Presencial'),
+    ('', 'Remoto', 'Home office'),
+    ('Remoto ou híbrido', '', 'Home office'),  # uma modalidade por vaga, pela prioridade
+    ('', 'Belo Horizonte, MG', ''),
+])
+def test_modalidade(descricao, localizacao, esperado):
+    assert modalidade_de(classificar('Desenvolvedor', descricao, localizacao)) == esperado
+
+
+def test_modalidade_informada_prevalece_sobre_o_texto():
+    assert modalidade_de(classificar('Desenvolvedor', 'Trabalho remoto', modalidade='Presencial')) == 'Presencial'
+    assert normalizar_modalidade('home-office') == 'HOME OFFICE'
+
+
+@pytest.mark.parametrize('titulo, nivel', [
+    ('Desenvolvedor Python Sr.', 'SENIOR'),
+    ('Desenvolvedora Júnior', 'JUNIOR'),
+    ('Tech Lead Java', 'LIDERANCA'),
+    ('Gerente de TI', 'GESTAO'),
+])
+def test_nivel(titulo, nivel):
+    assert f'nivel:{nivel}' in classificar(titulo, '')
+
+
+def test_sigla_de_nivel_so_como_palavra_inteira():
+    assert not any(t.startswith('nivel:') for t in classificar('Analista de Processos', 'Ambiente de Jira'))
+
+
+def test_tags_internadas_compartilham_instancia():
+    a = internar_tags(classificar('Desenvolvedor', 'CLT remoto'))
+    b = internar_tags(classificar('Desenvolvedor', 'CLT remoto'))
+
+    assert a is b
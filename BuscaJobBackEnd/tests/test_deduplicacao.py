@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""Deduplicação de vagas entre sites: quase duplicatas e a trava de empresa"""
+
+import pytest
+
+from deduplicacao import DeduplicadorIncremental, DeduplicadorVagas, _normalizar_empresa
+from job_scraper import Vaga
+
+
+def vaga(titulo, empresa, site='Indeed', localizacao='São Paulo, SP', **campos):
+    return Vaga(titulo=titulo, empresa=empresa, localizacao=localizacao, salario=campos.pop('salario', ''),
+                descricao=campos.pop('descricao', ''), data_publicacao='2025-10-01', site_origem=site,
+                url=f'https://{site.lower()}.exemplo/{titulo}/{empresa}', **campos)
+
+
+@pytest.fixture
+def deduplicador():
+    return DeduplicadorVagas(limiar=0.75)
+
+
+@pytest.mark.parametrize('empresa, esperado', [
+    ('Nubank S.A.', 'nubank'),
+    ('Grupo Boticário Ltda', 'boticario'),
+    ('VinxaTech', 'vinxa'),
+    ('Consultoria Tech', 'consultoria tech'),
+    ('Grupo Software Ltda', 'grupo software'),
+])
+def test_normalizar_empresa(empresa, esperado):
+    assert _normalizar_empresa(empresa) == esperado
+
+
+def test_quase_duplicata_entre_sites_e_mesclada(deduplicador):
+    vagas = [
+        vaga('Desenvolvedor Python Sênior', 'Acme Tecnologia Ltda', site='Indeed', salario='R$ 12.000'),
+        vaga('Desenvolvedor(a) Python Sr.', 'ACME', site='LinkedIn', descricao='Vaga remota'),
+        vaga('Analista de Dados', 'Acme', site='Catho'),
+    ]
+
+    unicas = deduplicador.deduplicar(vagas)
+
+    assert [v.titulo for v in unicas] == ['Desenvolvedor Python Sênior', 'Analista de Dados']
+    mesclada = unicas[0]
+    assert set(mesclada.urls_fontes) == {vagas[0].url, vagas[1].url}
+    assert mesclada.salario == 'R$ 12.000' and mesclada.descricao == 'Vaga remota'
+
+
+def test_mesmo_titulo_em_empresas_diferentes_nao_e_mesclado(deduplicador):
+    vagas = [vaga('Analista de Dados', 'Empresa 1'), vaga('Analista de Dados', 'Empresa 2')]
+
+    assert len(deduplicador.deduplicar(vagas)) == 2
+
+
+def test_empresas_so_com_termos_genericos_nao_sao_mescladas(deduplicador):
+    vagas = [vaga('Desenvolvedor Java', 'Consultoria Tech'), vaga('Desenvolvedor Java', 'Grupo Software'),
+             vaga('Desenvolvedor Java', 'Consultoria Tech Ltda', site='LinkedIn')]
+
+    unicas = deduplicador.deduplicar(vagas)
+
+    assert [v.empresa for v in unicas] == ['Consultoria Tech', 'Grupo Software']
+    assert len(unicas[0].urls_fontes) == 2
+
+
+def test_niveis_diferentes_nao_sao_mesclados(deduplicador):
+    vagas = [vaga('Desenvolvedor Python Júnior', 'Acme'), vaga('Desenvolvedor Python Sênior', 'Acme', site='Catho')]
+
+    assert len(deduplicador.deduplicar(vagas)) == 2
+
+
+def test_incremental_descarta_duplicatas_de_lotes_anteriores(deduplicador):
+    incremental = DeduplicadorIncremental(deduplicador)
+
+    primeiro = incremental.adicionar([vaga('Desenvolvedor Python Sênior', 'Acme')])
+    segundo = incremental.adicionar([vaga('Desenvolvedor(a) Python Sr.', 'Acme S.A.', site='LinkedIn'),
+                                     vaga('Desenvolvedor Python Sênior', 'Consultoria Tech', site='LinkedIn')])
+
+    assert len(primeiro) == 1
+    assert [v.empresa for v in segundo] == ['Consultoria Tech']
@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+"""Motor de requisições: ordem semáforo/token, backoff, cache HTTP e revalidação (sem rede)"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+import fetch_engine
+from fetch_engine import MotorRequisicoes, RespostaHTTP
+from http_cache import CacheHTTP
+from rate_limiter import LimitadorPorHost
+
+HOST = 'vagas.exemplo'
+
+
+class MotorFalso(MotorRequisicoes):
+    """
+    Motor cujo GET só registra o instante de envio e responde segundo `status`;
+    os `presos` primeiros GETs terminam todos juntos, `duracao` segundos após o primeiro envio
+    """
+
+    def __init__(self, status=None, presos=0, duracao=0.0, **kwargs):
+        super().__init__(**kwargs)
+        self.status = list(status or [])
+        self.presos = presos
+        self.duracao = duracao
+        self.envios = []
+        self.cabecalhos_enviados = []
+
+    async def _get(self, url, headers):
+        self.envios.append(time.monotonic())
+        self.cabecalhos_enviados.append(headers)
+        if len(self.envios) <= self.presos:
+            await asyncio.sleep(max(0.0, self.envios[0] + self.duracao - time.monotonic()))
+        status = self.status.pop(0) if self.status else 200
+        return RespostaHTTP(url=url, status=status, conteudo=b'' if status == 304 else b'ok',
+                            headers={'ETag': '"v1"'} if status == 200 else {})
+
+
+class CacheNaThread(CacheHTTP):
+    """Cache HTTP que anota em que threads o IO aconteceu"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.threads = set()
+
+    def obter(self, url):
+        self.threads.add(threading.current_thread().name)
+        return super().obter(url)
+
+    def salvar(self, *args):
+        self.threads.add(threading.current_thread().name)
+        return super().salvar(*args)
+
+    def renovar(self, url):
+        self.threads.add(threading.current_thread().name)
+        return super().renovar(url)
+
+
+@pytest.fixture
+def motor_factory():
+    motores = []
+
+    def _criar(**kwargs):
+        motor = MotorFalso(**kwargs)
+        motores.append(motor)
+        return motor
+
+    yield _criar
+    for motor in motores:
+        motor.fechar()
+
+
+def test_rajada_respeitada_com_varias_vagas_no_semaforo(motor_factory):
+    # rajada 1 a 20/s com 4 vagas por host; as 4 primeiras liberam o semáforo juntas e as
+    # seguintes, que esperavam a vaga, ainda assim saem espaçadas de ~50 ms
+    limitador = LimitadorPorHost()
+    limitador.configurar(HOST, taxa=20, rajada=1)
+    motor = motor_factory(limite_por_host=4, limitador=limitador, presos=4, duracao=0.5)
+
+    respostas = motor.buscar_varias_sync([f'https://{HOST}/vaga/{i}' for i in range(8)])
+
+    assert all(r is not None and r.status == 200 for r in respostas)
+    intervalos = [b - a for a, b in zip(motor.envios, motor.envios[1:])]
+    assert min(intervalos) >= 0.04
+
+
+def test_retentativa_espera_o_backoff_pelo_limitador(motor_factory, monkeypatch):
+    monkeypatch.setattr(fetch_engine, 'BACKOFF_BASE', (0.2, 0.2))
+    limitador = LimitadorPorHost()
+    limitador.configurar(HOST, taxa=100, rajada=1)
+    motor = motor_factory(status=[503], limitador=limitador)
+    antes = fetch_engine.BACKOFF_HOST.valor(HOST)
+
+    resposta = motor.buscar_sync(f'https://{HOST}/vaga/1', max_retries=2)
+
+    assert resposta is not None and resposta.status == 200
+    assert len(motor.envios) == 2
+    # o backoff é esperado uma vez, ao tirar o token da nova tentativa
+    assert 0.18 <= motor.envios[1] - motor.envios[0] < 0.5
+    assert fetch_engine.BACKOFF_HOST.valor(HOST) - antes == pytest.approx(0.2)
+
+
+def test_cache_http_fora_do_event_loop(motor_factory, tmp_path):
+    cache = CacheNaThread(str(tmp_path))
+    motor = motor_factory(cache=cache)
+
+    motor.buscar_sync(f'https://{HOST}/vaga/1')
+    motor.buscar_sync(f'https://{HOST}/vaga/1')
+
+    assert cache.estatisticas()['hits'] == 1
+    assert cache.threads and 'buscajob-fetch' not in cache.threads
+
+
+def test_if_none_match_e_304_servem_o_conteudo_em_cache(motor_factory, tmp_path):
+    cache = CacheHTTP(str(tmp_path), ttl_padrao=0)
+    motor = motor_factory(status=[200, 304], cache=cache)
+    url = f'https://{HOST}/vaga/1'
+
+    primeira = motor.buscar_sync(url)
+    segunda = motor.buscar_sync(url)
+
+    assert 'If-None-Match' not in motor.cabecalhos_enviados[0]
+    assert motor.cabecalhos_enviados[1]['If-None-Match'] == '"v1"'
+    assert segunda.status == 200 and segunda.conteudo == primeira.conteudo == b'ok'
+    assert cache.estatisticas()['revalidacoes'] == 1
+
+
+def test_304_sem_entrada_em_cache_e_tratado_como_falha(motor_factory, tmp_path, monkeypatch):
+    monkeypatch.setattr(fetch_engine, 'BACKOFF_BASE', (0.01, 0.01))
+    cache = CacheHTTP(str(tmp_path))
+    motor = motor_factory(status=[304], cache=cache)
+
+    resposta = motor.buscar_sync(f'https://{HOST}/vaga/1', max_retries=2)
+
+    assert len(motor.envios) == 2
+    assert resposta.status == 200 and resposta.conteudo == b'ok'
+    assert cache.obter(f'https://{HOST}/vaga/1').conteudo == b'ok'
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""HistoricoVagas: delta por escopo (novas e alteradas) gravado só em `confirmar`"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from historico_vagas import ALTERADA, NOVA, HistoricoVagas
+
+ONTEM = datetime(2025, 10, 1, 8, 0)
+HOJE = datetime(2025, 10, 2, 8, 0)
+
+
+def vaga(n, **campos):
+    base = {'titulo': f'Desenvolvedor {n}', 'empresa': 'Acme', 'localizacao': 'São Paulo, SP',
+            'salario': 'R$ 8.000', 'descricao': 'Vaga CLT', 'dataPublicacao': '01/10/2025',
+            'site': 'Indeed', 'url': f'https://vagas.exemplo/{n}'}
+    base.update(campos)
+    return base
+
+
+@pytest.fixture
+def historico(tmp_path):
+    h = HistoricoVagas(str(tmp_path / 'historico.sqlite3'))
+    yield h
+    h.fechar()
+
+
+def test_primeira_execucao_tudo_novo(historico):
+    saida, linhas = historico.comparar('busca', [vaga(1), vaga(2), vaga(1)], quando=ONTEM)
+
+    assert [v['titulo'] for v in saida] == ['Desenvolvedor 1', 'Desenvolvedor 2']
+    assert {v['situacao'] for v in saida} == {NOVA}
+    assert saida[0]['primeiraVez'] == saida[0]['ultimaVez'] == ONTEM.isoformat()
+    assert len(linhas) == 2
+
+
+def test_comparar_nao_grava_ate_confirmar(historico):
+    historico.comparar('busca', [vaga(1)], quando=ONTEM)
+
+    assert historico.contar() == 0
+    saida, linhas = historico.comparar('busca', [vaga(1)], quando=HOJE)
+    assert [v['situacao'] for v in saida] == [NOVA]
+
+    historico.confirmar(linhas)
+    assert historico.contar('busca') == 1
+
+
+def test_delta_traz_so_novas_e_alteradas(historico):
+    _, linhas = historico.comparar('busca', [vaga(1), vaga(2), vaga(3)], quando=ONTEM)
+    historico.confirmar(linhas)
+
+    saida, _ = historico.comparar('busca', [
+        vaga(1),  # igual
+        vaga(2, salario='R$ 9.500'),  # alterada
+        vaga(3, descricao='Texto reescrito', dataPublicacao='há 2 dias'),  # fora do conteúdo
+        vaga(4),  # nova
+    ], quando=HOJE)
+
+    assert {v['titulo']: v['situacao'] for v in saida} == {'Desenvolvedor 2': ALTERADA, 'Desenvolvedor 4': NOVA}
+    alterada = next(v for v in saida if v['situacao'] == ALTERADA)
+    assert alterada['primeiraVez'] == ONTEM.isoformat() and alterada['ultimaVez'] == HOJE.isoformat()
+
+
+def test_sem_apenas_delta_traz_todas_com_datas(historico):
+    historico.registrar('busca', [vaga(1)], quando=ONTEM)
+
+    saida, _ = historico.comparar('busca', [vaga(1), vaga(2)], quando=HOJE, apenas_delta=False)
+
+    assert [v.get('situacao') for v in saida] == [None, NOVA]
+    assert saida[0]['primeiraVez'] == ONTEM.isoformat()
+
+
+def test_alteracao_confirmada_nao_reaparece(historico):
+    historico.registrar('busca', [vaga(1)], quando=ONTEM)
+    historico.registrar('busca', [vaga(1, modalidade='Home office')], quando=HOJE)
+
+    saida, _ = historico.comparar('busca', [vaga(1, modalidade='Home office')], quando=HOJE + timedelta(days=1))
+
+    assert saida == []
+
+
+def test_escopos_independentes(historico):
+    historico.registrar('python-sp', [vaga(1)], quando=ONTEM)
+
+    saida, _ = historico.comparar('java-rj', [vaga(1)], quando=HOJE)
+
+    assert [v['situacao'] for v in saida] == [NOVA]
+
+
+def test_esquecer_remove_vagas_antigas(historico):
+    historico.registrar('busca', [vaga(1)], quando=datetime.now() - timedelta(days=40))
+    historico.registrar('busca', [vaga(2)])
+
+    assert historico.esquecer(30) == 1
+    saida, _ = historico.comparar('busca', [vaga(1), vaga(2)])
+    assert [v['titulo'] for v in saida] == ['Desenvolvedor 1']
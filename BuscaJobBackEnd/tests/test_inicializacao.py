@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""
+Inicialização (cold start): importar os módulos de entrada cabe no orçamento,
+não carrega dependências pesadas e não cria arquivos.
+
+Cada medida importa o módulo em um interpretador novo, dentro de uma cópia dos
+módulos do backend em um diretório temporário (BASE_DIR é o diretório do módulo),
+e compara o conteúdo do diretório antes e depois.
+Orçamentos ajustáveis por ORCAMENTO_<MODULO>_MS (ex.: ORCAMENTO_API_SERVER_MS=400).
+"""
+
+import glob
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+REPETICOES = 5
+
+# módulo -> (orçamento em ms, módulos que não podem estar carregados após a importação)
+ORCAMENTOS = {
+    'job_scraper': (150, ('requests', 'bs4', 'fake_useragent', 'lxml', 'aiohttp', 'asyncio', 'fetch_engine')),
+    'api_server': (350, ('job_scraper', 'requests', 'bs4', 'fake_useragent', 'openpyxl', 'asyncio')),
+}
+
+# Mede só a importação (sem o tempo de subir o interpretador) e lista os módulos carregados
+_SONDA = """
+import json, sys, time
+inicio = time.perf_counter()
+import {modulo}
+duracao = (time.perf_counter() - inicio) * 1000
+print(json.dumps({{'ms': duracao, 'carregados': [m for m in {proibidos!r} if m in sys.modules]}}))
+"""
+
+
+@pytest.fixture
+def copia_backend(tmp_path):
+    """Diretório temporário só com os módulos do backend"""
+    for arquivo in glob.glob(os.path.join(BACKEND_DIR, '*.py')):
+        shutil.copy(arquivo, tmp_path)
+    return tmp_path
+
+
+def executar(diretorio, codigo):
+    """Roda `codigo` em um interpretador novo dentro de `diretorio`, sem gravar bytecode"""
+    ambiente = dict(os.environ, PYTHONDONTWRITEBYTECODE='1')
+    ambiente.pop('PYTHONPATH', None)
+    saida = subprocess.run([sys.executable, '-c', codigo], cwd=diretorio, env=ambiente,
+                           capture_output=True, text=True, check=True).stdout
+    return saida.strip().splitlines()[-1]
+
+
+def conteudo(diretorio):
+    return sorted(os.listdir(diretorio))
+
+
+@pytest.mark.parametrize('modulo', sorted(ORCAMENTOS))
+def test_importacao_cabe_no_orcamento_sem_dependencias_pesadas(copia_backend, modulo):
+    orcamento, proibidos = ORCAMENTOS[modulo]
+    orcamento = float(os.environ.get(f'ORCAMENTO_{modulo.upper()}_MS', orcamento))
+    codigo = _SONDA.format(modulo=modulo, proibidos=proibidos)
+
+    medidas = [json.loads(executar(copia_backend, codigo)) for _ in range(REPETICOES)]
+
+    carregados = sorted({nome for m in medidas for nome in m['carregados']})
+    assert carregados == []
+    mediana = statistics.median(m['ms'] for m in medidas)
+    assert mediana <= orcamento, f'{modulo}: {mediana:.0f} ms > {orcamento:.0f} ms'
+
+
+@pytest.mark.parametrize('modulo', sorted(ORCAMENTOS))
+def test_importacao_nao_cria_arquivos(copia_backend, modulo):
+    antes = conteudo(copia_backend)
+    executar(copia_backend, f'import {modulo}; print("ok")')
+    assert conteudo(copia_backend) == antes
+
+
+def test_criar_scraper_nao_cria_arquivos_nem_motor(copia_backend):
+    antes = conteudo(copia_backend)
+    codigo = ("import json, sys, job_scraper; s = job_scraper.JobScraper(); "
+              "print(json.dumps([m for m in ('asyncio', 'fetch_engine', 'http_cache') if m in sys.modules]))")
+    assert json.loads(executar(copia_backend, codigo)) == []
+    assert conteudo(copia_backend) == antes
+
+
+def test_scraper_do_servidor_nao_cria_cache_http(copia_backend):
+    codigo = ("import api_server; api_server.obter_scraper(); api_server.obter_configuracoes(); "
+              "print('ok')")
+    antes = conteudo(copia_backend)
+    executar(copia_backend, codigo)
+    depois = conteudo(copia_backend)
+    # o scraper não cria nada; as configurações abrem o banco no primeiro uso
+    assert set(depois) - set(antes) <= {'buscajob.sqlite3', 'buscajob.sqlite3-wal', 'buscajob.sqlite3-shm'}
+    assert 'cache_http' not in depois
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+"""JobScraper sem rede: gravação dos resultados"""
+
+import json
+
+import pytest
+
+from job_scraper import JobScraper, Vaga
+from job_store import ArmazemVagas
+
+
+def vaga(titulo='Desenvolvedor Python', empresa='Acme', url='https://vagas.exemplo/1'):
+    return Vaga(titulo=titulo, empresa=empresa, localizacao='São Paulo, SP', salario='R$ 8.000',
+                descricao='Vaga remota em tempo integral', data_publicacao='2025-10-01',
+                site_origem='Indeed', url=url)
+
+
+@pytest.fixture
+def scraper(tmp_path):
+    return JobScraper(armazem=ArmazemVagas(str(tmp_path / 'buscajob.sqlite3')))
+
+
+def test_salvar_resultados_json_grava_arquivo_no_formato_legado(scraper, tmp_path):
+    arquivo = tmp_path / 'vagas_encontradas.json'
+
+    resultado_id = scraper.salvar_resultados([vaga(), vaga('Analista de Dados', url='https://vagas.exemplo/2')],
+                                             str(arquivo))
+
+    dados = json.loads(arquivo.read_text(encoding='utf-8'))
+    assert set(dados) == {'timestamp', 'total_vagas', 'vagas'}
+    assert dados['total_vagas'] == 2
+    assert [v['titulo'] for v in dados['vagas']] == ['Desenvolvedor Python', 'Analista de Dados']
+    assert 'tags' not in dados['vagas'][0]
+    assert scraper.armazem.resultado(resultado_id)['nome'] == 'vagas_encontradas'
+
+
+def test_salvar_resultados_ndjson_nao_grava_json(scraper, tmp_path):
+    arquivo = tmp_path / 'resultados_teste.ndjson'
+
+    assert scraper.salvar_resultados([vaga()], str(arquivo)) is not None
+    assert arquivo.exists()
+    assert list(tmp_path.glob('*.json')) == []
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""GerenciadorTarefas: fila limitada, cancelamento e resultado"""
+
+import threading
+
+import pytest
+
+from tarefas import CANCELADA, CONCLUIDA, ERRO, EXECUTANDO, PENDENTE, FilaCheia, GerenciadorTarefas
+
+
+@pytest.fixture
+def gerenciador():
+    g = GerenciadorTarefas(max_trabalhadores=1, max_pendentes=2, nome='teste-tarefa')
+    yield g
+    g.fechar()
+
+
+def bloqueante(liberar, iniciou=None):
+    """Função de tarefa que só termina quando `liberar` é sinalizado (ou a tarefa é cancelada)"""
+    def _funcao(tarefa):
+        if iniciou is not None:
+            iniciou.set()
+        while not liberar.wait(0.01):
+            tarefa.verificar_cancelamento()
+        return {'ok': True}
+    return _funcao
+
+
+def test_conclui_com_resultado(gerenciador):
+    tarefa = gerenciador.submeter('teste', lambda t: {'total': 3})
+
+    assert tarefa.aguardar(5)
+    assert tarefa.status == CONCLUIDA and tarefa.resultado == {'total': 3}
+
+
+def test_erro_fica_registrado(gerenciador):
+    def _falha(tarefa):
+        raise RuntimeError('sem rede')
+
+    tarefa = gerenciador.submeter('teste', _falha)
+
+    assert tarefa.aguardar(5)
+    assert tarefa.status == ERRO and tarefa.erro == 'sem rede'
+
+
+def test_fila_cheia_alem_de_max_pendentes(gerenciador):
+    liberar, iniciou = threading.Event(), threading.Event()
+    gerenciador.submeter('teste', bloqueante(liberar, iniciou))
+    assert iniciou.wait(5)
+    pendentes = [gerenciador.submeter('teste', bloqueante(liberar)) for _ in range(2)]
+
+    with pytest.raises(FilaCheia):
+        gerenciador.submeter('teste', bloqueante(liberar))
+    assert gerenciador.profundidade() == {PENDENTE: 2, EXECUTANDO: 1}
+
+    liberar.set()
+    assert all(t.aguardar(5) and t.status == CONCLUIDA for t in pendentes)
+    # com a fila livre, volta a aceitar
+    assert gerenciador.submeter('teste', lambda t: None).aguardar(5)
+
+
+def test_cancelar_tarefa_na_fila_descarta_na_hora(gerenciador):
+    liberar, iniciou = threading.Event(), threading.Event()
+    gerenciador.submeter('teste', bloqueante(liberar, iniciou))
+    assert iniciou.wait(5)
+    na_fila = gerenciador.submeter('teste', bloqueante(liberar))
+
+    assert gerenciador.cancelar(na_fila.id)
+    assert na_fila.finalizada.is_set() and na_fila.status == CANCELADA
+    liberar.set()
+
+
+def test_cancelar_tarefa_em_execucao_para_no_ponto_de_verificacao(gerenciador):
+    liberar, iniciou = threading.Event(), threading.Event()
+    tarefa = gerenciador.submeter('teste', bloqueante(liberar, iniciou))
+    assert iniciou.wait(5)
+
+    assert gerenciador.cancelar(tarefa.id)
+
+    assert tarefa.aguardar(5)
+    assert tarefa.status == CANCELADA and tarefa.resultado is None
+    # já finalizada ou inexistente: nada a cancelar
+    assert not gerenciador.cancelar(tarefa.id)
+    assert not gerenciador.cancelar('inexistente')
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+BuscaJob - Lote colunar de vagas
+Guarda um conjunto de vagas como uma lista por campo (strings repetidas
+internadas), sem um objeto por vaga. Deduplicação, filtros, exportação e
+serialização trabalham direto sobre as colunas; objetos `Vaga` só são
+criados quando pedidos.
+"""
+
+import csv
+from dataclasses import fields
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+from classificador import classificar, internar_tags
+
+# Campo calculado (não exportado nem serializado)
+CAMPO_TAGS = 'tags'
+
+
+def _classe_vaga():
+    # Import tardio: job_scraper usa este módulo para salvar resultados
+    from job_scraper import Vaga
+    return Vaga
+
+
+def campos_vaga() -> tuple:
+    """Nomes dos campos de `Vaga`, na ordem da dataclass"""
+    return tuple(f.name for f in fields(_classe_vaga()))
+
+
+class VagaBatch:
+    """
+    Vagas em formato colunar: `colunas[campo][i]` é o valor do campo da i-ésima vaga.
+
+    Seleções (`deduplicar`, `filtrar`, `selecionar`) retornam um novo lote que
+    compartilha os valores (strings e tags) do original.
+    """
+
+    def __init__(self, colunas: Optional[Dict[str, list]] = None):
+        self.campos = campos_vaga()
+        self.colunas: Dict[str, list] = {c: [] for c in self.campos}
+        if colunas:
+            from job_scraper import CAMPOS_INTERNADOS, internar
+            for campo in self.campos:
+                valores = list(colunas.get(campo, ()))
+                if campo in CAMPOS_INTERNADOS:
+                    valores = [internar(v) for v in valores]
+                elif campo == CAMPO_TAGS:
+                    valores = [internar_tags(v) for v in valores]
+                elif campo in ('palavras_chave', 'urls_fontes'):
+                    valores = [tuple(v or ()) for v in valores]
+                self.colunas[campo] = valores
+            tamanhos = {len(v) for v in self.colunas.values()}
+            if len(tamanhos) > 1:
+                raise ValueError(f"Colunas com tamanhos diferentes: {sorted(tamanhos)}")
+
+    @classmethod
+    def de_vagas(cls, vagas: Iterable) -> 'VagaBatch':
+        """Monta o lote a partir de objetos `Vaga` (valores já internados na criação da vaga)"""
+        lote = cls()
+        colunas = [(lote.colunas[c], c) for c in lote.campos]
+        for vaga in vagas:
+            for coluna, campo in colunas:
+                coluna.append(getattr(vaga, campo))
+        return lote
+
+    @classmethod
+    def de_dicts(cls, linhas: Iterable[Dict]) -> 'VagaBatch':
+        """Monta o lote a partir de dicionários no formato de `linhas()` (tags recalculadas)"""
+        campos = campos_vaga()
+        colunas = {c: [] for c in campos}
+        for linha in linhas:
+            for campo in campos:
+                if campo != CAMPO_TAGS:
+                    colunas[campo].append(linha.get(campo, () if campo in ('palavras_chave', 'urls_fontes') else ''))
+            colunas[CAMPO_TAGS].append(classificar(
+                linha.get('titulo', ''), linha.get('descricao', ''), linha.get('localizacao', ''),
+                linha.get('tipo_contrato', ''), linha.get('modalidade', ''), linha.get('nivel_experiencia', ''),
+            ))
+        return cls(colunas)
+
+    def __len__(self) -> int:
+        return len(self.colunas[self.campos[0]])
+
+    def __iter__(self) -> Iterator:
+        return iter(self.para_vagas())
+
+    def coluna(self, campo: str) -> list:
+        return self.colunas[campo]
+
+    def selecionar(self, indices: Sequence[int]) -> 'VagaBatch':
+        """Novo lote só com as linhas em `indices` (na ordem dada)"""
+        lote = VagaBatch()
+        lote.colunas = {c: [valores[i] for i in indices] for c, valores in self.colunas.items()}
+        return lote
+
+    def deduplicar(self, campos: Sequence[str] = ('titulo', 'empresa'), deduplicador=None) -> 'VagaBatch':
+        """
+        Mantém a primeira ocorrência de cada combinação (sem diferenciar maiúsculas) dos campos,
+        ou, com um `deduplicacao.DeduplicadorVagas`, agrupa também as quase duplicatas e mescla as fontes
+        """
+        if deduplicador is not None:
+            from deduplicacao import alteracoes_mescla
+            grupos = deduplicador.grupos_colunas(self.colunas['titulo'], self.colunas['empresa'],
+                                                 self.colunas['localizacao'], self.colunas[CAMPO_TAGS])
+            lote = self.selecionar([grupo[0] for grupo in grupos])
+            ler = self._ler
+            for posicao, grupo in enumerate(grupos):
+                if len(grupo) > 1:
+                    for campo, valor in alteracoes_mescla(grupo, ler).items():
+                        lote.colunas[campo][posicao] = valor
+                    if not lote.colunas[CAMPO_TAGS][posicao]:
+                        lote.reclassificar(posicao)
+            return lote
+        valores = [self.colunas[c] for c in campos]
+        vistas = set()
+        indices = []
+        for i in range(len(self)):
+            chave = tuple((v[i] or '').lower() for v in valores)
+            if chave not in vistas:
+                vistas.add(chave)
+                indices.append(i)
+        return self.selecionar(indices)
+
+    def filtrar(self, filtro) -> 'VagaBatch':
+        """Aplica um `filtros.FiltroCompilado` sobre as colunas"""
+        return self.selecionar(filtro.aplicar_colunas(self.colunas))
+
+    def vaga(self, i: int):
+        """Objeto `Vaga` da i-ésima linha"""
+        return _classe_vaga()(**{c: self.colunas[c][i] for c in self.campos})
+
+    def _ler(self, i: int, campo: str):
+        return self.colunas[campo][i]
+
+    def reclassificar(self, i: int):
+        """Recalcula as tags da i-ésima linha (como `Vaga.classificar`)"""
+        c = self.colunas
+        c[CAMPO_TAGS][i] = internar_tags(classificar(
+            c['titulo'][i], c['descricao'][i], c['localizacao'][i], c['tipo_contrato'][i],
+            c['modalidade'][i], c['nivel_experiencia'][i],
+        ))
+
+    def para_vagas(self) -> List:
+        """Materializa objetos `Vaga` (tags reaproveitadas, sem reclassificar)"""
+        Vaga = _classe_vaga()
+        return [Vaga(**dict(zip(self.campos, linha))) for linha in zip(*(self.colunas[c] for c in self.campos))]
+
+    def linhas(self, campos: Optional[Sequence[str]] = None) -> Iterator[Dict]:
+        """Dicionários por vaga, no formato de `asdict(vaga)` sem as tags"""
+        campos = [c for c in (campos or self.campos) if c != CAMPO_TAGS]
+        for linha in zip(*(self.colunas[c] for c in campos)):
+            yield dict(zip(campos, linha))
+
+    def registros(self) -> Iterator[Dict]:
+        """Dicionários no formato da API (`registro_de_vaga`), montados direto das colunas"""
+        from job_store import id_vaga
+        c = self.colunas
+        for titulo, empresa, localizacao, salario, descricao, data, site, url, tipo, nivel, modalidade, fontes in zip(
+                c['titulo'], c['empresa'], c['localizacao'], c['salario'], c['descricao'], c['data_publicacao'],
+                c['site_origem'], c['url'], c['tipo_contrato'], c['nivel_experiencia'], c['modalidade'],
+                c['urls_fontes']):
+            yield {
+                'id': id_vaga(titulo, empresa, url),
+                'titulo': titulo,
+                'empresa': empresa,
+                'localizacao': localizacao,
+                'salario': salario,
+                'descricao': descricao,
+                'dataPublicacao': data,
+                'site': site,
+                'url': url,
+                'tipo': tipo,
+                'nivel': nivel,
+                'modalidade': modalidade,
+                # URLs de todos os sites onde a vaga foi encontrada (duplicatas mescladas)
+                'fontes': list(fontes or ([url] if url else [])),
+            }
+
+    def para_json(self) -> Dict[str, list]:
+        """Serialização colunar: o nome de cada campo aparece uma vez, não uma vez por vaga"""
+        return {c: list(v) for c, v in self.colunas.items() if c != CAMPO_TAGS}
+
+    @classmethod
+    def de_json(cls, dados: Dict[str, list]) -> 'VagaBatch':
+        """Inverso de `para_json`"""
+        return cls.de_dicts(dict(zip(dados, linha)) for linha in zip(*dados.values()))
+
+    def escrever_csv(self, destino, campos: Optional[Sequence[str]] = None):
+        """Exporta as colunas como CSV para um arquivo aberto em modo texto"""
+        campos = [c for c in (campos or self.campos) if c != CAMPO_TAGS]
+        escritor = csv.writer(destino)
+        escritor.writerow(campos)
+        colunas = [self.colunas[c] for c in campos]
+        for linha in zip(*colunas):
+            escritor.writerow(', '.join(v) if isinstance(v, tuple) else v for v in linha)
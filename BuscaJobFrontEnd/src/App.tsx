@@ -1,5 +1,5 @@
 import { useEffect, useState } from 'react'
-import { getUltimoResultado, buscarVagas, type Vaga, type BuscarCriterios } from './api/client'
+import { getUltimoResultado, buscarVagasFluxo, type Vaga, type BuscarCriterios, type PaginaVagas } from './api/client'
 import { SearchForm } from './components/SearchForm'
 import { VagasList } from './components/VagasList'
 import { Pagination } from './components/Pagination'
@@ -11,16 +11,50 @@ export default function App() {
   const [info, setInfo] = useState<string | null>(null)
   const [page, setPage] = useState(1)
   const [pageSize, setPageSize] = useState(10)
+  const [total, setTotal] = useState(0)
+  const [resultadoId, setResultadoId] = useState<number | undefined>(undefined)
+  // cursores[p - 1] é o cursor que carrega a página p (a página 1 não tem cursor)
+  const [cursores, setCursores] = useState<(string | null)[]>([null])
+
+  function aplicarPagina(data: PaginaVagas, pagina: number) {
+    setVagas(data.vagas ?? [])
+    setTotal(data.total ?? data.vagas?.length ?? 0)
+    setPage(pagina)
+    setCursores(prev => {
+      const next = prev.slice(0, pagina)
+      next[pagina] = data.next_cursor ?? null
+      return next
+    })
+  }
+
+  async function carregarPagina(pagina: number, tamanho: number, cursor?: string | null, id = resultadoId) {
+    setLoading(true)
+    setError(null)
+    try {
+      // Sem cursor conhecido para a página (ex.: troca de tamanho), o servidor salta por offset
+      const data = await getUltimoResultado({
+        resultado_id: id,
+        page: pagina,
+        page_size: tamanho,
+        cursor: pagina > 1 ? cursor ?? undefined : undefined,
+      })
+      aplicarPagina(data, pagina)
+    } catch (e: any) {
+      setError(e?.message || 'Erro ao carregar vagas')
+    } finally {
+      setLoading(false)
+    }
+  }
 
   useEffect(() => {
     ;(async () => {
       setLoading(true)
       setError(null)
       try {
-        const data = await getUltimoResultado()
-        setVagas(data.vagas ?? [])
+        const data = await getUltimoResultado({ page_size: pageSize })
+        setResultadoId(data.resultado_id)
+        aplicarPagina(data, 1)
         setInfo(data.arquivo ? `Carregado ${data.arquivo}` : null)
-        setPage(1)
       } catch (e: any) {
         setError(e?.message || 'Erro ao carregar último resultado')
       } finally {
@@ -34,10 +68,26 @@ export default function App() {
     setError(null)
     setInfo(null)
     try {
-      const data = await buscarVagas(criterios)
-      setVagas(data.vagas ?? [])
-      setInfo(`Encontradas ${data.total_vagas ?? data.total ?? (data.vagas?.length ?? 0)} vagas`)
+      setVagas([])
+      setTotal(0)
       setPage(1)
+      setCursores([null])
+      let recebidas = 0
+      // Cada site entra na primeira página assim que responde, sem esperar o mais lento
+      const resumo = await buscarVagasFluxo(criterios, quadro => {
+        if (quadro.tipo !== 'vagas' || !quadro.vagas?.length) return
+        const novas = quadro.vagas
+        recebidas += novas.length
+        setVagas(prev => [...prev, ...novas].slice(0, pageSize))
+        setTotal(recebidas)
+        setInfo(`Recebidas ${recebidas} vagas (último site: ${quadro.site})...`)
+      })
+      setInfo(`Encontradas ${resumo.total ?? recebidas} vagas`)
+      // Com a busca salva, a paginação passa a ser feita no servidor
+      if (resumo.resultado_id != null) {
+        setResultadoId(resumo.resultado_id)
+        await carregarPagina(1, pageSize, null, resumo.resultado_id)
+      }
     } catch (e: any) {
       setError(e?.message || 'Erro ao buscar vagas')
     } finally {
@@ -47,16 +97,14 @@ export default function App() {
 
   function onReset() {
     setVagas([])
+    setTotal(0)
+    setResultadoId(undefined)
+    setCursores([null])
     setInfo(null)
     setError(null)
     setPage(1)
   }
 
-  const total = vagas.length
-  const start = (page - 1) * pageSize
-  const end = start + pageSize
-  const pagedVagas = vagas.slice(start, end)
-
   return (
     <div className="min-h-screen bg-gray-50 font-sans">
       <header className="bg-white shadow-sm border-b border-gray-100">
@@ -121,20 +169,25 @@ export default function App() {
                     id="pageSize"
                     className="rounded-lg border border-gray-300 bg-gray-50 px-3 py-1.5 text-sm font-medium text-gray-700 shadow-sm focus:outline-none focus:ring-2 focus:ring-primary focus:border-primary transition-shadow cursor-pointer hover:bg-white"
                     value={pageSize}
-                    onChange={e => { setPageSize(Number(e.target.value)); setPage(1) }}
+                    onChange={e => {
+                      const tamanho = Number(e.target.value)
+                      setPageSize(tamanho)
+                      setCursores([null])
+                      if (total) carregarPagina(1, tamanho)
+                    }}
                   >
                     {[5, 10, 20, 50].map(n => <option key={n} value={n}>{n}</option>)}
                   </select>
                 </div>
               </div>
 
-              <VagasList vagas={pagedVagas} />
+              <VagasList vagas={vagas} />
 
               <Pagination
                 currentPage={page}
                 totalItems={total}
                 pageSize={pageSize}
-                onPageChange={setPage}
+                onPageChange={p => carregarPagina(p, pageSize, cursores[p - 1])}
               />
             </div>
           </main>
@@ -13,6 +13,7 @@ export interface Vaga {
   tipo?: string
   nivel?: string
   modalidade?: string
+  fontes?: string[]
 }
 
 export interface BuscarCriterios {
@@ -23,11 +24,31 @@ export interface BuscarCriterios {
   modalidades?: string[]
 }
 
+// Janela de resultados paginada no servidor (keyset): a próxima página usa `next_cursor`
+export interface PaginaParams {
+  resultado_id?: number
+  page?: number
+  page_size?: number
+  cursor?: string | null
+  sort?: string
+}
+
+export interface PaginaVagas {
+  vagas: Vaga[]
+  total?: number
+  total_resultado?: number
+  arquivo?: string
+  resultado_id?: number
+  page?: number
+  page_size?: number
+  next_cursor?: string | null
+}
+
 const API_URL = import.meta.env.VITE_API_URL || 'http://localhost:5000'
 
-export async function getUltimoResultado(): Promise<{ vagas: Vaga[]; total?: number; arquivo?: string }> {
+export async function getUltimoResultado(params: PaginaParams = {}): Promise<PaginaVagas> {
   try {
-    const { data } = await axios.get(`${API_URL}/api/ultimo-resultado`)
+    const { data } = await axios.get(`${API_URL}/api/ultimo-resultado`, { params })
     return data
   } catch (e: any) {
     const status = e?.response?.status
@@ -40,11 +61,58 @@ export async function getUltimoResultado(): Promise<{ vagas: Vaga[]; total?: num
   }
 }
 
-export async function buscarVagas(criterios: BuscarCriterios): Promise<{ vagas: Vaga[]; total_vagas?: number; total?: number }> {
-  const { data } = await axios.post(`${API_URL}/api/buscar-vagas`, criterios)
+export async function buscarVagas(criterios: BuscarCriterios, params: PaginaParams = {}): Promise<PaginaVagas & { total_vagas?: number }> {
+  const { data } = await axios.post(`${API_URL}/api/buscar-vagas`, criterios, { params })
   return data
 }
 
+// Quadro da busca em fluxo: 'vagas' (um por site), 'resumo' (final) ou 'erro'
+export interface QuadroBusca {
+  tipo: 'vagas' | 'resumo' | 'erro'
+  site?: string
+  vagas?: Vaga[]
+  encontradas?: number
+  total?: number
+  enviadas?: number
+  resultado_id?: number
+  error?: string
+}
+
+// Busca em fluxo (NDJSON): chama onQuadro a cada site concluído e retorna o resumo final
+export async function buscarVagasFluxo(criterios: BuscarCriterios, onQuadro: (q: QuadroBusca) => void): Promise<QuadroBusca> {
+  const resp = await fetch(`${API_URL}/api/buscar-vagas?stream=ndjson`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json', Accept: 'application/x-ndjson' },
+    body: JSON.stringify(criterios),
+  })
+  if (!resp.ok || !resp.body) {
+    const data = await resp.json().catch(() => null)
+    throw new Error(data?.error || `Falha na busca (${resp.status})`)
+  }
+  const reader = resp.body.getReader()
+  const decoder = new TextDecoder()
+  let buffer = ''
+  let resumo: QuadroBusca | null = null
+  for (;;) {
+    const { value, done } = await reader.read()
+    buffer += decoder.decode(value ?? new Uint8Array(), { stream: !done })
+    let fim = buffer.indexOf('\n')
+    while (fim >= 0) {
+      const linha = buffer.slice(0, fim).trim()
+      buffer = buffer.slice(fim + 1)
+      fim = buffer.indexOf('\n')
+      if (!linha) continue
+      const quadro = JSON.parse(linha) as QuadroBusca
+      if (quadro.tipo === 'erro') throw new Error(quadro.error || 'Erro ao buscar vagas')
+      if (quadro.tipo === 'resumo') resumo = quadro
+      onQuadro(quadro)
+    }
+    if (done) break
+  }
+  if (!resumo) throw new Error('Busca interrompida antes do resumo')
+  return resumo
+}
+
 export async function getSites(): Promise<string[]> {
   const { data } = await axios.get(`${API_URL}/api/sites`)
   const sites = Array.isArray(data?.sites) ? data.sites : []